@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+
+# benchramsey.py
+# Requires Python 3.
+
+"""Benchmark sparse & divided Ramsey computations against RESULTS.
+
+Command-line usage: benchramsey.py [OPTIONS] [TIER | NAME ...]
+
+Recompute the results stored in subdirectory RESULTS, check that the
+number of counterexample graphs of each order agrees with the stored
+results, and report the time taken and peak memory used, comparing
+these with earlier runs recorded in a history file. Exit with status 1
+if any count disagrees, or if any run is slower, or uses more memory,
+than the earlier runs by more than a threshold.
+
+TIER is one of the following (default: quick).
+
+quick        A few small computations; seconds.
+medium       The quick tier, plus computations taking up to a minute
+             or so.
+full         Every file in RESULTS. Some of these take days.
+
+Alternatively, give the names of one or more files in RESULTS, without
+the ".txt", for example, r03_06_07 rs04_05_06.
+
+Each computation is run in a fresh process, using find_extremals in
+sparseramsey.py or dividedramsey.py, and the performance metrics of
+each order are collected; see genramsey.extremals. After each run, one
+line of JSON describing it is appended to the history file: date, host,
+options, counts, total time and peak memory, and, for each order, the
+count, time, peak memory, numbers of parent & candidate graphs, and
+throughput (candidate graphs per second).
+
+A run is compared with the median of the last few successful runs in
+the history with the same name, host & options.
+
+OPTIONS:
+-q, --quiet  Quiet mode; print only failures.
+--history FILE
+             Read & append to history file FILE (default
+             benchhistory.jsonl).
+--no-history Do not append to the history file; still compare with it.
+--threshold PCT
+             A run is a regression if its time, or peak memory, exceeds
+             that of the earlier runs by more than PCT percent (default
+             20), plus a small allowance for timer noise.
+--results DIR
+             Read stored results from directory DIR (default: RESULTS
+             in the directory of this file).
+--gray       Pass enumeration="gray" to the computations. Runs with and
+             without this option are compared separately.
+--batch      Likewise, but pass enumeration="batch".
+
+The following options perform special operations; if they are given,
+then other arguments are ignored and may be omitted.
+
+-h, --help   Print this usage message.
+--test       Run module tests (uses Python doctests), non-verbose mode.
+--Test       Run module tests, verbose mode.
+
+To call from a Python 3 program, first do
+
+    import benchramsey
+
+To run a tier and obtain a list of records, one for each computation,
+do
+
+    records = benchramsey.run_tier("quick")
+
+Records are dicts in the format of the lines in the history file. To
+obtain the failures of a record, as a list of messages, do
+
+    messages = benchramsey.regressions(record, history)
+
+where history is a list of earlier records, as returned by
+benchramsey.read_history.
+
+INTERFACE
+
+TIERS
+    Dict. Maps each tier name but "full" to a list of names of files in
+    RESULTS.
+read_results(path)
+    Return (kind, k, a, b, counts) from a file in RESULTS.
+tier_names(tier, resultsdir=None)
+    Return list of names of files in RESULTS in a tier.
+run_one(name, resultsdir=None, **kwargs)
+    Recompute a file in RESULTS, and return a record of the run.
+read_history(path)
+    Return list of records in a history file.
+append_history(path, record)
+    Append a record to a history file.
+regressions(record, history, threshold=0.2)
+    Return list of messages describing failures of a record.
+run_tier(tier, ...)
+    Run each computation in a tier, print a table, and return the list
+    of records.
+
+"""
+
+import sparseramsey  # for find_extremals
+import dividedramsey  # for find_extremals
+import datetime   # for datetime
+import json       # for dumps, loads
+import multiprocessing  # for Pool
+import os         # for listdir, path
+import platform   # for python_version
+import socket     # for gethostname
+import statistics  # for median
+import sys        # for argv, exit, stderr
+import getopt     # for error, getopt
+
+
+# ----------------------------------------------------------------------
+# Stored Results
+# ----------------------------------------------------------------------
+
+
+# _RESULTS_DIR - default directory of stored results
+_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "RESULTS")
+
+
+# TIERS - names of files in RESULTS in each tier but "full", which holds
+# all of them. Times are roughly 3 sec (quick) and 1 min (medium).
+TIERS = {
+    "quick": ["r02_05_06", "r03_06_07", "rs04_05_06", "r02_05_07"],
+    "medium": ["r02_05_06", "r03_06_07", "rs04_05_06", "r02_05_07",
+               "r03_06_08", "r04_07_08", "r02_05_08"],
+}
+
+
+# _KINDS - program module for each file name prefix in RESULTS
+_KINDS = {
+    "r": sparseramsey,
+    "rs": dividedramsey,
+}
+
+
+def _parse_name(name):
+    """Return (kind, k, a, b) from name of file in RESULTS.
+
+    >>> _parse_name("rs04_05_06")
+    ('rs', 4, 5, 6)
+
+    """
+    kind = name.rstrip("0123456789_")
+    k, a, b = [ int(x) for x in name[len(kind):].split("_") ]
+    assert kind in _KINDS
+    return kind, k, a, b
+
+
+def read_results(path):
+    """Return (kind, k, a, b, counts) from a file in RESULTS.
+
+    kind is "r" (sparseramsey.py) or "rs" (dividedramsey.py), and k, a,
+    b are the command-line arguments, all taken from the filename.
+    counts is a list of the numbers of counterexample graphs of orders
+    0, 1, ..., as given in the file.
+
+    >>> kind, k, a, b, counts = read_results(
+    ...     os.path.join(_RESULTS_DIR, "r02_05_06.txt"))
+    >>> kind, k, a, b
+    ('r', 2, 5, 6)
+    >>> counts
+    [1, 1, 2, 4, 11, 23, 46, 13, 0]
+
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    kind, k, a, b = _parse_name(name)
+    counts = []
+    with open(path) as f:
+        for line in f:
+            if line.startswith("Order & number"):
+                break
+        for line in f:
+            words = line.split()
+            if len(words) != 2:
+                break
+            assert int(words[0]) == len(counts)
+            counts.append(int(words[1]))
+    return kind, k, a, b, counts
+
+
+def tier_names(tier, resultsdir=None):
+    """Return list of names of files in RESULTS in a tier.
+
+    Arguments:
+    tier -- string: "quick", "medium", or "full"
+    resultsdir -- optional string: directory of stored results
+        Default is RESULTS in the directory of this file.
+
+    >>> tier_names("quick")
+    ['r02_05_06', 'r03_06_07', 'rs04_05_06', 'r02_05_07']
+    >>> len(tier_names("full"))
+    19
+
+    """
+    if tier != "full":
+        return list(TIERS[tier])
+    resultsdir = resultsdir or _RESULTS_DIR
+    return sorted(os.path.splitext(fname)[0]
+                  for fname in os.listdir(resultsdir)
+                  if fname.endswith(".txt"))
+
+
+# ----------------------------------------------------------------------
+# Running Benchmarks
+# ----------------------------------------------------------------------
+
+
+def _level_record(metrics):
+    """Return per-order part of history record, from metrics record."""
+    seconds = metrics["seconds"]
+    throughput = metrics["candidates"] / seconds if seconds > 0 else 0.0
+    return {
+        "order": metrics["order"],
+        "count": metrics["count"],
+        "seconds": round(seconds, 6),
+        "peak_rss_kb": metrics["peak_rss_kb"],
+        "parents": metrics["parents"],
+        "candidates": metrics["candidates"],
+        "throughput": round(throughput, 1),
+    }
+
+
+def run_one(name, resultsdir=None, **kwargs):
+    """Recompute a file in RESULTS, and return a record of the run.
+
+    The record is a dict in the format of a line in the history file:
+    name, date, host, python version, options, whether the counts
+    agree with the stored results, counts, expected counts, total time,
+    peak memory, and a list of per-order records.
+
+    The computation runs in the calling process, so that peak memory
+    includes anything used earlier; run_tier calls this in a fresh
+    process.
+
+    Arguments:
+    name -- string: name of file in RESULTS, without ".txt"
+    resultsdir -- optional string: directory of stored results
+        Default is RESULTS in the directory of this file.
+    Other keyword arguments are passed to genramsey.extremals, via
+    find_extremals, and are recorded as the options of the run.
+
+    >>> r = run_one("r02_05_06")
+    >>> r["ok"], r["counts"]
+    (True, [1, 1, 2, 4, 11, 23, 46, 13, 0])
+    >>> [ level["candidates"] for level in r["levels"] ]
+    [0, 1, 2, 8, 32, 176, 736, 2944, 1664]
+
+    """
+    resultsdir = resultsdir or _RESULTS_DIR
+    kind, k, a, b, expected = read_results(
+        os.path.join(resultsdir, name + ".txt"))
+    records = []
+    start = datetime.datetime.now()
+    _KINDS[kind].find_extremals(k, a, b, metrics=records.append,
+                                **kwargs)
+    counts = [ metrics["count"] for metrics in records ]
+    levels = [ _level_record(metrics) for metrics in records ]
+    return {
+        "name": name,
+        "date": start.isoformat(timespec="seconds"),
+        "host": socket.gethostname(),
+        "python": platform.python_version(),
+        "options": kwargs,
+        "ok": counts == expected,
+        "counts": counts,
+        "expected": expected,
+        "seconds": round(sum(level["seconds"] for level in levels), 6),
+        "peak_rss_kb": max(level["peak_rss_kb"] for level in levels),
+        "levels": levels,
+    }
+
+
+def _run_one_star(args):
+    """Call run_one with (name, resultsdir, kwargs)."""
+    name, resultsdir, kwargs = args
+    return run_one(name, resultsdir, **kwargs)
+
+
+# ----------------------------------------------------------------------
+# History & Regressions
+# ----------------------------------------------------------------------
+
+
+# _HISTORY_RUNS - number of earlier runs compared with
+_HISTORY_RUNS = 5
+
+# _SLACK_SECONDS, _SLACK_KB - allowances for noise, added to threshold
+_SLACK_SECONDS = 0.1
+_SLACK_KB = 1024
+
+
+def read_history(path):
+    """Return list of records in a history file.
+
+    The file holds one record on each line, as JSON. If it does not
+    exist, return an empty list.
+
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [ json.loads(line) for line in f if line.strip() ]
+
+
+def append_history(path, record):
+    """Append a record to a history file, as one line of JSON.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> path = os.path.join(d, "h.jsonl")
+    >>> read_history(path)
+    []
+    >>> append_history(path, {"name": "x", "seconds": 1.0})
+    >>> append_history(path, {"name": "y", "seconds": 2.0})
+    >>> [ r["name"] for r in read_history(path) ]
+    ['x', 'y']
+    >>> import shutil
+    >>> shutil.rmtree(d)
+
+    """
+    with open(path, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def _baseline(record, history):
+    """Return earlier records comparable with record.
+
+    These are the last few successful records in history with the same
+    name, host & options.
+
+    """
+    same = [ r for r in history
+             if r["ok"] and r["name"] == record["name"] and
+                r["host"] == record["host"] and
+                r["options"] == record["options"] ]
+    return same[-_HISTORY_RUNS:]
+
+
+def regressions(record, history, threshold=0.2):
+    """Return list of messages describing failures of a record.
+
+    A record fails if its counts disagree with the stored results, or if
+    its time or peak memory exceeds the median of those of comparable
+    earlier records (see _baseline) by more than the fraction
+    threshold, plus a small allowance for noise. An empty list means no
+    failures.
+
+    Arguments:
+    record -- dict: record returned by run_one
+    history -- list of earlier records
+    threshold -- optional float: allowed fractional increase
+        Default is 0.2.
+
+    >>> old = {"name": "r", "host": "h", "options": {}, "ok": True,
+    ...        "seconds": 10.0, "peak_rss_kb": 50000}
+    >>> new = dict(old, seconds=11.0)
+    >>> regressions(new, [old, old])
+    []
+    >>> new = dict(old, seconds=13.0, peak_rss_kb=70000)
+    >>> for msg in regressions(new, [old, old]):
+    ...     print(msg)
+    r: time 13.000 s is 30% over baseline 10.000 s
+    r: peak memory 70000 KB is 40% over baseline 50000 KB
+    >>> regressions(new, [old], threshold=0.5)
+    []
+    >>> regressions(dict(new, host="other"), [old])
+    []
+    >>> new = dict(old, ok=False, counts=[1, 2], expected=[1, 3])
+    >>> regressions(new, [])
+    ['r: counts [1, 2] differ from stored results [1, 3]']
+
+    """
+    name = record["name"]
+    messages = []
+    if not record["ok"]:
+        messages.append("%s: counts %s differ from stored results %s"
+                        % (name, record["counts"], record["expected"]))
+        return messages
+    base = _baseline(record, history)
+    if not base:
+        return messages
+    seconds = statistics.median(r["seconds"] for r in base)
+    if record["seconds"] > seconds * (1 + threshold) + _SLACK_SECONDS:
+        messages.append("%s: time %.3f s is %d%% over baseline %.3f s"
+                        % (name, record["seconds"],
+                           round(100 * (record["seconds"]/seconds - 1)),
+                           seconds))
+    kb = statistics.median(r["peak_rss_kb"] for r in base)
+    if record["peak_rss_kb"] > kb * (1 + threshold) + _SLACK_KB:
+        messages.append("%s: peak memory %d KB is %d%% over baseline "
+                        "%d KB" % (name, record["peak_rss_kb"],
+                           round(100 * (record["peak_rss_kb"]/kb - 1)),
+                           kb))
+    return messages
+
+
+# ----------------------------------------------------------------------
+# Running Tiers
+# ----------------------------------------------------------------------
+
+
+def run_tier(tier, names=None, resultsdir=None, history=None,
+             threshold=0.2, printflag=None, save=True, **kwargs):
+    """Run each computation in a tier, print a table, return records.
+
+    Each computation is run by run_one in a fresh process, compared
+    with the history by function regressions, and then, if history is
+    given and save is True, appended to the history file. If printflag
+    is True, prints a line for each computation as it finishes: name,
+    whether the counts agree, time, baseline time, change, and peak
+    memory. Failures are printed to the standard error.
+
+    Each record returned has an extra key "failures": the list of
+    messages returned by regressions. This is not saved in the history.
+
+    Arguments:
+    tier -- string: "quick", "medium", or "full"; ignored if names is
+        given
+    names -- optional list of names of files in RESULTS
+        Default is None: the names in the tier.
+    resultsdir -- optional string: directory of stored results
+        Default is RESULTS in the directory of this file.
+    history -- optional string: name of history file
+        Default is None: no history.
+    threshold -- optional float: allowed fractional increase; see
+        regressions. Default is 0.2.
+    printflag -- optional bool: whether to print the table
+        Default is False.
+    save -- optional bool: whether to append records to history
+        Default is True.
+    Other keyword arguments are passed to run_one.
+
+    """
+    if names is None:
+        names = tier_names(tier, resultsdir)
+    past = read_history(history) if history is not None else []
+    if printflag:
+        print("%-12s %-8s %10s %10s %7s %9s"
+              % ("name", "counts", "seconds", "baseline", "change",
+                 "peak MB"))
+    records = []
+    for name in names:
+        # Fresh process for each run, so peak memory is its own
+        with multiprocessing.Pool(1) as pool:
+            record = pool.apply(_run_one_star,
+                                [(name, resultsdir, kwargs)])
+        failures = regressions(record, past, threshold)
+        if history is not None and save:
+            append_history(history, record)
+        if printflag:
+            base = _baseline(record, past)
+            if base:
+                seconds = statistics.median(r["seconds"] for r in base)
+                baseline = "%10.3f" % seconds
+                change = "%+6d%%" % round(
+                    100 * (record["seconds"]/seconds - 1))
+            else:
+                baseline = "%10s" % "-"
+                change = "%7s" % "-"
+            print("%-12s %-8s %10.3f %s %s %9.1f"
+                  % (name, "ok" if record["ok"] else "MISMATCH",
+                     record["seconds"], baseline, change,
+                     record["peak_rss_kb"] / 1024), flush=True)
+        for msg in failures:
+            print("FAILED:", msg, file=sys.stderr, flush=True)
+        record["failures"] = failures
+        records.append(record)
+    return records
+
+
+# ----------------------------------------------------------------------
+# Main program
+# ----------------------------------------------------------------------
+
+
+class UsageError(Exception):
+
+    """Exception class for command-line usage errors.
+
+    >>> isinstance(UsageError(""), Exception)
+    True
+    >>> UsageError("abc").msg
+    'abc'
+
+    """
+
+    def __init__(self, msg):
+        """Create UsageError object with the given message."""
+        self.msg = msg
+
+
+def main(argv=None):
+    """Run benchmarks, based on command-line options.
+
+    Argument argv is an optional list or tuple of strings, in the format
+    of sys.argv (which is its default value).
+
+    Return zero if all computations succeed, 1 if any fail, 2 on a
+    usage error.
+
+    """
+    if argv is None:
+        argv = sys.argv
+
+    printflag = True
+    history = "benchhistory.jsonl"
+    save = True
+    threshold = 0.2
+    resultsdir = None
+    kwargs = {}
+    try:
+        try:
+            optlist, args = getopt.getopt(argv[1:], "hq",
+                ["help", "quiet", "test", "Test", "history=",
+                 "no-history", "threshold=", "results=", "gray",
+                 "batch"])
+        except getopt.error as msg:
+            raise UsageError(msg)
+        for o, a in optlist:
+            if o in ["-h", "--help"]:
+                print(__doc__, end="")  # Usage message
+                return 0
+            elif o in ["-q", "--quiet"]:
+                printflag = False
+            elif o == "--history":
+                history = a
+            elif o == "--no-history":
+                save = False
+            elif o == "--threshold":
+                try:
+                    threshold = float(a) / 100
+                except ValueError:
+                    raise UsageError("Threshold must be a number")
+            elif o == "--results":
+                resultsdir = a
+            elif o == "--gray":
+                kwargs["enumeration"] = "gray"
+            elif o == "--batch":
+                kwargs["enumeration"] = "batch"
+            elif o == "--test" or o == "--Test":
+                import doctest  # for testmod
+                verbose = (o == "--Test")
+                if verbose:
+                    print("Running doctests (verbose mode)")
+                else:
+                    print("Running doctests")
+                doctest.testmod(verbose=verbose)
+                return 0
+            else:
+                assert False, "unhandled option"
+        tier = "quick"
+        names = None
+        if len(args) == 1 and (args[0] in TIERS or args[0] == "full"):
+            tier = args[0]
+        elif args:
+            names = args
+            for name in names:
+                try:
+                    _parse_name(name)
+                except (AssertionError, ValueError):
+                    raise UsageError("Unknown tier or name: " + name)
+    except UsageError as err:
+        print(argv[0]+":", err.msg, file=sys.stderr)
+        print("For help use --help", file=sys.stderr)
+        return 2
+
+    try:
+        records = run_tier(tier, names, resultsdir, history, threshold,
+                           printflag, save, **kwargs)
+    except OSError as err:
+        print(argv[0]+":", err, file=sys.stderr)
+        return 1
+    if any(record["failures"] for record in records):
+        print(argv[0]+": FAILED", file=sys.stderr)
+        return 1
+    return 0
+
+
+# Execute main() if running as program, not if imported as module
+if __name__ == "__main__":
+    sys.exit(main())
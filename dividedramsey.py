@@ -8,6 +8,7 @@
 """Compute k-divided Ramsey numbers & related extremal graphs.
 
 Command-line usage: dividedramsey.py [OPTIONS] k a b
+               or: dividedramsey.py [OPTIONS] --grid SPEC SPEC SPEC
 
 Compute and print the generalized Ramsey number R*_k(a, b), along with
 extremal graphs, using "DOT language". If not in quiet mode (see below),
@@ -18,6 +19,115 @@ G has no b-vertex k-divided set.
 
 OPTIONS:
 -q, --quiet  Quiet mode; do not print info on counterexample graphs.
+--value-only Find only R*_k(a, b) and a single extremal graph, using
+             depth-first search, which holds only one path of its
+             search tree, and is usually much faster than the default
+             search. If not in quiet mode, print the order of each
+             counterexample graph found that is larger than all found
+             before it.
+--sat N      Decide whether R*_k(a, b) > N, by looking for a
+             counterexample graph of order N with a SAT solver, and
+             print such a graph if there is one. If not in quiet mode,
+             print the size of the formula and of the search.
+--coordinator DIR
+             Share the computation with worker processes, using
+             directory DIR, which should be on a filesystem that the
+             workers can access.
+--worker DIR Act as a worker for a coordinator that was given the same
+             DIR and the same k, a, b. Exit when the coordinator is
+             finished. Any number of workers may be started, on any
+             machines sharing DIR.
+--lease SECS With --coordinator or --worker: a shard of work claimed by
+             a worker that crashed is reclaimed after SECS seconds
+             (default 600).
+--checkpoint DIR
+             Save the counterexample graphs of each order in directory
+             DIR, as each order is completed.
+--resume DIR Resume a computation from the last order saved in DIR by
+             --checkpoint, and continue saving there.
+--verify DIR Instead of computing R*_k(a, b), check a finished
+             computation saved in DIR by --checkpoint: that the graphs
+             saved for each order are exactly the counterexample
+             graphs of that order, one from each isomorphism class.
+             Each order is checked against the one below, using only
+             canonical forms and the predicates themselves. On one
+             processor, this takes a quarter to a tenth of the time
+             the computation did; with --processes, the work is
+             split among processors. Print R*_k(a, b) and the number
+             of extremal graphs; exit with status 1 if a check fails.
+--against FILE
+             With --verify: also check the numbers of counterexample
+             graphs and the extremal graphs in FILE, which holds output
+             of this program, such as a file in RESULTS.
+--processes P
+             With --verify: use P processes (default: one for each
+             processor).
+--seed FILE  Start from the counterexample graphs saved in level file
+             FILE by --checkpoint, for the same k, a, b, or for k, b, a,
+             in which case their complements are used. Seeding from the
+             last nonempty level for k, b, a gives R_k(a, b) after
+             computing one more order.
+--memory MB  When removing isomorphic duplicates would take more than
+             about MB megabytes, continue using temporary files; and
+             keep each computed level larger than that in a temporary
+             file, so it need not fit in memory. Set environment
+             variable TMPDIR to choose their directory.
+--gray       When adding a vertex to a graph, try its neighborhoods in
+             Gray-code order, updating the information on k-divided sets
+             as each vertex is added or removed. The result is the
+             same; only the speed differs.
+--batch      When adding a vertex to a graph, check all of its
+             neighborhoods at once for k-divided sets, using NumPy
+             arrays. If NumPy is not installed, this option has no
+             effect. The result is the same; only the speed differs.
+--prune      When adding a vertex to a graph, try only neighborhoods
+             of sizes allowed by smaller Ramsey numbers: the
+             non-neighbors of a vertex have no (a-1)-vertex k-divided
+             set, and its neighbors none in the complement with b-1
+             vertices. These numbers are computed first. The result is
+             the same; only the speed differs.
+--grid       Instead of k, a, b, take three specs, giving ranges of
+             values of k, a, b, of the form k=LO..HI, or k=VALUE, and
+             likewise for a and b, and do each triple in the ranges.
+             LO, HI, VALUE are sums & differences of integers and names
+             coming before in the order k, a, b; for example,
+
+                 --grid k=2..6 a=5..9 b=a..a+2
+
+             Triples are done in an order in which the counterexample
+             graphs of one may be found among those of another already
+             done, with larger a or b or smaller k, and the saved graphs
+             of that one are checked instead of adding vertices to
+             graphs. These are saved in a temporary directory; set
+             environment variable TMPDIR to choose it. Extremal graphs
+             may be listed in a different order. Cannot be used with
+             --coordinator, --worker, --checkpoint, --resume, --seed,
+             --value-only, --sat, or --duality.
+--duality    If a = b, keep only one graph from each pair of
+             complementary counterexample graphs, roughly halving the
+             work. The counts printed are the same, as are the extremal
+             graphs, up to isomorphism and order. Levels saved by
+             --checkpoint hold only one graph from each pair. Workers
+             must also be given --duality.
+--metrics FILE
+             Append performance metrics for each order computed to
+             FILE, one line of JSON per order: time, numbers of parent
+             graphs, candidate graphs, predicate calls, rejections and
+             isomorphism checks, and peak memory use. See
+             genramsey.extremals.
+--progress SECS
+             While computing each order, print a progress report to
+             standard error every SECS seconds: the number of graphs of
+             the previous order done, out of the total, the number of
+             graphs found, the speed, and an estimate of the time left.
+             A report is also printed on signal SIGUSR1. If SECS is 0,
+             reports are printed only on the signal.
+--profile DIR
+             Profile the computation of each order, writing the results
+             to directory DIR, one file per order, in the format of
+             Python module pstats, along with a table, in summary.txt,
+             showing where the time went at each order. Profiling
+             slows the computation.
 
 The following options perform special operations; if they are given,
 then arguments k, a, b are ignored and may be omitted.
@@ -38,7 +148,41 @@ with k, a, b set appropriately. Alternatively do
 
     dividedramsey.print_extremals(k, a, b)
 
-to print information to the standard output.
+to print information to the standard output. Other keyword arguments
+to these functions are passed on to genramsey.extremals.
+
+To obtain the counterexample graphs of each order as soon as they are
+computed, do
+
+    for level in dividedramsey.iter_levels(k, a, b):
+        ...
+
+See genramsey.Level for the attributes of the objects yielded.
+
+The predicates used are objects of classes KDivided and KDividedCompl,
+which may be compared, hashed and pickled; see genramsey.Predicate.
+
+To obtain only the Ramsey number and one extremal graph, do
+
+    value, extremal = dividedramsey.find_value(k, a, b)
+
+or, to print these,
+
+    dividedramsey.print_value(k, a, b)
+
+To decide, using a SAT solver, whether R*_k(a, b) > n, do
+
+    g = dividedramsey.find_counterexample(k, a, b, n)
+
+which returns a counterexample graph of order n, or None if there is
+none.
+
+To check a finished computation whose levels were saved in directory
+DIR, by passing checkpoint=DIR to find_extremals, do
+
+    value, extremal_list = dividedramsey.verify_extremals(k, a, b, DIR)
+
+which raises ValueError if a check fails.
 
 This software was written as a companion to the paper "On subgraphs
 without large components" by Glenn G. Chappell and John Gimbel. See that
@@ -47,8 +191,14 @@ paper for mathematical background and related results.
 """
 
 import isograph   # for dot_str, isomorphic
-import genramsey  # for extremals
+import genramsey  # for extremals, popcount
+import ramseysat  # for counterexample
+import itertools  # for combinations
+import os         # for listdir, path
+import re         # for split
+import shutil     # for rmtree
 import sys        # for argv, exit, stderr
+import tempfile   # for TemporaryDirectory
 import getopt     # for error, getopt
 
 
@@ -65,7 +215,9 @@ def make_k_divided_func(k):
     returned function returns True if s is k-divided in g.
 
     The returned function is an induced-hereditary predicate, as the
-    term is used in genramsey.py.
+    term is used in genramsey.py. It keeps no state between calls, and
+    so may be called from several threads at once. It is the object
+    KDivided(k).
 
     Arguments:
     k -- positive int; the "k" in k-divided
@@ -105,27 +257,8 @@ def make_k_divided_func(k):
     True
 
     """
-    def is_k_divided(g, s):
-        # k >= 1
-        pushed = [False] * len(g)
-        for v in s:
-            if pushed[v]: continue
-            compsize = 1
-            stack = [v]
-            pushed[v] = True
-            while stack:
-                x = stack.pop()
-                for y in s:
-                    if pushed[y] or y not in g[x]: continue
-                    if compsize >= k:
-                        return False
-                    compsize += 1
-                    stack.append(y)
-                    pushed[y] = True
-        return True
-
     assert k >= 1
-    return is_k_divided
+    return KDivided(k)
 
 
 def make_k_divided_compl_func(k):
@@ -137,7 +270,9 @@ def make_k_divided_compl_func(k):
     of g.
 
     The returned function is an induced-hereditary predicate, as the
-    term is used in genramsey.py.
+    term is used in genramsey.py. It keeps no state between calls, and
+    so may be called from several threads at once. It is the object
+    KDividedCompl(k).
 
     Arguments:
     k -- nonnegative int; the "k" in k-divided
@@ -177,7 +312,165 @@ def make_k_divided_compl_func(k):
     True
 
     """
-    def is_k_divided_compl(g, s):
+    assert k >= 1
+    return KDividedCompl(k)
+
+
+class KDivided(genramsey.Predicate):
+    """Predicate class: True if s is k-divided in g.
+
+    See genramsey.Predicate. KDivided objects have with_last,
+    with_masks, gray_tracker, batch_parts and link_rule methods, as
+    described in genramsey.py, and attribute cnf_witness, as described
+    in ramseysat.py: k+1 vertices inducing a connected subgraph.
+
+    Arguments:
+    k -- positive int; the "k" in k-divided
+
+    >>> KDivided(2)([[1], [0, 2], [1]], (0, 1, 2))
+    False
+    >>> KDivided(2).with_masks([0b10, 0b101, 0b10], (0, 1, 2), 0b111)
+    False
+    >>> KDivided(2).with_masks([0b10, 0b101, 0b10], (0, 2), 0b101)
+    True
+    >>> KDivided(2).complement
+    KDividedCompl(2)
+
+    """
+
+    _fields = ("k",)
+    monotone = -1
+
+    def __init__(self, k):
+        assert k >= 1
+        self.k = k
+
+    @property
+    def complement(self):
+        return KDividedCompl(self.k)
+
+    def __call__(self, g, s):
+        k = self.k
+        # k >= 1
+        pushed = [False] * len(g)
+        for v in s:
+            if pushed[v]: continue
+            compsize = 1
+            stack = [v]
+            pushed[v] = True
+            while stack:
+                x = stack.pop()
+                for y in s:
+                    if pushed[y] or y not in g[x]: continue
+                    if compsize >= k:
+                        return False
+                    compsize += 1
+                    stack.append(y)
+                    pushed[y] = True
+        return True
+
+    def with_last(self, h, vset, ss):
+        k = self.k
+        # The new vertex, adjacent to the vertices in vset, joins the
+        # components of ss that meet vset into one component
+        joined = 1
+        pushed = [False] * len(h)
+        for v in ss:
+            if pushed[v]: continue
+            comp = [v]
+            pushed[v] = True
+            meets = v in vset
+            for x in comp:  # comp grows as we go
+                for y in ss:
+                    if pushed[y] or y not in h[x]: continue
+                    if len(comp) >= k:
+                        return False
+                    comp.append(y)
+                    pushed[y] = True
+                    meets = meets or y in vset
+            if meets:
+                joined += len(comp)
+                if joined > k:
+                    return False
+        return True
+
+    def with_masks(self, adj, s, smask):
+        k = self.k
+        popcount = genramsey.popcount
+        # Grow each component from its highest vertex (the new one, in
+        # has_fset_with_last), OR-ing the bitmasks of the vertices last
+        # added; left holds the vertices not yet in a component
+        left = smask
+        while left:
+            new = 1 << (left.bit_length()-1)
+            left ^= new
+            compsize = 1
+            while new:
+                near = 0
+                while new:
+                    low = new & -new
+                    near |= adj[low.bit_length()-1]
+                    new ^= low
+                new = near & left
+                left ^= new
+                compsize += popcount(new)
+                if compsize > k:
+                    return False
+        return True
+
+    def gray_tracker(self, h, b):
+        return _KDividedTracker(h, b, self.k, False)
+
+    def batch_parts(self, h, b):
+        return _divided_parts(h, b, self.k, False)
+
+    def link_rule(self, b):
+        # A k-divided set of order b-1, plus a vertex adjacent to
+        # none of its vertices, is one of order b
+        return (-1, b-1) if b > 0 else None
+
+    @property
+    def cnf_witness(self):
+        return self.k+1, _connected_cnf(self.k+1, True)
+
+
+class KDividedCompl(genramsey.Predicate):
+    """Predicate class: True if s is k-divided in the complement of g.
+
+    See genramsey.Predicate. KDividedCompl objects have with_last,
+    with_masks, gray_tracker, batch_parts and link_rule methods, as
+    described in genramsey.py, and attribute cnf_witness, as described
+    in ramseysat.py: k+1 vertices inducing a connected subgraph of the
+    complement.
+
+    Arguments:
+    k -- positive int; the "k" in k-divided
+
+    >>> KDividedCompl(2)([[1], [0, 2], [1]], (0, 1, 2))
+    True
+    >>> KDividedCompl(2).with_masks([0b10, 0b101, 0b10], (0, 1, 2),
+    ...                             0b111)
+    True
+    >>> KDividedCompl(1).with_masks([0b10, 0b101, 0b10], (0, 2), 0b101)
+    False
+    >>> KDividedCompl(2).complement
+    KDivided(2)
+
+    """
+
+    _fields = ("k",)
+    monotone = 1
+
+    def __init__(self, k):
+        assert k >= 1
+        self.k = k
+
+    @property
+    def complement(self):
+        return KDivided(self.k)
+
+    def __call__(self, g, s):
+        k = self.k
         # k >= 1
         pushed = [False] * len(g)
         for v in s:
@@ -197,8 +490,220 @@ def make_k_divided_compl_func(k):
                     pushed[y] = True
         return True
 
-    assert k >= 1
-    return is_k_divided_compl
+    def with_last(self, h, vset, ss):
+        k = self.k
+        # In the complement, the new vertex is adjacent to the vertices
+        # not in vset, and joins the components of ss that meet these
+        joined = 1
+        pushed = [False] * len(h)
+        for v in ss:
+            if pushed[v]: continue
+            comp = [v]
+            pushed[v] = True
+            meets = v not in vset
+            for x in comp:  # comp grows as we go
+                for y in ss:
+                    if pushed[y] or y in h[x]: continue
+                        # Note: no ck for y == x, as pushed[x] is True
+                    if len(comp) >= k:
+                        return False
+                    comp.append(y)
+                    pushed[y] = True
+                    meets = meets or y not in vset
+            if meets:
+                joined += len(comp)
+                if joined > k:
+                    return False
+        return True
+
+    def with_masks(self, adj, s, smask):
+        k = self.k
+        popcount = genramsey.popcount
+        # As for KDivided, but in the complement, the vertices of s
+        # adjacent to v are those of ~adj[v] & smask
+        left = smask
+        while left:
+            new = 1 << (left.bit_length()-1)
+            left ^= new
+            compsize = 1
+            while new:
+                near = 0
+                while new:
+                    low = new & -new
+                    near |= ~adj[low.bit_length()-1]
+                    new ^= low
+                new = near & left
+                left ^= new
+                compsize += popcount(new)
+                if compsize > k:
+                    return False
+        return True
+
+    def gray_tracker(self, h, b):
+        return _KDividedTracker(h, b, self.k, True)
+
+    def batch_parts(self, h, b):
+        return _divided_parts(h, b, self.k, True)
+
+    def link_rule(self, b):
+        # Likewise in the complement: add a vertex adjacent to all
+        # vertices of the set
+        return (1, b-1) if b > 0 else None
+
+    @property
+    def cnf_witness(self):
+        return self.k+1, _connected_cnf(self.k+1, False)
+
+
+def _connected_cnf(w, e):
+    """Return CNF saying vertices 0 .. w-1 induce a connected graph.
+
+    The format is that of cnf_witness in ramseysat.py. A graph is
+    connected iff each cut, splitting its vertices into two nonempty
+    parts, has an edge across it; so there is a clause for each cut. If
+    e is False, the CNF says the same of the complement.
+
+    >>> for clause in _connected_cnf(3, True):
+    ...     print(clause)
+    [(0, 1, True), (0, 2, True)]
+    [(0, 2, True), (1, 2, True)]
+    [(0, 1, True), (1, 2, True)]
+
+    """
+    clauses = []
+    for m in range((1 << (w-1)) - 1):
+        # Part containing vertex 0: 0 & each i+1 with bit i of m set
+        part = [0] + [ i+1 for i in range(w-1) if m & (1 << i) ]
+        rest = [ v for v in range(w) if v not in part ]
+        clauses.append(sorted((min(u, v), max(u, v), e)
+                              for u in part for v in rest))
+    return clauses
+
+
+class _KDividedTracker:
+    """Tracker for k-divided sets in h, or its complement if compl.
+
+    See genramsey.py for trackers. Say N is the neighborhood of the new
+    vertex in h, or, if compl is True, its neighborhood in the
+    complement of h. Let ss be an order-(b-1) set of vertices of h that
+    is k-divided in h (or its complement). When the new vertex is added
+    to ss, it joins every component of ss that meets N into a single
+    component. So we get a k-divided set iff 1 plus the total order of
+    the components that meet N is at most k. For each component of each
+    such ss, we keep the number of its vertices in N, and for each such
+    ss, the total order of the components that meet N. We also keep the
+    number of such ss for which this total is less than k. Toggling
+    vertex v takes time proportional to the number of such ss
+    containing v.
+
+    >>> t = _KDividedTracker([[1], [0], []], 3, 2, False)
+    >>> t.has_fset()
+    True
+    >>> t.toggle(2); t.has_fset()
+    True
+    >>> t.toggle(0); t.has_fset()
+    True
+    >>> t.toggle(1); t.has_fset()
+    False
+
+    """
+
+    def __init__(self, h, b, k, compl):
+        m = len(h)
+        self._k = k
+        self._inn = [compl] * m  # _inn[v] is True if v lies in N
+        self._sets = [ [] for v in range(m) ]  # (index, comp) pairs
+        self._compsize = []  # Order of each component
+        self._comphits = []  # Number of its vertices in N
+        self._joined = []    # Total order of components of ss meeting N
+        if 1 <= b <= m+1:
+            nbrs = [ set(a) for a in h ]
+            for ss in itertools.combinations(range(m), b-1):
+                comps = _components(nbrs, ss, compl)
+                if any(len(comp) > k for comp in comps):
+                    continue
+                i = len(self._joined)
+                for comp in comps:
+                    c = len(self._compsize)
+                    for v in comp:
+                        self._sets[v].append((i, c))
+                    self._compsize.append(len(comp))
+                    self._comphits.append(len(comp) if compl else 0)
+                self._joined.append(len(ss) if compl else 0)
+        self._good = sum(1 for j in self._joined if j < k)
+
+    def toggle(self, v):
+        self._inn[v] = not self._inn[v]
+        k = self._k
+        joined = self._joined
+        comphits = self._comphits
+        for i, c in self._sets[v]:
+            if joined[i] < k:
+                self._good -= 1
+            if self._inn[v]:
+                comphits[c] += 1
+                if comphits[c] == 1:
+                    joined[i] += self._compsize[c]
+            else:
+                comphits[c] -= 1
+                if comphits[c] == 0:
+                    joined[i] -= self._compsize[c]
+            if joined[i] < k:
+                self._good += 1
+
+    def has_fset(self):
+        return self._good > 0
+
+
+def _components(nbrs, ss, compl):
+    """Return list of vertex lists of components of subgraph on ss.
+
+    nbrs is a list of neighbor sets of a graph. If compl is True, then
+    components are taken in the complement of the graph.
+
+    >>> _components([{1}, {0}, set()], (0, 1, 2), False)
+    [[0, 1], [2]]
+
+    """
+    comps = []
+    left = list(ss)
+    while left:
+        comp = [left.pop()]
+        for x in comp:  # comp grows as we go
+            near = [ y for y in left if (y in nbrs[x]) != compl ]
+            comp += near
+            left = [ y for y in left if y not in near ]
+        comps.append(sorted(comp))
+    comps.sort()
+    return comps
+
+
+def _divided_parts(h, b, k, compl):
+    """Return batch_parts(h, b) for k-divided sets in h, or complement.
+
+    See genramsey.py for batch_parts. As in _KDividedTracker, the new
+    vertex joins the components of ss that meet its neighborhood (in h,
+    or its complement if compl is True) into one component. So each
+    component is a part, with weight its order, and the limit is k-1.
+
+    >>> compl, limit, sets = _divided_parts([[1], [0], []], 3, 2, False)
+    >>> limit
+    1
+    >>> for item in sets:
+    ...     print(item)
+    [((0, 1), 2)]
+    [((0,), 1), ((2,), 1)]
+    [((1,), 1), ((2,), 1)]
+
+    """
+    nbrs = [ set(a) for a in h ]
+    sets = []
+    for ss in itertools.combinations(range(len(h)), b-1):
+        comps = _components(nbrs, ss, compl)
+        if any(len(comp) > k for comp in comps):
+            continue
+        sets.append([ (tuple(comp), len(comp)) for comp in comps ])
+    return compl, k-1, sets
 
 
 # ----------------------------------------------------------------------
@@ -206,7 +711,7 @@ def make_k_divided_compl_func(k):
 # ----------------------------------------------------------------------
 
 
-def find_extremals(k, a, b, printflag=None):
+def find_extremals(k, a, b, printflag=None, **kwargs):
     """Return R*_k(a,b), list of extremal graphs.
 
     If printflag is True, prints, one on each line, pairs of the form
@@ -219,6 +724,7 @@ def find_extremals(k, a, b, printflag=None):
     b -- nonnegative int; the "b" in R*_k(a,b)
     printflag -- optional bool: whether to print ongoing messages
         Default is False.
+    Other keyword arguments are passed to genramsey.extremals.
 
     See isograph.py for our graph representation.
 
@@ -247,10 +753,232 @@ def find_extremals(k, a, b, printflag=None):
 
     f1 = make_k_divided_func(k)
     f2 = make_k_divided_compl_func(k)
-    return genramsey.extremals(f1, f2, a, b, printflag)
-    
+    return genramsey.extremals(f1, f2, a, b, printflag, **kwargs)
+
+
+def iter_levels(k, a, b, **kwargs):
+    """Yield genramsey.Level object for each order in finding R*_k(a,b).
+
+    Levels are yielded as soon as they are computed, ending with the
+    first order with no counterexample graphs, which is R*_k(a,b). See
+    genramsey.iter_levels.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    Other keyword arguments are passed to genramsey.iter_levels.
+
+    >>> [ level.count for level in iter_levels(1, 3, 3) ]
+    [1, 1, 2, 2, 3, 1, 0]
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+
+    f1 = make_k_divided_func(k)
+    f2 = make_k_divided_compl_func(k)
+    return genramsey.iter_levels(f1, f2, a, b, **kwargs)
+
+
+def work(k, a, b, workdir, **kwargs):
+    """Work on a sharded computation of R*_k(a,b). Return # shards done.
+
+    The coordinator is a call to find_extremals or print_extremals with
+    the same k, a, b, and with keyword argument workdir set to the
+    given workdir.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    workdir -- string: directory for sharded computation
+    Other keyword arguments are passed to genramsey.work.
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+
+    f1 = make_k_divided_func(k)
+    f2 = make_k_divided_compl_func(k)
+    return genramsey.work(workdir, f1, f2, a, b, **kwargs)
+
+
+def find_value(k, a, b, printflag=None):
+    """Return R*_k(a,b), one extremal graph (None if there are none).
+
+    Uses depth-first search, which needs little memory; see
+    genramsey.ramsey_value. If printflag is True, prints the order of
+    each counterexample graph found that is larger than all found before
+    it.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> n, g = find_value(1, 3, 3)
+    >>> n
+    6
+    >>> c5 = [[1,4],[0,2],[1,3],[2,4],[3,0]]
+    >>> isograph.isomorphic(c5, g)
+    True
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+
+    f1 = make_k_divided_func(k)
+    f2 = make_k_divided_compl_func(k)
+    return genramsey.ramsey_value(f1, f2, a, b, printflag)
+
+
+def print_value(k, a, b, printflag=None):
+    """Print R*_k(a,b) + one extremal graph in DOT language.
+
+    Uses depth-first search, which needs little memory; see
+    genramsey.ramsey_value. If printflag is True, prints the order of
+    each counterexample graph found that is larger than all found before
+    it.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> print_value(1, 2, 2)
+    Finding R*_1(2,2)
+    <BLANKLINE>
+    1 extremal graph (of possibly several):
+    <BLANKLINE>
+    graph rs1_2_2e1 {
+        1;
+    }
+    <BLANKLINE>
+    R*_1(2,2) = 2
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+
+    print("Finding R*_"+str(k)+"("+str(a)+","+str(b)+")")
+    print()
+
+    n, g = find_value(k, a, b, printflag)
+
+    if printflag:
+        print()
+    if g is None:
+        print("0 extremal graph(s)")
+    else:
+        print("1 extremal graph (of possibly several):")
+        print()
+        graphname = "rs"+str(k)+"_"+str(a)+"_"+str(b)+"e1"
+        print(isograph.dot_str(g, graphname))
+        print()
+    print("R*_"+str(k)+"("+str(a)+","+str(b)+") = "+str(n))
+
+
+def find_counterexample(k, a, b, n, printflag=None):
+    """Return a counterexample graph of order n, or None if none exist.
+
+    A graph is returned iff R*_k(a,b) > n. Uses a SAT solver; see
+    ramseysat.counterexample. If printflag is True, prints the size of
+    the formula and of the search.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    n -- nonnegative int; order of graph
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> find_counterexample(1, 3, 3, 5) is None
+    False
+    >>> find_counterexample(1, 3, 3, 6) is None
+    True
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+    assert n >= 0
+
+    f1 = make_k_divided_func(k)
+    f2 = make_k_divided_compl_func(k)
+    return ramseysat.counterexample(f1, f2, a, b, n,
+                                    printflag=printflag)
+
+
+def print_counterexample(k, a, b, n, printflag=None):
+    """Print whether R*_k(a,b) > n, + a counterexample graph if so.
+
+    Uses a SAT solver; see ramseysat.counterexample. If printflag is
+    True, prints the size of the formula and of the search.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    n -- nonnegative int; order of graph
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> print_counterexample(1, 2, 2, 1)
+    Looking for counterexample graph for R*_1(2,2) of order 1
+    <BLANKLINE>
+    graph rs1_2_2c1 {
+        1;
+    }
+    <BLANKLINE>
+    R*_1(2,2) > 1
+    >>> print_counterexample(1, 2, 2, 2)
+    Looking for counterexample graph for R*_1(2,2) of order 2
+    <BLANKLINE>
+    R*_1(2,2) <= 2
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+    assert n >= 0
+
+    rname = "R*_"+str(k)+"("+str(a)+","+str(b)+")"
+    print("Looking for counterexample graph for", rname, "of order",
+          n)
+    print()
+
+    g = find_counterexample(k, a, b, n, printflag)
+
+    if printflag:
+        print()
+    if g is None:
+        print(rname, "<=", n)
+    else:
+        graphname = "rs"+str(k)+"_"+str(a)+"_"+str(b)+"c1"
+        print(isograph.dot_str(g, graphname))
+        print()
+        print(rname, ">", n)
+
 
-def print_extremals(k, a, b, printflag=None):
+def print_extremals(k, a, b, printflag=None, **kwargs):
     """Print R*_k(a,b) + extremal graphs in DOT language.
 
     If printflag is True, prints, one on each line, pairs of the form
@@ -263,6 +991,7 @@ def print_extremals(k, a, b, printflag=None):
     b -- nonnegative int; the "b" in R*_k(a,b)
     printflag -- optional bool: whether to print ongoing messages
         Default is False.
+    Other keyword arguments are passed to genramsey.extremals.
 
     See isograph.py for our graph representation.
 
@@ -302,7 +1031,7 @@ def print_extremals(k, a, b, printflag=None):
     print("Finding R*_"+str(k)+"("+str(a)+","+str(b)+")")
     print()
 
-    n, gs = find_extremals(k, a, b, printflag)
+    n, gs = find_extremals(k, a, b, printflag, **kwargs)
 
     if printflag:
         print()
@@ -319,6 +1048,302 @@ def print_extremals(k, a, b, printflag=None):
     print(len(gs), "extremal graph(s)")
 
 
+# ----------------------------------------------------------------------
+# Parameter Grids
+# ----------------------------------------------------------------------
+
+
+# A graph with no a-vertex k-divided set has no (a+1)-vertex one, and no
+# a-vertex (k-1)-divided one, as a (k-1)-divided set is k-divided. The
+# same holds in the complement. So the counterexample graphs for k, a, b
+# are among those for k, a+1, b, for k, a, b+1, and, if k > 1, for k-1,
+# a, b. We say these triples *contain* k, a, b. A grid of triples is
+# done in an order in which each triple comes after those containing
+# it, and the levels of each are found by checking the levels saved for
+# one of these (see option source of genramsey.extremals).
+
+
+def parse_grid(specs):
+    """Return sorted list of triples (k, a, b) given by grid specs.
+
+    Each spec is a string of the form name=lo..hi or name=value, where
+    name is k, a, or b, and lo, hi, value are sums & differences of
+    nonnegative integers and names coming before name in the order k, a,
+    b. Each of k, a, b must be given once. Raises ValueError on a bad
+    spec, or if k is not positive, or a or b is negative.
+
+    Arguments:
+    specs -- iterable of strings: the specs
+
+    >>> parse_grid(["k=2..3", "a=5", "b=a..a+1"])
+    [(2, 5, 5), (2, 5, 6), (3, 5, 5), (3, 5, 6)]
+    >>> parse_grid(["b=a-1..a", "a=k+2", "k=1"])
+    [(1, 3, 2), (1, 3, 3)]
+    >>> parse_grid(["k=1", "a=b", "b=3"])
+    Traceback (most recent call last):
+      ...
+    ValueError: bad grid expression: b
+
+    """
+    bounds = {}
+    for spec in specs:
+        name, eq, rng = spec.partition("=")
+        if name not in ["k", "a", "b"] or not eq or name in bounds:
+            raise ValueError("bad grid spec: " + spec)
+        lo, dots, hi = rng.partition("..")
+        bounds[name] = (lo, hi if dots else lo)
+    if len(bounds) != 3:
+        raise ValueError("grid must give each of k, a, b")
+
+    triples = []
+    env = {}
+    def add(names):
+        # Add triples with values of names; env holds earlier values
+        if not names:
+            triples.append((env["k"], env["a"], env["b"]))
+            return
+        lo, hi = [ _grid_value(e, env) for e in bounds[names[0]] ]
+        if lo < (1 if names[0] == "k" else 0):
+            raise ValueError("grid values of k must be positive, " +
+                             "and of a, b nonnegative")
+        for v in range(lo, hi+1):
+            env[names[0]] = v
+            add(names[1:])
+        env.pop(names[0], None)
+
+    add(["k", "a", "b"])
+    return sorted(triples)
+
+
+def _grid_value(expr, env):
+    """Return value of grid expression expr, given values of names.
+
+    >>> _grid_value("a+2", {"a": 5}), _grid_value(" 7 - k ", {"k": 2})
+    (7, 5)
+
+    """
+    value = 0
+    sign = 1
+    for i, tok in enumerate(re.split(r"([+-])", expr)):
+        tok = tok.strip()
+        if i % 2:
+            sign = 1 if tok == "+" else -1
+        elif tok.isdigit():
+            value += sign * int(tok)
+        elif tok in env:
+            value += sign * env[tok]
+        elif tok or i == 0:
+            raise ValueError("bad grid expression: " + expr)
+    return value
+
+
+def _containers(k, a, b):
+    """Return triples containing k, a, b, as described above."""
+    result = [(k, a+1, b), (k, a, b+1)]
+    if k > 1:
+        result.append((k-1, a, b))
+    return result
+
+
+def grid_order(triples):
+    """Return list of distinct triples (k, a, b) in order to compute.
+
+    Each triple comes after each of the given triples that contain it,
+    as described above.
+
+    Arguments:
+    triples -- iterable yielding triples (k, a, b) of ints, with k
+      positive, and a, b nonnegative
+
+    >>> grid_order([(2, 3, 3), (1, 3, 3), (2, 3, 4), (2, 4, 3)])
+    [(1, 3, 3), (2, 4, 3), (2, 3, 4), (2, 3, 3)]
+
+    """
+    return sorted(set(triples), key=lambda t: (t[0], -t[1], -t[2]))
+
+
+def _saved_size(dirname):
+    """Return total size in bytes of files in directory dirname."""
+    return sum(os.path.getsize(os.path.join(dirname, name))
+               for name in os.listdir(dirname))
+
+
+def print_grid(triples, printflag=None, **kwargs):
+    """Print R*_k(a,b) + extremal graphs for each triple (k, a, b).
+
+    Triples are done in the order given by grid_order, each as by
+    print_extremals, with a blank line between them. The levels of a
+    triple contained in another one already done are found by checking
+    the levels of that one (of the smallest, if there are several),
+    which are saved in a temporary directory until no later triple can
+    use them. Set environment variable TMPDIR to choose its directory.
+    The results are the same as those of print_extremals, except that
+    extremal graphs may differ in order, and in labeling.
+
+    Arguments:
+    triples -- iterable yielding triples (k, a, b) of ints, with k
+      positive, and a, b nonnegative
+    printflag -- optional bool: as for print_extremals
+    Other keyword arguments are passed to genramsey.extremals. They
+    may not include workdir, checkpoint, resume, seed, duality or
+    source.
+
+    >>> print_grid([(1, 2, 2), (1, 2, 3)])
+    Finding R*_1(2,3)
+    <BLANKLINE>
+    1 extremal graph(s):
+    <BLANKLINE>
+    graph rs1_2_3e1 {
+        1; 2;
+        1 -- 2;
+    }
+    <BLANKLINE>
+    R*_1(2,3) = 3
+    1 extremal graph(s)
+    <BLANKLINE>
+    Finding R*_1(2,2)
+    <BLANKLINE>
+    1 extremal graph(s):
+    <BLANKLINE>
+    graph rs1_2_2e1 {
+        1;
+    }
+    <BLANKLINE>
+    R*_1(2,2) = 2
+    1 extremal graph(s)
+
+    """
+    order = grid_order(triples)
+    # last[t] is the index in order of the last triple containing t
+    last = {}
+    for i, t in enumerate(order):
+        for c in _containers(*t):
+            last[c] = i
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        saved = {}  # Checkpoint directory of each triple kept
+        for i, t in enumerate(order):
+            k, a, b = t
+            if i:
+                print()
+            sources = [ saved[c] for c in _containers(k, a, b)
+                        if c in saved ]
+            source = min(sources, key=_saved_size) if sources else None
+            checkpoint = None
+            if t in last:
+                checkpoint = os.path.join(tmpdir, "rs%d_%d_%d" % t)
+            print_extremals(k, a, b, printflag, checkpoint=checkpoint,
+                            source=source, **kwargs)
+            if checkpoint is not None:
+                saved[t] = checkpoint
+            for c in list(saved):
+                if last[c] <= i:
+                    shutil.rmtree(saved.pop(c))
+
+
+# ----------------------------------------------------------------------
+# Verifying Results
+# ----------------------------------------------------------------------
+
+
+def verify_extremals(k, a, b, checkpoint, **kwargs):
+    """Check a computation of R*_k(a,b); return (R*_k(a,b), extremals).
+
+    checkpoint is a directory in which every level of a finished
+    computation of R*_k(a,b) was saved, by option checkpoint of
+    find_extremals. Raises ValueError if the levels are not exactly the
+    counterexample graphs of each order. See genramsey.verify.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    checkpoint -- string: checkpoint directory
+    Other keyword arguments are passed to genramsey.verify.
+
+    See isograph.py for our graph representation.
+
+    >>> d = tempfile.mkdtemp()
+    >>> n, gs = find_extremals(1, 3, 3, checkpoint=d)
+    >>> verify_extremals(1, 3, 3, d, processes=1) == (n, gs)
+    True
+    >>> verify_extremals(1, 3, 4, d,
+    ...                  processes=1) #doctest: +ELLIPSIS
+    Traceback (most recent call last):
+      ...
+    ValueError: checkpoint does not match computation: ...
+    >>> shutil.rmtree(d)
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+
+    f1 = make_k_divided_func(k)
+    f2 = make_k_divided_compl_func(k)
+    return genramsey.verify(f1, f2, a, b, checkpoint, **kwargs)
+
+
+def print_verify(k, a, b, checkpoint, against=None, printflag=None,
+                 **kwargs):
+    """Check a computation of R*_k(a,b), and print the result.
+
+    See verify_extremals. If against is given, it is the name of a file
+    holding output of print_extremals, such as those in RESULTS; its
+    counts, if any, and extremal graphs are checked too. If printflag is
+    True, prints, one on each line, pairs of the form u v, where u is
+    an integer from 0 to R*_k(a, b), and v is the number of
+    counterexample graphs of order u, as each order is checked.
+
+    Arguments:
+    k -- positive int; the "k" in R*_k(a,b)
+    a -- nonnegative int; the "a" in R*_k(a,b)
+    b -- nonnegative int; the "b" in R*_k(a,b)
+    checkpoint -- string: checkpoint directory
+    against -- optional string: name of file of output to check
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+    Other keyword arguments are passed to genramsey.verify.
+
+    >>> d = tempfile.mkdtemp()
+    >>> n, gs = find_extremals(1, 2, 2, checkpoint=d)
+    >>> print_verify(1, 2, 2, d, printflag=True, processes=1)
+    Verifying R*_1(2,2)
+    <BLANKLINE>
+    Order & number of counterexample graphs:
+    0 1
+    1 1
+    2 0
+    <BLANKLINE>
+    R*_1(2,2) = 2 verified
+    1 extremal graph(s)
+    >>> shutil.rmtree(d)
+
+    """
+    assert k >= 1
+    assert a >= 0
+    assert b >= 0
+
+    rname = "R*_"+str(k)+"("+str(a)+","+str(b)+")"
+    print("Verifying", rname)
+    print()
+
+    counts, gs = None, None
+    if against is not None:
+        counts, gs = genramsey.read_results(against)
+    n, gs = verify_extremals(k, a, b, checkpoint, gs=gs,
+                             counts=counts, printflag=printflag,
+                             **kwargs)
+
+    if printflag:
+        print()
+    print(rname, "=", n, "verified")
+    print(len(gs), "extremal graph(s)")
+    if against is not None:
+        print("Matches", against if counts is None else
+              against + ", including counts")
+
+
 # ----------------------------------------------------------------------
 # Main program
 # ----------------------------------------------------------------------
@@ -361,10 +1386,35 @@ def main(argv=None):
         argv = sys.argv
 
     printcounterexamples = True
+    valueonly = False
+    satorder = None
+    coordinatordir = None
+    workerdir = None
+    lease = None
+    checkpoint = None
+    resume = False
+    memory = None
+    seed = None
+    enumeration = None
+    metrics = None
+    progress = None
+    profile = None
+    prune = False
+    duality = False
+    grid = False
+    verifydir = None
+    against = None
+    processes = None
     try:
         try:
             optlist, args = getopt.getopt(argv[1:], "hq",
-                ["help", "quiet", "test", "Test"])
+                ["help", "quiet", "test", "Test", "value-only", "sat=",
+                 "coordinator=",
+                 "worker=", "lease=", "checkpoint=", "resume=",
+                 "memory=", "seed=", "gray", "batch", "metrics=",
+                 "progress=", "profile=", "prune",
+                 "duality", "grid", "verify=",
+                 "against=", "processes="])
         except getopt.error as msg:
             raise UsageError(msg)
         for o, a in optlist:
@@ -373,6 +1423,66 @@ def main(argv=None):
                 return 0
             elif o in ["-q", "--quiet"]:
                 printcounterexamples = False
+            elif o == "--value-only":
+                valueonly = True
+            elif o == "--sat":
+                try:
+                    satorder = int(a)
+                except ValueError:
+                    raise UsageError("Order must be an integer")
+                if satorder < 0:
+                    raise UsageError("Order must be nonnegative")
+            elif o == "--coordinator":
+                coordinatordir = a
+            elif o == "--worker":
+                workerdir = a
+            elif o == "--lease":
+                try:
+                    lease = float(a)
+                except ValueError:
+                    raise UsageError("Lease must be a number")
+            elif o == "--checkpoint":
+                checkpoint = a
+            elif o == "--resume":
+                checkpoint = a
+                resume = True
+            elif o == "--seed":
+                seed = a
+            elif o == "--memory":
+                try:
+                    memory = int(float(a) * 1000000)
+                except ValueError:
+                    raise UsageError("Memory must be a number")
+            elif o == "--gray":
+                enumeration = "gray"
+            elif o == "--batch":
+                enumeration = "batch"
+            elif o == "--metrics":
+                metrics = a
+            elif o == "--progress":
+                try:
+                    progress = float(a)
+                except ValueError:
+                    raise UsageError("Progress must be a number")
+            elif o == "--profile":
+                profile = a
+            elif o == "--prune":
+                prune = True
+            elif o == "--duality":
+                duality = True
+            elif o == "--grid":
+                grid = True
+            elif o == "--verify":
+                verifydir = a
+            elif o == "--against":
+                against = a
+            elif o == "--processes":
+                try:
+                    processes = int(a)
+                except ValueError:
+                    raise UsageError("Processes must be an integer")
+                if processes < 1:
+                    raise UsageError("Processes must be positive")
             elif o == "--test" or o == "--Test":
                 import doctest  # for testmod
                 verbose = (o == "--Test")
@@ -384,20 +1494,79 @@ def main(argv=None):
                 return 0
             else:
                 assert False, "unhandled option"
-        if len(args) != 3:
+        if grid:
+            try:
+                triples = parse_grid(args)
+            except ValueError as err:
+                raise UsageError(str(err))
+            if (coordinatordir is not None or workerdir is not None or
+                checkpoint is not None or seed is not None or
+                valueonly or satorder is not None or duality):
+                raise UsageError("Cannot use --grid with " +
+                    "--coordinator, --worker, --checkpoint, " +
+                    "--resume, --seed, --value-only, --sat, " +
+                    "or --duality")
+        elif len(args) != 3:
             raise UsageError("Must have exactly 3 arguments")
-        try:
-            k = int(args[0])
-            a = int(args[1])
-            b = int(args[2])
-        except:
-            raise UsageError("Arguments must be integers")
+        else:
+            try:
+                k = int(args[0])
+                a = int(args[1])
+                b = int(args[2])
+            except:
+                raise UsageError("Arguments must be integers")
+        if coordinatordir is not None and workerdir is not None:
+            raise UsageError(
+                "Cannot use both --coordinator and --worker")
+        if verifydir is not None and (
+            grid or coordinatordir is not None or
+            workerdir is not None or checkpoint is not None or
+            seed is not None or valueonly or satorder is not None):
+            raise UsageError("Cannot use --verify with --grid, " +
+                "--coordinator, --worker, --checkpoint, --resume, " +
+                "--seed, --value-only, or --sat")
+        if against is not None and verifydir is None:
+            raise UsageError("Cannot use --against without --verify")
     except UsageError as err:
         print(argv[0]+":", err.msg, file=sys.stderr)
         print("For help use --help", file=sys.stderr)
         return 2
 
-    print_extremals(k, a, b, printflag=printcounterexamples)
+    # ValueError here means saved or shared files do not match k, a, b
+    try:
+        if grid:
+            print_grid(triples, printflag=printcounterexamples,
+                       memory=memory, enumeration=enumeration,
+                       metrics=metrics, progress=progress,
+                       profile=profile, prune=prune)
+            return 0
+        if verifydir is not None:
+            print_verify(k, a, b, verifydir, against=against,
+                         printflag=printcounterexamples,
+                         processes=processes)
+            return 0
+        if workerdir is not None:
+            work(k, a, b, workerdir, lease=lease,
+                 enumeration=enumeration, prune=prune,
+                 duality=duality)
+            return 0
+        if satorder is not None:
+            print_counterexample(k, a, b, satorder,
+                                 printflag=printcounterexamples)
+            return 0
+        if valueonly:
+            print_value(k, a, b, printflag=printcounterexamples)
+            return 0
+        print_extremals(k, a, b, printflag=printcounterexamples,
+                        workdir=coordinatordir, lease=lease,
+                        checkpoint=checkpoint, resume=resume,
+                        memory=memory, seed=seed,
+                        enumeration=enumeration, metrics=metrics,
+                        progress=progress, profile=profile,
+                        prune=prune, duality=duality)
+    except ValueError as err:
+        print(argv[0]+":", err, file=sys.stderr)
+        return 1
     return 0
 
 
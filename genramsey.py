@@ -16,7 +16,67 @@ sorted list or tuple of its elements.
 *Predicates* in this file are functions taking a graph and a set of
 vertices of that graph, and returning bool. Given a predicate f, and a
 graph g, we say a set s of vertices of g is an *f-set* in g if f(g, s)
-is True.
+is True. A predicate must not modify its arguments, and must keep no
+state between calls, so that it may be called from several threads at
+once.
+
+A predicate f may have an attribute f.with_last: a function taking a
+graph h, a collection vset of vertices of h, and a set ss of vertices of
+h, and returning f(g, ss + (n,)), where n is the order of h, and g is h
+along with a new vertex n adjacent to each vertex in vset. It should
+not construct g; in this way candidate graphs may be checked without
+making them.
+
+A predicate f may also have an attribute f.with_masks: a function
+taking a list adj of adjacency bitmasks of a graph g (bit w of adj[v]
+is 1 iff v, w are adjacent), a set s of vertices of g, and the bitmask
+smask of s (bit v is 1 iff v is in s), and returning f(g, s). Functions
+has_fset and has_fset_with_last then use bitmasks, so that f and
+f.with_last are not called; when candidate graphs are checked, the
+bitmasks of their common parent are made only once. See popcount.
+
+A predicate f may also have an attribute f.gray_tracker: a function
+taking a graph h and an int b, and returning a *tracker*. A tracker
+describes a graph g consisting of h along with a new vertex, whose
+neighborhood is initially empty. Its method toggle(v) adds vertex v of h
+to the neighborhood of the new vertex, or removes it, and its method
+has_fset() returns has_fset_with_last(f, b, g) for the current g. A
+tracker keeps whatever state it needs to make these quick; it is used by
+only one thread.
+
+A predicate f may also have an attribute f.batch_parts: a function
+taking a graph h and a positive int b, and returning a triple (compl,
+limit, sets), describing the f-sets of order b containing a new vertex
+n added to h, where n is the order of h. sets is a list with an item
+for each set ss of b-1 vertices of h for which ss + (n,) is an f-set
+for some neighborhood of n; ss for which it never is may be omitted.
+The item is a list of pairs (part, weight), where the parts are tuples
+of vertices of ss, together holding all of them, and each weight is a
+number. Given a neighborhood vset of
+n, a part is *touched* if it meets vset (if compl is False), or is not
+contained in vset (if compl is True). Then ss + (n,) is an f-set iff
+the total weight of the touched parts of ss is at most limit. This lets
+all neighborhoods of n be checked at once with array operations; see
+enumeration "batch" of extremals. For example, for is_independent,
+each independent ss has a single part, ss, with weight 1, and limit is
+0.
+
+A predicate f may also have an attribute f.cnf_witness, describing the
+sets that are not f-sets, so that f may be encoded for a SAT solver; see
+ramseysat.py.
+
+A predicate f may also have an attribute f.link_rule: a function taking
+a positive int b, and returning a pair (side, c), or None if it knows
+nothing. It says that, in any graph with no f-set of order b, the
+neighbors of each vertex (if side is 1), or its non-neighbors (if side
+is -1), induce a subgraph with no f-set of order c. For example, in a
+graph with no independent set of order b, the non-neighbors of a vertex
+have no independent set of order b-1. This bounds the degree of each
+new vertex; see option prune of extremals.
+
+A predicate may be a function, or an instance of a subclass of class
+Predicate. The latter may be compared, hashed, and pickled, so that it
+may be sent to other processes, and used to identify a computation.
 
 An *induced-hereditary* predicate is a predicate f such that, if h is an
 induced subgraph of a graph g, and s is a set of vertices of h, then s
@@ -30,34 +90,162 @@ f2-set of order b2.
 
 An *extremal* graph is a counterexample graph of maximum order.
 
+Predicates f1 & f2 are *dual* if f2 is f1.complement: an attribute of
+f1, for a function or a Predicate object, giving the predicate g with
+g(h, s) == f1(hc, s), where hc is the complement of h. The
+counterexample graphs for dual f1, f2 and b1, b2 are then the
+complements of those for f1, f2 and b2, b1; see option seed of
+extremals. If also b1 == b2, then the complement of a counterexample
+graph is one too; see option duality of extremals.
+
 Predicates:
 is_independent(g, s)
     Return bool: True if s is an independent set in graph g.
 is_clique(g, s)
     Return bool: True if s induces a complete subgraph of graph g.
+Predicate()
+    Base class for predicate objects, which are compared, hashed, and
+    pickled by class & arguments.
+Independent()
+    Predicate class. Same as is_independent.
+Clique()
+    Predicate class. Same as is_clique.
 
 Checking for f-Sets:
+popcount(x)
+    Return number of 1 bits in nonnegative int x.
 has_fset(f, b, g)
     Return bool: True if graph g contains an f-set of order b.
-has_fset_with_last(f, b, g)
+has_fset_with_last(f, b, g, vset=None, adj=None)
     Return bool: True if graph g contains an f-set of order b that
-    contains vertex n-1 of g.
+    contains vertex n-1 of g. If vset is given, g is taken to have a new
+    vertex n adjacent to the vertices in vset. adj may give the
+    adjacency bitmasks of g, for predicates with with_masks.
+
+Memoizing Predicates:
+Memoized(f, maxsize=65536, preload=-1)
+    Class. Predicate giving the same values as induced-hereditary
+    predicate f, looking them up by the subgraph induced by the set.
+
+Compact Storage of Levels:
+PackedLevel(order, gs=None)
+    Class. Compact sequence of graphs of the given order.
+PackedGraph(level, index)
+    Class. Lightweight view of one graph in a PackedLevel or LevelFile.
+write_level_file(path, order, gs, header=None)
+    Atomically write graphs of the given order to a level file, with
+    fixed-width records.
+LevelFile(path)
+    Class. Read-only, memory-mapped, random access to a level file.
 
 Finding Extremal Graphs:
-extremals(f1, f2, b1, b2, printflag=None)
+iter_levels(f1, f2, b1, b2, workdir=None, ...)
+    Generator. Yield a Level object, giving the order, number, and
+    graphs of the counterexample graphs of each order, and the time
+    taken, as soon as that order is computed.
+Level(order, count, graphs, seconds)
+    Class. Counterexample graphs of one order, as yielded by
+    iter_levels.
+extremals(f1, f2, b1, b2, printflag=None, workdir=None, ...)
     f1, f2 are induced-hereditary predicates. Return (n, gs), where n is
     the least order for which no counterexample graphs exist (and so n-1
     is the order of all extremal graphs), and gs is a list of all
     extremal graphs (exactly one from each isomorphism class). If
     printflag is True, prints, one on each line, pairs of the form u v,
     where u is an integer from 0 to n, and v is the number of
-    counterexample graphs of order u.
+    counterexample graphs of order u. If workdir is given, then the
+    computation is shared with worker processes; see below. If
+    checkpoint is given, each level is saved in that directory, and
+    resume=True continues a computation from the levels saved there.
+    If seed is given, the computation starts from the level saved in
+    that file.
+
+Depth-First Search:
+find_counterexample(f1, f2, b1, b2, n)
+    Return a counterexample graph of order n, or None if there is none.
+ramsey_value(f1, f2, b1, b2, printflag=None)
+    Return (n, g), where n is as for extremals, and g is a single
+    extremal graph (None if n is 0). Holds only a path of the search
+    tree, and visits each isomorphism class once.
+
+Verifying Computations:
+verify(f1, f2, b1, b2, checkpoint, gs=None, counts=None, ...)
+    Check that the levels saved in directory checkpoint by extremals
+    are exactly the counterexample graphs of each order, one from each
+    isomorphism class, each order being checked against the one below,
+    in several processes. Return (n, gs), as for extremals. If gs or
+    counts are given, check that they are the extremal graphs, or the
+    numbers of counterexample graphs of each order. Raises ValueError
+    if a check fails.
+read_results(path)
+    Return (counts, gs): the numbers of counterexample graphs and the
+    graphs in a file of printed output, such as those in RESULTS.
+
+Distributed Computation:
+work(workdir, f1, f2, b1, b2, lease=None, poll=None, ...)
+    Act as a worker for a call to extremals with the same workdir and
+    other arguments, until that computation is finished. Return the
+    number of shards processed.
+
+SHARDED COMPUTATION
+
+When extremals is given a workdir, it acts as a *coordinator*. For each
+order n, it writes the counterexample graphs of order n-1 (the
+*parents*) as shard files in a level directory in workdir. Any number of
+*workers* -- calls to function work, typically in other processes or on
+other machines sharing the filesystem -- claim shards by renaming them,
+compute the counterexample graphs of order n having the parents in the
+shard as induced subgraphs, and write these as output files. The
+coordinator also processes shards itself. When every shard has output,
+the coordinator merges the outputs, discarding isomorphic duplicates, to
+obtain the counterexample graphs of order n.
+
+Directory layout (NNN is the order being computed):
+
+    workdir/job               Parameters of the computation
+    workdir/NNN/todo/SSSSSS   Shard waiting to be claimed
+    workdir/NNN/claimed/SSSSSS.ID  Shard claimed by worker ID
+    workdir/NNN/out/SSSSSS    Output from shard
+    workdir/done              Written when computation is finished
+
+A claimed shard is *leased* to its worker, which renews the lease as it
+works by updating the modification time of the claimed file. A shard
+whose lease has expired, because its worker crashed, say, is returned to
+todo/ by whichever process notices. Processing a shard twice does no
+harm. All files are written atomically: written under a temporary name
+beginning with ".", then renamed.
+
+Graph files hold one graph per line in graph6 format (see isograph.py),
+after header lines, each beginning with "#".
 
 """
 
-import isograph   # for graphs, isomorphic, powerset, unique_iso
-import itertools  # for combinations, count
-import sys        # for argv, exit
+import isograph   # for graph6_str, from_graph6, graphs, isomorphic,
+                  #  powerset, unique_iso
+import collections  # for Counter
+import cProfile   # for Profile
+import functools  # for lru_cache
+import heapq      # for merge
+import itertools  # for chain, combinations, count
+import json       # for dumps
+import mmap       # for ACCESS_READ, mmap
+import multiprocessing  # for Pool
+import os         # for close, cpu_count, fsync, getpid, listdir,
+                  #  makedirs, open, path, remove, rename, replace,
+                  #  stat, utime
+import pstats     # for Stats
+import shutil     # for rmtree
+import signal     # for signal, SIGUSR1
+import socket     # for gethostname
+import struct     # for Struct
+import sys        # for argv, exit, platform, stderr
+import tempfile   # for mkdtemp, TemporaryDirectory
+import threading  # for get_ident, local, Lock, Thread
+import time       # for sleep, time
+try:
+    import resource  # for getrusage, RUSAGE_SELF; not on Windows
+except ImportError:
+    resource = None
 
 
 # ----------------------------------------------------------------------
@@ -133,11 +321,271 @@ def is_clique(g, s):
     return True
 
 
+class _IndependentTracker:
+    """Tracker for is_independent or, if compl is True, is_clique.
+
+    See the beginning of this file for trackers. Say N is the
+    neighborhood of the new vertex in h, or, if compl is True, its
+    neighborhood in the complement of h. For each order-(b-1)
+    independent set ss in h (or in its complement), we keep the number
+    of vertices of ss in N; ss plus the new vertex is an independent set
+    iff this number is zero. We also keep the number of such ss for
+    which it is zero.
+
+    >>> t = _IndependentTracker([[1], [0], []], 3, False)
+    >>> t.has_fset()
+    True
+    >>> t.toggle(0); t.has_fset()
+    True
+    >>> t.toggle(2); t.has_fset()
+    False
+
+    """
+
+    def __init__(self, h, b, compl):
+        m = len(h)
+        self._inn = [compl] * m  # _inn[v] is True if v lies in N
+        self._sets = [ [] for v in range(m) ]  # Indices of ss holding v
+        self._hits = []          # Number of vertices of each ss in N
+        if 1 <= b <= m+1:
+            for ss in itertools.combinations(range(m), b-1):
+                if (is_clique if compl else is_independent)(h, ss):
+                    for v in ss:
+                        self._sets[v].append(len(self._hits))
+                    self._hits.append(len(ss) if compl else 0)
+        self._good = self._hits.count(0)
+
+    def toggle(self, v):
+        self._inn[v] = not self._inn[v]
+        d = 1 if self._inn[v] else -1
+        hits = self._hits
+        for i in self._sets[v]:
+            if not hits[i]:
+                self._good -= 1
+            hits[i] += d
+            if not hits[i]:
+                self._good += 1
+
+    def has_fset(self):
+        return self._good > 0
+
+
+is_independent.with_last = (
+    lambda h, vset, ss: is_independent(h, ss) and
+                        not any(v in vset for v in ss))
+is_clique.with_last = (
+    lambda h, vset, ss: all(v in vset for v in ss) and is_clique(h, ss))
+is_independent.with_masks = (
+    lambda adj, s, smask: not any(adj[v] & smask for v in s))
+is_clique.with_masks = (
+    lambda adj, s, smask: all((adj[v] | 1 << v) & smask == smask
+                              for v in s))
+is_independent.gray_tracker = (
+    lambda h, b: _IndependentTracker(h, b, False))
+is_clique.gray_tracker = lambda h, b: _IndependentTracker(h, b, True)
+is_independent.cnf_witness = (2, [[(0, 1, True)]])  # An edge
+is_clique.cnf_witness = (2, [[(0, 1, False)]])  # A non-edge
+is_independent.link_rule = lambda b: (-1, b-1) if b > 0 else None
+is_independent.complement = is_clique
+is_clique.complement = is_independent
+is_independent.batch_parts = (
+    lambda h, b: _independent_parts(h, b, False))
+is_clique.batch_parts = lambda h, b: _independent_parts(h, b, True)
+is_clique.link_rule = lambda b: (1, b-1) if b > 0 else None
+
+
+def _independent_parts(h, b, compl):
+    """Return batch_parts(h, b) for is_independent, or is_clique.
+
+    See the beginning of this file. If compl is True, the result is for
+    is_clique: each clique ss gives an f-set iff ss is contained in the
+    neighborhood of the new vertex. Otherwise, each independent ss gives
+    one iff it does not meet the neighborhood.
+
+    >>> _independent_parts([[1], [0], []], 2, False)
+    (False, 0, [[((0,), 1)], [((1,), 1)], [((2,), 1)]])
+    >>> _independent_parts([[1], [0], []], 3, True)
+    (True, 0, [[((0, 1), 1)]])
+
+    """
+    nbrs = [ set(a) for a in h ]
+    sets = []
+    for ss in itertools.combinations(range(len(h)), b-1):
+        if all((y in nbrs[x]) == compl
+               for x, y in itertools.combinations(ss, 2)):
+            sets.append([(ss, 1)])
+    return compl, 0, sets
+
+
+class Predicate:
+    """Base class for predicate objects.
+
+    A subclass defines __call__(g, s), and sets _fields to a tuple of
+    the names of the arguments of its constructor, which are stored as
+    attributes of the same names. Objects are equal if they have the
+    same class and argument values, and they are hashed, pickled, and
+    printed accordingly.
+
+    A subclass may also define methods with_last, with_masks,
+    gray_tracker, batch_parts, and link_rule (see the beginning of this
+    file), and override these attributes:
+
+    complement -- predicate object g such that g(h, s) == f(hc, s),
+      where hc is the complement of h; None if unknown.
+    monotone -- 1 if adding an edge to a graph never makes an f-set not
+      an f-set, -1 if removing an edge never does, 0 if unknown.
+
+    """
+
+    _fields = ()
+    monotone = 0
+
+    @property
+    def complement(self):
+        return None
+
+    def _args(self):
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other):
+        return (type(self) is type(other) and
+                self._args() == other._args())
+
+    def __hash__(self):
+        return hash((type(self).__qualname__,) + self._args())
+
+    def __repr__(self):
+        return (type(self).__qualname__ + "(" +
+                ", ".join(repr(a) for a in self._args()) + ")")
+
+    def __reduce__(self):
+        return (type(self), self._args())
+
+
+class Independent(Predicate):
+    """Predicate class: Independent()(g, s) == is_independent(g, s).
+
+    >>> Independent()([[1], [0], []], (0, 2))
+    True
+    >>> Independent().complement
+    Clique()
+
+    """
+
+    monotone = -1
+
+    @property
+    def complement(self):
+        return Clique()
+
+    def __call__(self, g, s):
+        return is_independent(g, s)
+
+    def with_last(self, h, vset, ss):
+        return is_independent.with_last(h, vset, ss)
+
+    def with_masks(self, adj, s, smask):
+        return is_independent.with_masks(adj, s, smask)
+
+    def gray_tracker(self, h, b):
+        return _IndependentTracker(h, b, False)
+
+    def batch_parts(self, h, b):
+        return _independent_parts(h, b, False)
+
+    def link_rule(self, b):
+        return is_independent.link_rule(b)
+
+    cnf_witness = is_independent.cnf_witness
+
+
+class Clique(Predicate):
+    """Predicate class: Clique()(g, s) == is_clique(g, s).
+
+    >>> Clique()([[1], [0], []], (0, 1))
+    True
+    >>> Clique() == Clique(), Clique() == Independent()
+    (True, False)
+
+    """
+
+    monotone = 1
+
+    @property
+    def complement(self):
+        return Independent()
+
+    def __call__(self, g, s):
+        return is_clique(g, s)
+
+    def with_last(self, h, vset, ss):
+        return is_clique.with_last(h, vset, ss)
+
+    def with_masks(self, adj, s, smask):
+        return is_clique.with_masks(adj, s, smask)
+
+    def gray_tracker(self, h, b):
+        return _IndependentTracker(h, b, True)
+
+    def batch_parts(self, h, b):
+        return _independent_parts(h, b, True)
+
+    def link_rule(self, b):
+        return is_clique.link_rule(b)
+
+    cnf_witness = is_clique.cnf_witness
+
+
 # ----------------------------------------------------------------------
 # Checking for f-Sets
 # ----------------------------------------------------------------------
 
 
+def popcount(x):
+    """Return number of 1 bits in nonnegative int x.
+
+    For use by with_masks functions (see the beginning of this file).
+
+    >>> popcount(0b1011)
+    3
+
+    """
+    return bin(x).count("1")
+
+
+if hasattr(int, "bit_count"):  # Python 3.10 and later; faster
+    popcount = int.bit_count
+
+
+def _adjacency_masks(g):
+    """Return list of adjacency bitmasks of g, as for with_masks.
+
+    >>> _adjacency_masks([[1], [0, 2], [1]])
+    [2, 5, 2]
+
+    """
+    return [ sum([ 1 << w for w in nbrs ]) for nbrs in g ]
+
+
+@functools.lru_cache(maxsize=32)
+def _sets_with_last(n, b):
+    """Return list of pairs (s, smask) for f-sets containing vertex n-1.
+
+    s runs over the sorted b-tuples of vertices in range(n) containing
+    n-1, in the order given by itertools.combinations, and smask is the
+    bitmask of s, as for with_masks. The same n & b are asked for with
+    each candidate graph of a level, so the lists are cached; the list
+    returned must not be modified.
+
+    >>> _sets_with_last(3, 2)
+    [((0, 2), 5), ((1, 2), 6)]
+
+    """
+    last = 1 << (n-1)
+    return [ (ss + (n-1,), sum([ 1 << v for v in ss ]) + last)
+             for ss in itertools.combinations(range(n-1), b-1) ]
+
+
 def has_fset(f, b, g):
     """Return True if g contains an f-set of order b.
 
@@ -179,21 +627,45 @@ def has_fset(f, b, g):
     if b > n:
         return False
 
+    with_masks = getattr(f, "with_masks", None)
+    if with_masks is not None:
+        adj = _adjacency_masks(g)
+        # Sets & their bitmasks, in step
+        sets = zip(itertools.combinations(range(n), b),
+                   itertools.combinations([ 1 << v for v in range(n) ],
+                                          b))
+        for s, bits in sets:
+            if with_masks(adj, s, sum(bits)):
+                return True
+        return False
+
     for s in itertools.combinations(range(n), b):
         if f(g, s):
             return True
     return False
 
 
-def has_fset_with_last(f, b, g):
+def has_fset_with_last(f, b, g, vset=None, adj=None):
     """Return True if g contains f-set of order b containing vertex n-1.
 
+    If vset is given, then we consider, not g, but the graph consisting
+    of g along with a new vertex adjacent to each vertex in vset, and
+    look for an f-set containing the new vertex. If f has a with_masks
+    or with_last attribute (see the beginning of this file), then this
+    graph is never constructed.
+
     Arguments:
     f -- predicate
       Given a graph and a subset of its vertex set, returns bool.
     g -- graph
     b -- nonnegative int
       We search for an order-b f-set.
+    vset -- optional collection (supporting "in") of vertices of g
+      Default is None: consider g itself.
+    adj -- optional list: adjacency bitmasks of g, as returned by
+      _adjacency_masks(g); used only if f has a with_masks attribute.
+      Callers checking many vsets with the same g should pass it, so
+      that it is made only once. Default is None: make it here.
 
     See isograph.py for our graph representation.
 
@@ -216,11 +688,53 @@ def has_fset_with_last(f, b, g):
     True
     >>> has_fset_with_last(is_clique, 3, g)
     False
+    >>> has_fset_with_last(is_clique, 3, [[1], [0, 2], [1]], (0, 1))
+    True
+    >>> has_fset_with_last(lambda g, s: is_clique(g, s), 3,
+    ...                    [[1], [0, 2], [1]], (1, 2))
+    True
+    >>> g = [[1], [0, 2], [1]]
+    >>> has_fset_with_last(Clique(), 3, g, (0, 1),
+    ...                    adj=_adjacency_masks(g))
+    True
 
     """
     if b < 1:
         return False
 
+    with_masks = getattr(f, "with_masks", None)
+    if with_masks is not None:
+        if adj is None:
+            adj = _adjacency_masks(g)
+        n = len(g)
+        if vset is not None:
+            # Add the new vertex
+            adj = adj[:]
+            new = 0
+            for v in vset:
+                adj[v] |= 1 << n
+                new |= 1 << v
+            adj.append(new)
+            n += 1
+        if b > n:
+            return False
+        for s, smask in _sets_with_last(n, b):
+            if with_masks(adj, s, smask):
+                return True
+        return False
+
+    if vset is not None:
+        with_last = getattr(f, "with_last", None)
+        if with_last is None:
+            g = _add_vertex(g, sorted(vset))
+        else:
+            if b > len(g)+1:
+                return False
+            for ss in itertools.combinations(range(len(g)), b-1):
+                if with_last(g, vset, ss):
+                    return True
+            return False
+
     n = len(g)
     if b > n:
         return False
@@ -232,139 +746,3528 @@ def has_fset_with_last(f, b, g):
     return False
 
 
+class _Tracker:
+    """Tracker for a predicate with no gray_tracker attribute.
+
+    See the beginning of this file for trackers. We keep the current
+    neighborhood of the new vertex, and call has_fset_with_last.
+
+    >>> t = _Tracker(is_clique, [[1], [0]], 3)
+    >>> t.toggle(0); t.toggle(1); t.has_fset()
+    True
+    >>> t.toggle(0); t.has_fset()
+    False
+
+    """
+
+    def __init__(self, f, h, b):
+        self._f = f
+        self._b = b
+        self._h = h
+        self._adj = _adjacency_masks(h)
+        self._vset = set()
+
+    def toggle(self, v):
+        self._vset ^= {v}
+
+    def has_fset(self):
+        return has_fset_with_last(self._f, self._b, self._h, self._vset,
+                                  self._adj)
+
+
+def _tracker(f, h, b):
+    """Return tracker for predicate f, graph h, order b."""
+    make = getattr(f, "gray_tracker", None)
+    if make is None:
+        return _Tracker(f, h, b)
+    return make(h, b)
+
+
 # ----------------------------------------------------------------------
-# Finding Extremal Graphs
+# Memoizing Predicates
 # ----------------------------------------------------------------------
 
 
-def _counterexamples_zero(f1, f2, b1, b2):
-    """Yield all counterexample graphs of order zero.
+class Memoized:
+    """Predicate wrapper that remembers values of another predicate.
+
+    Memoized(f) is a predicate giving the same values as the
+    induced-hereditary predicate f. Since f(g, s) depends only on the
+    subgraph induced by s, we encode that subgraph, with the vertices
+    relabeled by their positions in s, as an edge code (see
+    isograph.edge_code), and look up the value of f for that code.
+    Values not found are computed by calling f on the subgraph, and kept
+    in a table of at most maxsize entries, discarding the least recently
+    used. Values for all sets of order at most preload are computed in
+    advance; there are 2**(m*(m-1)//2) subgraphs of order m.
+
+    A Memoized object has a with_last attribute, and also gray_tracker
+    and batch_parts attributes if f has them (see the beginning of this
+    file). It may be called from several threads at once, and pickled,
+    if f may be. Its predicate ID in file headers is that of f.
 
     Arguments:
-    f1 -- predicate
-    f2 -- predicate
-    b1 -- nonnegative int
-    b2 -- nonnegative int
+    f -- induced-hereditary predicate
+    maxsize -- optional int: maximum number of values kept, or None for
+      no limit. Default is 65536.
+    preload -- optional int: maximum order of sets whose values are
+      computed in advance. Default is -1: none.
 
-    See isograph.py for our graph representation.
+    >>> mf = Memoized(is_clique, preload=3)
+    >>> mf([[1, 2], [0, 2], [0, 1], []], [0, 1, 2])
+    True
+    >>> mf([[1, 2], [0, 2], [0, 1], []], [0, 2, 3])
+    False
+    >>> extremals(Memoized(is_independent), mf, 3, 3)
+    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
 
     """
-    gs = list(isograph.graphs(0))  # list of all graphs of order 0
-    for g in gs:
-        if not has_fset(f1, b1, g) and not has_fset(f2, b2, g):
-            yield g
 
+    def __init__(self, f, maxsize=1 << 16, preload=-1):
+        self.__wrapped__ = f
+        self._maxsize = maxsize
+        self._preload = preload
+        self._lookup = functools.lru_cache(maxsize)(self._compute)
+        self._local = threading.local()
+        # _tables[m][code] is the value of f for order-m code
+        self._tables = [ bytes(self._compute(m, code)
+                               for code in range(1 << (m*(m-1)//2)))
+                         for m in range(preload+1) ]
+        if hasattr(f, "gray_tracker"):
+            self.gray_tracker = f.gray_tracker
+        if hasattr(f, "batch_parts"):
+            self.batch_parts = f.batch_parts
 
-def _counterexamples_up(f1, f2, b1, b2, n, old):
-    """Yield counterexample n-graphs, given list for n-1.
+    def __reduce__(self):
+        return (Memoized, (self.__wrapped__, self._maxsize,
+                           self._preload))
 
-    Given induced-hereditary predicates f1, f2, and nonnegative integers
-    b1, b2, yield one graph from each isomorphism class of n-vertex
-    counterexample graphs, given an iterable (old) yielding all
-    counterexample graphs of order n-1.
+    def __repr__(self):
+        return "Memoized(" + repr(self.__wrapped__) + ")"
 
-    Arguments:
-    f1 -- induced-hereditary predicate
-    f2 -- induced-hereditary predicate
-    b1 -- nonnegative int
-    b2 -- nonnegative int
-    n -- positive int
-      Order of graphs to yield.
-    old -- iterable yielding graphs of order n-1
-      Graphs yielded should be all counterexample graphs of order n-1.
+    def _compute(self, m, code):
+        return self.__wrapped__(isograph.from_edge_code(m, code),
+                                tuple(range(m)))
 
-    See isograph.py for our graph representation.
+    def _value(self, m, code):
+        if m < len(self._tables):
+            return bool(self._tables[m][code])
+        return self._lookup(m, code)
 
-    >>> f1 = is_independent
-    >>> f2 = is_clique
-    >>> ce4_0_3_3 = [[[2], [3], [0], [1]], [[1,2], [0,3], [0], [1]],
-    ... [[1,2], [0,3], [0,3], [1,2]]] # order-4 ctrexamples for R_0(3,3)
-    >>> ce5_0_3_3 = list(_counterexamples_up(f1,f2,3,3,5,ce4_0_3_3))
-    >>> len(ce5_0_3_3)
+    def __call__(self, g, s):
+        return self._value(len(s), _induced_code(g, s))
+
+    def with_last(self, h, vset, ss):
+        # Many candidates share the parent h, so each thread keeps the
+        # codes of the subgraphs of the last h it saw.
+        local = self._local
+        if getattr(local, "h", None) is not h:
+            local.h = h
+            local.codes = {}
+        code = local.codes.get(ss)
+        if code is None:
+            code = local.codes[ss] = _induced_code(h, ss)
+        # The new vertex comes last, at position m
+        m = len(ss)
+        base = m*(m-1)//2
+        for j, v in enumerate(ss):
+            if v in vset:
+                code |= 1 << (base + j)
+        return self._value(m+1, code)
+
+
+def _induced_code(g, s):
+    """Return edge code of subgraph of g induced by s, relabeled.
+
+    Vertex s[i] of g becomes vertex i.
+
+    >>> _induced_code([[1, 2], [0], [0]], (1, 0))
     1
-    >>> c5 = [[1,4], [0,2], [1,3], [2,4], [0,3]]
-    >>> isograph.isomorphic(ce5_0_3_3[0], c5)
-    True
-    >>> list(_counterexamples_up(f1,f2,3,3,6,ce5_0_3_3))
-    []
+    >>> _induced_code([[1, 2], [0], [0]], (1, 2))
+    0
 
     """
-    # Helper function counterexamples_up_big_list: generates every
-    # counterexample graph of order n whose subgraph induced by vertices
-    # 0 .. n-2 is an item in old.
-    def counterexamples_up_big_list(f1, f2, n, b1, b2, old):
-        for oldg in old:
-            for vset in isograph.powerset(range(n-1)):
-                g = oldg + [list(vset)]
-                for v in vset:
-                    g[v] = g[v]+[n-1]
-                    # NOT g[v] += ... or g[v].append(...),
-                    #  to avoid changing items in oldg
-                # Now g is candidate graph.
-                # Yield it if no order-b1 f1-set & no order-b2 f2-set
-                if (not has_fset_with_last(f1, b1, g) and
-                    not has_fset_with_last(f2, b2, g)):
-                    yield g
-
-    return isograph.unique_iso(
-        counterexamples_up_big_list(f1, f2, n, b1, b2, old))
-
-
-def extremals(f1, f2, b1, b2, printflag=None):
-    """Return 1 + order of extremal graphs, list of extremal graphs.
+    pos = { v: i for i, v in enumerate(s) }
+    code = 0
+    for j, v in enumerate(s):
+        for x in g[v]:
+            i = pos.get(x)
+            if i is not None and i < j:
+                code |= 1 << (j*(j-1)//2 + i)
+    return code
 
-    Return (n, gs), where n is 1 + order of an extremal graph, or 0 if
-    no counterexample graph exists, and gs is a list of all extremal
-    graphs.
 
-    If printflag is True, prints, one on each line, pairs of the form
-    u v, where u is an integer from 0 to n, and v is the number of
-    counterexample graphs of order u.
+# ----------------------------------------------------------------------
+# Performance Metrics
+# ----------------------------------------------------------------------
 
-    Arguments:
-    f1 -- induced-hereditary predicate
-    f2 -- induced-hereditary predicate
-    b1 -- nonnegative int
-    b2 -- nonnegative int
-    printflag -- optional bool: whether to print ongoing messages
-        Default is False.
 
-    See isograph.py for our graph representation.
+# _METRICS_KEYS - keys of metrics records, in order:
+#   order        order of graphs in level
+#   count        number of counterexample graphs found
+#   seconds      wall-clock time taken
+#   parents      graphs of previous order processed
+#   candidates   candidate graphs checked
+#   f1_calls, f2_calls      calls to each predicate; with enumeration
+#     "gray", each query of a tracker made by gray_tracker counts as
+#     one call, and with "batch", so does each candidate checked by
+#     _batch_hits
+#   f1_rejects, f2_rejects  candidates rejected by each predicate
+#     (a candidate rejected by f1 is not checked with f2)
+#   iso_checks   pairs of graphs checked for isomorphism
+#   iso_perms    vertex permutations tried in those checks
+#   peak_rss_kb  peak resident set size of process so far, in KiB
+#     (None if unknown)
+_METRICS_KEYS = ("order", "count", "seconds", "parents", "candidates",
+                 "f1_calls", "f2_calls", "f1_rejects", "f2_rejects",
+                 "iso_checks", "iso_perms", "peak_rss_kb")
 
-    >>> f1 = is_independent
-    >>> f2 = is_clique
-    >>> extremals(f1, f2, 3, 3)
-    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
-    >>> extremals(f1, f2, 3, 3, True)
-    Order & number of counterexample graphs:
-    0 1
-    1 1
-    2 2
-    3 2
-    4 3
-    5 1
-    6 0
-    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
+
+class _Counted:
+    """Predicate wrapper counting calls to f in stats[key].
+
+    Calls to methods with_last and with_masks, if f has them, are
+    counted too. Tracker work (see gray_tracker) and batch work (see
+    batch_parts) do not call these; they are counted instead by
+    _extend_gray and _extend_batch, as described at _METRICS_KEYS.
 
     """
-    if printflag:
-        print("Order & number of counterexample graphs:")
 
-    gs = list(_counterexamples_zero(f1, f2, b1, b2))
-    howmany = len(gs)
-    if printflag:
-        print(0, howmany)
-    if howmany == 0:
-        return (0, [])
-
-    for n in itertools.count(1):
-        oldgs = gs
-        gs = list(_counterexamples_up(f1, f2, b1, b2, n, oldgs))
-        howmany = len(gs)
-        if printflag:
-            print(n, howmany)
-        if howmany == 0:
-            return (n, oldgs)
+    def __init__(self, f, stats, key):
+        self.__wrapped__ = f
+        self._stats = stats
+        self._key = key
+        if hasattr(f, "with_last"):
+            self.with_last = self._with_last
+        if hasattr(f, "with_masks"):
+            self.with_masks = self._with_masks
+        if hasattr(f, "gray_tracker"):
+            self.gray_tracker = f.gray_tracker
+        if hasattr(f, "batch_parts"):
+            self.batch_parts = f.batch_parts
+
+    def __call__(self, g, s):
+        self._stats[self._key] += 1
+        return self.__wrapped__(g, s)
+
+    def _with_last(self, h, vset, ss):
+        self._stats[self._key] += 1
+        return self.__wrapped__.with_last(h, vset, ss)
+
+    def _with_masks(self, adj, s, smask):
+        self._stats[self._key] += 1
+        return self.__wrapped__.with_masks(adj, s, smask)
+
+
+def _peak_rss_kb():
+    """Return peak resident set size of process in KiB, or None."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss //= 1024  # Given in bytes on macOS
+    return rss
+
+
+def _level_metrics(order, count, seconds, stats):
+    """Return metrics record (dict) for a level; see _METRICS_KEYS.
+
+    >>> m = _level_metrics(3, 2, 0.5, collections.Counter(parents=2))
+    >>> [ m[key] for key in _METRICS_KEYS[:6] ]
+    [3, 2, 0.5, 2, 0, 0]
+
+    """
+    record = { key: stats[key] for key in _METRICS_KEYS }
+    record["order"] = order
+    record["count"] = count
+    record["seconds"] = seconds
+    record["peak_rss_kb"] = _peak_rss_kb()
+    return record
+
+
+def _emit_metrics(metrics, record):
+    """Pass record to callable metrics, or append to file as JSON."""
+    if callable(metrics):
+        metrics(record)
+    else:
+        with open(metrics, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+# ----------------------------------------------------------------------
+# Progress Reports
+# ----------------------------------------------------------------------
+
+
+class _Progress:
+    """Progress in computing a level, for reports to stderr.
+
+    The computation of each level calls start_level, then step as each
+    unit of work (a parent graph, or a shard) is done, and found as each
+    counterexample graph is found. If interval is positive, a report is
+    printed whenever interval seconds have passed since the last. Method
+    report prints one at once; it is called on signal SIGUSR1, if
+    install_handler was called. Methods step and found may be called
+    from several threads.
+
+    >>> p = _Progress(0)
+    >>> p.start_level(5, 4, "parents", 16)
+    >>> p.step(); p.found()
+    >>> p.line().split(",")[:2]
+    ['order 5: 1/4 parents (25.0%)', ' 1 graphs found']
+
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._oldhandler = None
+        self.start_level(0, 0, "parents", 0)
+
+    def start_level(self, order, total, unit, candidates_per_unit):
+        self.order = order
+        self.total = total
+        self.unit = unit
+        self.candidates_per_unit = candidates_per_unit
+        self.done = 0
+        self.classes = 0
+        self.start = time.time()
+        self._last = self.start
+
+    def step(self, k=1):
+        with self._lock:
+            self.done += k
+        self._maybe_report()
+
+    def set_done(self, done):
+        self.done = done
+        self._maybe_report()
+
+    def found(self):
+        with self._lock:
+            self.classes += 1
+
+    def counted(self, gs):
+        """Yield items of iterable gs, calling found for each."""
+        for g in gs:
+            self.found()
+            yield g
+
+    def _maybe_report(self):
+        if self.interval > 0:
+            now = time.time()
+            if now - self._last >= self.interval:
+                self._last = now
+                self.report()
+
+    def line(self):
+        """Return progress report, as a string."""
+        elapsed = max(time.time() - self.start, 1e-9)
+        done = self.done
+        total = self.total
+        percent = 100.0 * done / total if total else 100.0
+        rate = done * self.candidates_per_unit / elapsed
+        if done:
+            eta = _hms(elapsed * (total - done) / done)
+        else:
+            eta = "?"
+        return ("order %d: %d/%d %s (%.1f%%), %d graphs found, "
+                "%.0f candidates/s, elapsed %s, ETA %s"
+                % (self.order, done, total, self.unit, percent,
+                   self.classes, rate, _hms(elapsed), eta))
+
+    def report(self):
+        print(self.line(), file=sys.stderr, flush=True)
+
+    def install_handler(self):
+        """Report on SIGUSR1, if possible. Return bool: success."""
+        if (not hasattr(signal, "SIGUSR1") or
+            threading.current_thread() is not threading.main_thread()):
+            return False
+        self._oldhandler = signal.signal(signal.SIGUSR1,
+                                         lambda signum, frame:
+                                         self.report())
+        return True
+
+    def remove_handler(self):
+        """Undo install_handler."""
+        if self._oldhandler is not None:
+            signal.signal(signal.SIGUSR1, self._oldhandler)
+            self._oldhandler = None
+
+
+def _hms(seconds):
+    """Return string H:MM:SS for a number of seconds.
+
+    >>> _hms(3725.4)
+    '1:02:05'
+
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "%d:%02d:%02d" % (hours, minutes, seconds)
+
+
+# ----------------------------------------------------------------------
+# Profiling
+# ----------------------------------------------------------------------
+
+
+# _PROFILE_COLUMNS - columns of profile summary table, after order and
+# total time: (heading, names of functions in this file or isograph.py).
+# Each column gives the time spent in calls to the functions listed,
+# including functions they call, except that candidate graphs are
+# generated lazily, so time in the "extend" functions is not counted in
+# "dedup". Column "pred" is the time spent in the predicates, and is
+# handled separately.
+_PROFILE_COLUMNS = (
+    ("extend", ("_extend", "_extend_gray",
+                "counterexamples_up_big_list")),
+    ("fsets", ("has_fset_with_last",)),
+    ("pred", ()),
+    ("dedup", ("_unique_iso", "unique_iso")),
+    ("semicanon", ("_semicanon",)),
+    ("degverts", ("_degree_verts",)),
+    ("ck_iso", ("_ck_iso",)),
+    ("canon", ("canonical_code",)),
+)
+
+
+def _predicate_codes(f):
+    """Return list of code objects of functions called for predicate f.
+
+    These are f itself (or its __call__ method) and its with_last and
+    with_masks functions or methods, if any. Wrappers are looked
+    through.
+
+    Each way a predicate may be called should be here, or column "pred"
+    misses the time spent in it. Check that candidate graphs made by
+    _extend call one of them:
+
+    >>> f = _Counted(Clique(), collections.Counter(), "f1_calls")
+    >>> profiler = cProfile.Profile()
+    >>> gs = profiler.runcall(list, _extend(f, f, 3, 3, 3, [[1], [0]]))
+    >>> st = pstats.Stats(profiler).stats
+    >>> any((c.co_filename, c.co_firstlineno, c.co_name) in st
+    ...     for c in _predicate_codes(f))
+    True
+
+    """
+    while hasattr(f, "__wrapped__"):
+        f = f.__wrapped__
+    codes = []
+    for func in [f, getattr(f, "with_last", None),
+                 getattr(f, "with_masks", None)]:
+        func = getattr(func, "__func__", func)  # Bound method
+        code = getattr(func, "__code__", None)
+        if code is None and func is not None:
+            call = getattr(type(func), "__call__", None)
+            code = getattr(call, "__code__", None)
+        if code is not None:
+            codes.append(code)
+    return codes
+
+
+def _profile_time(st, keys, exclude=()):
+    """Return seconds spent in functions with given pstats keys.
+
+    Calls from one of these functions to another are not counted twice.
+    Time spent in calls from these functions to functions with keys in
+    exclude is not counted.
+
+    Arguments:
+    st -- dict: the stats attribute of a pstats.Stats object
+    keys -- set of keys of st: (filename, line number, function name)
+    exclude -- optional set of keys of st
+        Default is empty.
+
+    """
+    total = 0.0
+    for key in keys:
+        if key not in st:
+            continue
+        cc, nc, tt, ct, callers = st[key]
+        if not callers:
+            total += ct
+        for caller, info in callers.items():
+            if caller not in keys:
+                total += info[3]  # Cumulative time from this caller
+    for key in exclude:
+        if key in st and key not in keys:
+            for caller, info in st[key][4].items():
+                if caller in keys:
+                    total -= info[3]
+    return total
+
+
+def _profile_row(order, seconds, profiler, f1, f2):
+    """Return row (list of str) of profile summary table for a level."""
+    st = pstats.Stats(profiler).stats
+    here = os.path.basename(__file__)
+    there = os.path.basename(isograph.__file__)
+    predkeys = set((c.co_filename, c.co_firstlineno, c.co_name)
+                   for f in [f1, f2] for c in _predicate_codes(f))
+    keysets = {}
+    for heading, names in _PROFILE_COLUMNS:
+        if heading == "pred":
+            keysets[heading] = predkeys
+        else:
+            keysets[heading] = set(
+                key for key in st
+                if key[2] in names and
+                   os.path.basename(key[0]) in [here, there])
+    row = ["%d" % order, "%.3f" % seconds]
+    for heading, names in _PROFILE_COLUMNS:
+        exclude = keysets["extend"] if heading == "dedup" else ()
+        row.append("%.3f" % _profile_time(st, keysets[heading],
+                                          exclude))
+    return row
+
+
+def _save_profile(profile, order, seconds, profiler, f1, f2, rows):
+    """Save profile of one level, and rewrite summary table.
+
+    The profile is written to file levelNNN.pstats, where NNN is the
+    order, in directory profile, in the format of module pstats. The
+    row for this level is appended to list rows, and the summary table
+    of all rows is written to file summary.txt.
+
+    """
+    os.makedirs(profile, exist_ok=True)
+    profiler.dump_stats(os.path.join(profile,
+                                     "level%03d.pstats" % order))
+    rows.append(_profile_row(order, seconds, profiler, f1, f2))
+    headings = [ heading for heading, names in _PROFILE_COLUMNS ]
+    table = [ ["order", "total"] + headings ] + rows
+    widths = [ max(len(row[i]) for row in table)
+               for i in range(len(table[0])) ]
+    path = os.path.join(profile, "summary.txt")
+    with open(path, "w") as f:
+        for row in table:
+            f.write("  ".join(item.rjust(width)
+                              for item, width in zip(row, widths)) +
+                    "\n")
+
+
+# ----------------------------------------------------------------------
+# Compact Storage of Levels
+# ----------------------------------------------------------------------
+
+
+class PackedLevel:
+
+    """Compact sequence of graphs, all of the same order.
+
+    Each graph is stored as its edge code (see isograph.edge_code), in a
+    fixed number of bytes, in a single bytearray. A graph of order 10
+    takes 6 bytes, rather than 1-2 KB as a list of lists. Graphs are
+    converted to our usual list-of-lists form only when accessed.
+
+    Indexing & iteration give graphs in list-of-lists form; slicing
+    gives a PackedLevel. Member function view returns a lightweight
+    PackedGraph object, which holds a reference into the level, and
+    converts to a graph only when asked.
+
+    >>> level = PackedLevel(3, [ [[], [], []], [[1], [0, 2], [1]] ])
+    >>> len(level)
+    2
+    >>> level[1]
+    [[1], [0, 2], [1]]
+    >>> level.append([[1, 2], [0, 2], [0, 1]])
+    >>> list(level[1:])
+    [[[1], [0, 2], [1]], [[1, 2], [0, 2], [0, 1]]]
+    >>> level.view(2).code()
+    7
+    >>> empty10 = [ [] for v in range(10) ]
+    >>> len(PackedLevel(10, [empty10] * 100000).data)  # bytes used
+    600000
+
+    """
+
+    __slots__ = ["order", "recsize", "data"]
+
+    def __init__(self, order, gs=None):
+        """Create PackedLevel holding graphs of the given order.
+
+        Arguments:
+        order -- nonnegative int: order of all graphs in the level
+        gs -- optional iterable yielding graphs of the given order
+          These are stored in the level, in order.
+
+        """
+        self.order = order
+        self.recsize = max(1, (order*(order-1)//2 + 7) // 8)
+        self.data = bytearray()
+        if gs is not None:
+            self.extend(gs)
+
+    def append(self, g):
+        """Add graph g, of order self.order, to the end of the level."""
+        self.append_code(isograph.edge_code(g))
+
+    def append_code(self, code):
+        """Add graph with given edge code to the end of the level."""
+        self.data += code.to_bytes(self.recsize, "little")
+
+    def extend(self, gs):
+        """Add graphs yielded by iterable gs to the end of the level."""
+        for g in gs:
+            self.append(g)
+
+    def code(self, i):
+        """Return edge code of graph i in level."""
+        r = self.recsize
+        return int.from_bytes(self.data[i*r:(i+1)*r], "little")
+
+    def records(self, start, stop):
+        """Return bytes holding records of graphs start .. stop-1."""
+        r = self.recsize
+        return bytes(self.data[start*r:stop*r])
+
+    def view(self, i):
+        """Return PackedGraph for graph i in level."""
+        if i < 0:
+            i += len(self)
+        return PackedGraph(self, i)
+
+    def __len__(self):
+        return len(self.data) // self.recsize
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            level = PackedLevel(self.order)
+            r = self.recsize
+            for j in range(*i.indices(len(self))):
+                level.data += self.data[j*r:(j+1)*r]
+            return level
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("PackedLevel index out of range")
+        return isograph.from_edge_code(self.order, self.code(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield isograph.from_edge_code(self.order, self.code(i))
+
+
+class PackedGraph:
+
+    """Lightweight view of one graph in a PackedLevel.
+
+    >>> pg = PackedLevel(2, [ [[1], [0]] ]).view(0)
+    >>> pg.code()
+    1
+    >>> pg.graph()
+    [[1], [0]]
+
+    """
+
+    __slots__ = ["level", "index"]
+
+    def __init__(self, level, index):
+        """Create view of graph number index in PackedLevel level."""
+        self.level = level
+        self.index = index
+
+    def code(self):
+        """Return edge code of graph."""
+        return self.level.code(self.index)
+
+    def graph(self):
+        """Return graph, in our usual list-of-lists form."""
+        return isograph.from_edge_code(self.level.order, self.code())
+
+
+# Level file format: a fixed-size index header, holding (in
+# little-endian order) the magic string, the order of the graphs, the
+# size of each record in bytes, the number of records, and the offset of
+# the first record; then header lines, as UTF-8 text separated by
+# newlines; then the records. Record i is the edge code of graph i, in
+# the same form as in a PackedLevel, at offset + i*recsize.
+_LEVEL_MAGIC = b"GRLEVEL1"
+_LEVEL_INDEX = struct.Struct("<8sIIQQ")
+
+
+def write_level_file(path, order, gs, header=None):
+    """Atomically write graphs of the given order to a level file.
+
+    Arguments:
+    path -- string: name of file to write; replaced if it exists
+    order -- nonnegative int: order of all graphs in gs
+    gs -- iterable yielding graphs of the given order; may be a
+      PackedLevel or LevelFile, in which case records are copied without
+      conversion
+    header -- optional list of strings: header lines, which may not
+      contain newlines
+
+    See isograph.py for our graph representation.
+
+    """
+    level = PackedLevel(order)
+    text = "\n".join(header or []).encode("utf-8")
+    offset = _LEVEL_INDEX.size + len(text)
+
+    tmppath = _tmp_path(path)
+    with open(tmppath, "wb") as f:
+        f.write(_LEVEL_INDEX.pack(_LEVEL_MAGIC, order, level.recsize,
+                                  0, offset))
+        f.write(text)
+        packed = isinstance(gs, (PackedLevel, LevelFile))
+        if packed and gs.order == order:
+            count = len(gs)
+            for i in range(0, count, 4096):  # Copy in chunks
+                f.write(gs.records(i, min(count, i+4096)))
+        else:
+            count = 0
+            for g in gs:
+                level.append(g)
+                count += 1
+                if len(level.data) >= 65536:
+                    f.write(level.data)
+                    level.data = bytearray()
+            f.write(level.data)
+        f.seek(0)
+        f.write(_LEVEL_INDEX.pack(_LEVEL_MAGIC, order, level.recsize,
+                                  count, offset))
+        f.flush()
+        os.fsync(f.fileno())
+    _replace(tmppath, path)
+
+
+class LevelFile:
+
+    """Read-only random access to a level file, via mmap.
+
+    The file is mapped into memory, not read, so any number of graphs
+    may be accessed in constant memory, and processes reading the same
+    file share its pages. Indexing & iteration give graphs in our usual
+    list-of-lists form. Slicing gives another LevelFile, sharing the
+    same mapping. Member functions code & view, and data members order
+    & header, are as for PackedLevel.
+
+    Use as a context manager, or call close, to release the mapping.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> path = os.path.join(d, "lev")
+    >>> write_level_file(path, 3, isograph.graphs_iso(3), ["b1 3"])
+    >>> with LevelFile(path) as level:
+    ...     print(level.order, len(level), level.header)
+    ...     print(level[1], list(level[2:]), level.view(-1).code())
+    3 4 ['b1 3']
+    [[1], [0], []] [[[1, 2], [0], [0]], [[1, 2], [0, 2], [0, 1]]] 7
+    >>> shutil.rmtree(d)
+
+    """
+
+    def __init__(self, path):
+        """Open the level file with the given name.
+
+        Raises ValueError if the file is not a level file.
+
+        """
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index = self._mm[:_LEVEL_INDEX.size]
+        if (len(index) < _LEVEL_INDEX.size or
+            not index.startswith(_LEVEL_MAGIC)):
+            self._mm.close()
+            raise ValueError(path + " is not a level file")
+        magic, self.order, self.recsize, count, self._offset = (
+            _LEVEL_INDEX.unpack(index))
+        text = self._mm[_LEVEL_INDEX.size:self._offset].decode("utf-8")
+        self.header = text.split("\n") if text else []
+        self._range = range(count)
+
+    def close(self):
+        """Release the mapping. Do not use the object after this."""
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def records(self, start, stop):
+        """Return bytes holding records start .. stop-1, as in file.
+
+        The records are those of this (possibly sliced) level.
+
+        """
+        r = self.recsize
+        rng = self._range[start:stop]
+        if rng.step == 1:
+            a = self._offset + (rng.start if rng else 0) * r
+            return self._mm[a:a + len(rng)*r]
+        return b"".join([ self._mm[self._offset + j*r:
+                                   self._offset + (j+1)*r]
+                          for j in rng ])
+
+    def code(self, i):
+        """Return edge code of graph i in level."""
+        a = self._offset + self._range[i] * self.recsize
+        return int.from_bytes(self._mm[a:a + self.recsize], "little")
+
+    def view(self, i):
+        """Return PackedGraph for graph i in level."""
+        if i < 0:
+            i += len(self)
+        return PackedGraph(self, i)
+
+    def __len__(self):
+        return len(self._range)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            level = object.__new__(LevelFile)
+            level.__dict__.update(self.__dict__)
+            level._range = self._range[i]
+            return level
+        return isograph.from_edge_code(self.order, self.code(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield isograph.from_edge_code(self.order, self.code(i))
+
+
+# ----------------------------------------------------------------------
+# Finding Extremal Graphs
+# ----------------------------------------------------------------------
+
+
+def _counterexamples_zero(f1, f2, b1, b2):
+    """Yield all counterexample graphs of order zero.
+
+    Arguments:
+    f1 -- predicate
+    f2 -- predicate
+    b1 -- nonnegative int
+    b2 -- nonnegative int
+
+    See isograph.py for our graph representation.
+
+    """
+    gs = list(isograph.graphs(0))  # list of all graphs of order 0
+    for g in gs:
+        if not has_fset(f1, b1, g) and not has_fset(f2, b2, g):
+            yield g
+
+
+def _link_rule(f, b):
+    """Return f.link_rule(b), or None if f has no link_rule.
+
+    A wrapper (with a __wrapped__ attribute) without a link_rule uses
+    that of the predicate it wraps.
+
+    >>> _link_rule(Memoized(is_clique), 3)
+    (1, 2)
+    >>> print(_link_rule(lambda g, s: True, 3))
+    None
+
+    """
+    while not hasattr(f, "link_rule") and hasattr(f, "__wrapped__"):
+        f = f.__wrapped__
+    rule = getattr(f, "link_rule", None)
+    return None if rule is None else rule(b)
+
+
+@functools.lru_cache(maxsize=None)
+def _bound(f1, f2, b1, b2):
+    """Return n as returned by extremals(f1, f2, b1, b2, prune=True).
+
+    Values are cached, since each is needed at every order of a pruned
+    computation, and by the pruned computations that find other values.
+
+    >>> _bound(is_independent, is_clique, 3, 3)
+    6
+
+    """
+    return extremals(f1, f2, b1, b2, prune=True)[0]
+
+
+def _vset_sizes(f1, f2, b1, b2, n):
+    """Return (lo, hi): bounds on degree of last vertex of a ctrexample.
+
+    In every counterexample graph of order n, vertex n-1 has at least lo
+    and at most hi neighbors. The bounds come from the link rules of f1
+    & f2 (see the beginning of this file): if the neighbors, or the
+    non-neighbors, of a vertex induce a counterexample graph for smaller
+    b1 or b2, then there are fewer of them than the value of n returned
+    by extremals for that smaller problem. These values are computed,
+    with pruning, as needed.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+
+    >>> f1 = is_independent
+    >>> f2 = is_clique
+    >>> _vset_sizes(f1, f2, 3, 3, 5), _vset_sizes(f1, f2, 3, 3, 6)
+    ((2, 2), (3, 2))
+    >>> _vset_sizes(f1, lambda g, s: True, 3, 3, 5)
+    (2, 4)
+
+    """
+    lo, hi = 0, n-1
+    for i, (f, b) in enumerate([(f1, b1), (f2, b2)]):
+        rule = _link_rule(f, b)
+        if rule is None:
+            continue
+        side, c = rule
+        if i == 0:
+            m = _bound(f1, f2, c, b2)
+        else:
+            m = _bound(f1, f2, b1, c)
+        if side == 1:    # Neighbors: at most m-1 of them
+            hi = min(hi, m-1)
+        else:            # Non-neighbors: at most m-1 of them
+            lo = max(lo, n-m)
+    return lo, hi
+
+
+def _dual(f1, f2):
+    """Return True if predicates f1, f2 are dual.
+
+    See the beginning of this file. Wrappers (with a __wrapped__
+    attribute) are looked through.
+
+    >>> _dual(is_independent, is_clique), _dual(Clique(), Independent())
+    (True, True)
+    >>> _dual(Memoized(Independent()), Independent())
+    False
+
+    """
+    while hasattr(f1, "__wrapped__"):
+        f1 = f1.__wrapped__
+    while hasattr(f2, "__wrapped__"):
+        f2 = f2.__wrapped__
+    c = getattr(f1, "complement", None)
+    return c is not None and c == f2
+
+
+def _pair_rep(g):
+    """Return g or its complement, whichever represents the pair.
+
+    Isomorphic graphs give isomorphic results, as do complementary
+    graphs: we return the one with fewer edges, or, if they have the
+    same number, the one with the smaller canonical code.
+
+    See isograph.py for our graph representation.
+
+    >>> _pair_rep([[1, 2], [0], [0]])
+    [[], [2], [1]]
+    >>> _pair_rep([[1], [0, 2], [1, 3], [2]])   # Self-complementary
+    [[1], [0, 2], [1, 3], [2]]
+
+    """
+    n = len(g)
+    degsum = sum(len(nbrs) for nbrs in g)   # Twice the number of edges
+    if 2 * degsum < n*(n-1):
+        return g
+    gc = isograph.complement(g)
+    if 2 * degsum > n*(n-1):
+        return gc
+    if isograph.canonical_code(g) <= isograph.canonical_code(gc):
+        return g
+    return gc
+
+
+def _pair_count(gs):
+    """Return number of graphs in the pairs represented by gs.
+
+    gs is an iterable yielding graphs, one from each pair {g, gc}, where
+    gc is the complement of g, up to isomorphism. Self-complementary
+    graphs count once, and others twice.
+
+    See isograph.py for our graph representation.
+
+    >>> _pair_count([[[1], [0, 2], [1, 3], [2]], [[], [2], [1]]])
+    3
+
+    """
+    count = 0
+    for g in gs:
+        count += 1 if _self_complementary(g) else 2
+    return count
+
+
+def _self_complementary(g):
+    """Return True if graph g is isomorphic to its complement."""
+    n = len(g)
+    if 2 * sum(len(nbrs) for nbrs in g) != n*(n-1):
+        return False
+    return isograph.isomorphic(g, isograph.complement(g))
+
+
+def _pair_expand(gs):
+    """Yield graphs in the pairs represented by gs, as for _pair_count.
+
+    Each graph is followed by its complement, unless it is
+    self-complementary.
+
+    >>> list(_pair_expand([[[1], [0]], [[1], [0, 2], [1, 3], [2]]]))
+    [[[1], [0]], [[], []], [[1], [0, 2], [1, 3], [2]]]
+
+    """
+    for g in gs:
+        yield g
+        if not _self_complementary(g):
+            yield isograph.complement(g)
+
+
+def _counterexamples_up(f1, f2, b1, b2, n, old, memory=None,
+                        enumeration=None, stats=None, progress=None,
+                        sizes=None, pairs=False):
+    """Yield counterexample n-graphs, given list for n-1.
+
+    Given induced-hereditary predicates f1, f2, and nonnegative integers
+    b1, b2, yield one graph from each isomorphism class of n-vertex
+    counterexample graphs, given an iterable (old) yielding all
+    counterexample graphs of order n-1.
+
+    Arguments:
+    f1 -- induced-hereditary predicate
+    f2 -- induced-hereditary predicate
+    b1 -- nonnegative int
+    b2 -- nonnegative int
+    n -- positive int
+      Order of graphs to yield.
+    old -- iterable yielding graphs of order n-1
+      Graphs yielded should be all counterexample graphs of order n-1.
+    memory -- optional int: memory budget in bytes for removing
+      isomorphic duplicates; see _unique_iso. Default is None: no limit.
+    enumeration -- optional string: "powerset", "gray", or "batch";
+      see extremals. Default is "powerset".
+    stats -- optional collections.Counter, in which we count parents,
+      candidates, predicate calls, rejections, and isomorphism checks;
+      see _METRICS_KEYS. Default is None: no counting.
+    progress -- optional _Progress: steps once for each parent, and is
+      told of each graph yielded. Default is None.
+    sizes -- optional pair (lo, hi): only new vertices with at least lo
+      and at most hi neighbors are tried; see _vset_sizes. Default is
+      None: all are tried.
+    pairs -- optional bool: if True, then each graph is replaced by
+      _pair_rep of it, so that we yield one graph from each pair of
+      complementary isomorphism classes. Then old need only yield one
+      graph from each such pair of order n-1; see option duality of
+      extremals. Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = is_independent
+    >>> f2 = is_clique
+    >>> ce4_0_3_3 = [[[2], [3], [0], [1]], [[1,2], [0,3], [0], [1]],
+    ... [[1,2], [0,3], [0,3], [1,2]]] # order-4 ctrexamples for R_0(3,3)
+    >>> ce5_0_3_3 = list(_counterexamples_up(f1,f2,3,3,5,ce4_0_3_3))
+    >>> len(ce5_0_3_3)
+    1
+    >>> c5 = [[1,4], [0,2], [1,3], [2,4], [0,3]]
+    >>> isograph.isomorphic(ce5_0_3_3[0], c5)
+    True
+    >>> list(_counterexamples_up(f1,f2,3,3,6,ce5_0_3_3))
+    []
+
+    """
+    # Helper function counterexamples_up_big_list: generates every
+    # counterexample graph of order n whose subgraph induced by vertices
+    # 0 .. n-2 is an item in old.
+    def counterexamples_up_big_list(f1, f2, n, b1, b2, old):
+        for oldg in old:
+            if stats is not None:
+                stats["parents"] += 1
+            for g in extend(f1, f2, b1, b2, n, oldg, stats=stats,
+                            sizes=sizes):
+                yield _pair_rep(g) if pairs else g
+            if progress is not None:
+                progress.step()
+
+    extend = _extenders[enumeration or "powerset"]
+    if stats is not None:
+        f1 = _Counted(f1, stats, "f1_calls")
+        f2 = _Counted(f2, stats, "f2_calls")
+
+    gs = _unique_iso(
+        counterexamples_up_big_list(f1, f2, n, b1, b2, old), memory,
+        stats)
+    if progress is not None:
+        gs = progress.counted(gs)
+    return gs
+
+
+def _counterexamples_from(f1, f2, b1, b2, n, source, stats=None,
+                          progress=None):
+    """Yield counterexample n-graphs, found among those of a larger set.
+
+    Given induced-hereditary predicates f1, f2, and nonnegative integers
+    b1, b2, yield one graph from each isomorphism class of n-vertex
+    counterexample graphs, by checking each graph of order n saved by
+    another computation whose counterexample graphs include ours.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+    source -- string: checkpoint directory (see extremals) of the other
+      computation, which must have saved all levels up to its last.
+      Levels beyond that are taken to be empty.
+    stats -- optional collections.Counter: as for _counterexamples_up
+      Each graph checked counts as a candidate.
+    progress -- optional _Progress: steps once for each graph checked
+
+    Raises ValueError if the level file was saved with option duality.
+
+    See isograph.py for our graph representation.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> n, gs = extremals(is_independent, is_clique, 3, 4, checkpoint=d)
+    >>> gs = list(_counterexamples_from(is_independent, is_clique, 3, 3,
+    ...                                 5, d))
+    >>> len(gs), isograph.isomorphic(gs[0], [[1,4], [0,2], [1,3],
+    ...                                      [2,4], [0,3]])
+    (1, True)
+    >>> list(_counterexamples_from(is_independent, is_clique, 3, 3,
+    ...                            n, d))
+    []
+    >>> shutil.rmtree(d)
+
+    """
+    path = _checkpoint_path(source, n)
+    if not os.path.exists(path):
+        if progress is not None:
+            progress.start_level(n, 0, "graphs", 1)
+        return
+    with LevelFile(path) as lf:
+        if "duality pairs" in lf.header:
+            raise ValueError("source level " + path +
+                             " holds complementary pairs")
+        if progress is not None:
+            progress.start_level(n, len(lf), "graphs", 1)
+        ncands = nrej1 = nrej2 = 0
+        for g in lf:
+            ncands += 1
+            if has_fset(f1, b1, g):
+                nrej1 += 1
+            elif has_fset(f2, b2, g):
+                nrej2 += 1
+            else:
+                if progress is not None:
+                    progress.found()
+                yield g
+            if progress is not None:
+                progress.step()
+    if stats is not None:
+        stats["candidates"] += ncands
+        stats["f1_rejects"] += nrej1
+        stats["f2_rejects"] += nrej2
+
+
+def _unique_iso(gs, memory=None, counts=None):
+    """Yield first graph from each isomorphism class, as unique_iso.
+
+    Like isograph.unique_iso, but if memory is given, then we switch to
+    out-of-core deduplication, using temporary files, once the
+    estimated memory used by the graphs kept exceeds memory bytes. The
+    graphs yielded, and their order, are the same either way.
+
+    The directory for temporary files is chosen by module tempfile; it
+    may be set using environment variable TMPDIR.
+
+    Arguments:
+    gs -- iterable yielding graphs, all of the same order
+    memory -- optional int: memory budget in bytes
+      Default is None: no limit.
+    counts -- optional dict, as for isograph.unique_iso
+      Only checks made before switching to temporary files are
+      counted.
+
+    See isograph.py for our graph representation.
+
+    >>> gs = list(isograph.graphs(5))
+    >>> expected = list(isograph.unique_iso(gs))
+    >>> list(_unique_iso(gs, 1000)) == expected
+    True
+
+    """
+    if memory is None:
+        for g in isograph.unique_iso(gs, counts):
+            yield g
+        return
+
+    # Phase 1: as in isograph.unique_iso, until over budget. Buckets
+    # hold pairs (seq, edge code of semi-canonical form).
+    seq = 0
+    buckets = dict()
+    used = 0
+    gs = iter(gs)
+    for g in gs:
+        gc, gcdv = isograph._semicanon(g)
+        n = len(gc)
+        bucket = buckets.setdefault(isograph._iso_key(gcdv), [])
+        for hseq, hcode in bucket:
+            hc = isograph.from_edge_code(n, hcode)
+            if isograph._ck_iso(gc, gcdv, hc, gcdv, counts):
+                break
+        else:
+            bucket.append((seq, isograph.edge_code(gc)))
+            used += _KEPT_BYTES_PER_VERTEX * (n+1)
+            yield g
+        seq += 1
+        if used > memory:
+            break
+    else:
+        return
+
+    # Phase 2: out-of-core. Graphs kept so far are marked as already
+    # yielded, so that later duplicates are discarded.
+    with tempfile.TemporaryDirectory(prefix="genramsey-") as tmpdir:
+        runs = _Runs(tmpdir, memory)
+        for bucket in buckets.values():
+            for hseq, hcode in bucket:
+                hc = isograph.from_edge_code(n, hcode)
+                runs.add((isograph.canonical_code(hc), hseq, 1,
+                          isograph.graph6_str(hc)))
+        buckets = None
+        for g in gs:
+            runs.add((isograph.canonical_code(g), seq, 0,
+                      isograph.graph6_str(g)))
+            seq += 1
+
+        # Keep first of each class, then restore original order
+        survivors = _Runs(tmpdir, memory, "s")
+        lastcode = None
+        for code, gseq, yielded, g6 in runs.merged():
+            if code == lastcode:
+                continue
+            lastcode = code
+            if not yielded:
+                survivors.add((gseq, g6))
+        for gseq, g6 in survivors.merged():
+            yield isograph.from_graph6(g6)
+
+
+# Estimated memory, in bytes per vertex, used by a graph kept during
+# phase 1 of _unique_iso, and by a record during phase 2.
+_KEPT_BYTES_PER_VERTEX = 40
+_RECORD_BYTES = 250
+
+
+class _Runs:
+
+    """Sorted runs of records in temporary files, for external sorting.
+
+    Records are tuples whose items are ints, except for the last, which
+    is a string without whitespace. Records are buffered in memory; when
+    the buffer exceeds the memory budget, it is sorted and written to a
+    file as a run. Of the records in one buffer with equal first items,
+    only the least is kept. Member function merged yields the records
+    kept, in sorted order, merging the runs; records with equal first
+    items may still occur, if they were added to different runs.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as d:
+    ...     runs = _Runs(d, 3*_RECORD_BYTES)
+    ...     for rec in [(3, "c"), (1, "a"), (3, "b"), (0, "z")]:
+    ...         runs.add(rec)
+    ...     list(runs.merged())
+    [(0, 'z'), (1, 'a'), (3, 'b')]
+
+    """
+
+    def __init__(self, tmpdir, memory, prefix="r"):
+        """Create empty _Runs object with files in tmpdir."""
+        self.tmpdir = tmpdir
+        self.limit = max(1, memory // _RECORD_BYTES)
+        self.prefix = prefix
+        self.buffer = []
+        self.paths = []
+
+    def add(self, rec):
+        """Add a record, spilling the buffer to a run if it is full."""
+        self.buffer.append(rec)
+        if len(self.buffer) >= self.limit:
+            self._spill()
+
+    def _sorted_buffer(self):
+        """Return sorted buffer, keeping least of equal first items."""
+        self.buffer.sort()
+        kept = []
+        for rec in self.buffer:
+            if not kept or rec[0] != kept[-1][0]:
+                kept.append(rec)
+        self.buffer = []
+        return kept
+
+    def _spill(self):
+        """Sort buffer & write it to a new run file."""
+        path = os.path.join(self.tmpdir,
+                            self.prefix + str(len(self.paths)))
+        with open(path, "w") as f:
+            for rec in self._sorted_buffer():
+                f.write(" ".join(map(str, rec)) + "\n")
+        self.paths.append(path)
+
+    def merged(self):
+        """Yield all records added, in sorted order."""
+        def read_run(path):
+            with open(path) as f:
+                for line in f:
+                    items = line.split()
+                    yield tuple(map(int, items[:-1])) + (items[-1],)
+
+        sources = [ read_run(path) for path in self.paths ]
+        sources.append(iter(self._sorted_buffer()))
+        for rec in heapq.merge(*sources):
+            yield rec
+
+
+def _spilled_level(order, gs, memory, tmpdir):
+    """Return PackedLevel or LevelFile holding graphs yielded by gs.
+
+    Graphs are packed in a PackedLevel while it takes at most memory
+    bytes. If it would take more, then all graphs are instead written,
+    as they are yielded, to a level file in directory tmpdir, which is
+    returned as a LevelFile; so a level need not fit in memory.
+
+    Arguments:
+    order -- nonnegative int: order of all graphs in gs
+    gs -- iterable yielding graphs of the given order
+    memory -- int: memory budget in bytes
+    tmpdir -- string: directory for the level file, named levelNNN,
+      where NNN is order
+
+    See isograph.py for our graph representation.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> level = _spilled_level(3, isograph.graphs_iso(3), 100, d)
+    >>> isinstance(level, PackedLevel), os.listdir(d)
+    (True, [])
+    >>> level = _spilled_level(3, isograph.graphs_iso(3), 2, d)
+    >>> level.close()
+    >>> with LevelFile(os.path.join(d, "level003")) as level:
+    ...     list(level) == list(isograph.graphs_iso(3))
+    True
+    >>> shutil.rmtree(d)
+
+    """
+    level = PackedLevel(order)
+    gs = iter(gs)
+    for g in gs:
+        level.append(g)
+        if len(level.data) > memory:
+            path = os.path.join(tmpdir, "level%03d" % order)
+            write_level_file(path, order, itertools.chain(level, gs))
+            return LevelFile(path)
+    return level
+
+
+def _extend(f1, f2, b1, b2, n, oldg, vsets=None, stats=None,
+            sizes=None):
+    """Yield counterexample n-graphs having oldg as induced subgraph.
+
+    Each graph yielded consists of oldg, along with a new vertex n-1,
+    adjacent to some set (vset) of vertices of oldg. Graphs are yielded
+    in the order of these sets in isograph.powerset, or in vsets, if it
+    is given. Isomorphic graphs may be yielded.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+    oldg -- graph of order n-1
+    vsets -- optional iterable yielding sorted tuples of vertices of
+      oldg: the neighborhoods of the new vertex to try. Default is all
+      subsets of range(n-1).
+    stats -- optional collections.Counter: as for _counterexamples_up
+    sizes -- optional pair: as for _counterexamples_up
+      Sets in vsets of other sizes are skipped, and not counted as
+      candidates.
+
+    Candidate graphs are checked as views (see has_fset_with_last); only
+    the graphs yielded are constructed.
+
+    See isograph.py for our graph representation.
+
+    >>> list(_extend(is_independent, is_clique, 3, 3, 3, [[1], [0]]))
+    [[[1], [0], []], [[1, 2], [0], [0]], [[1], [0, 2], [1]]]
+    >>> list(_extend(is_independent, is_clique, 3, 3, 3, [[1], [0]],
+    ...              sizes=(1, 1)))
+    [[[1, 2], [0], [0]], [[1], [0, 2], [1]]]
+
+    """
+    if sizes is not None:
+        lo, hi = sizes
+        if vsets is None:
+            # Sets of each size in turn, in isograph.powerset order
+            vsets = itertools.chain.from_iterable(
+                itertools.combinations(range(n-1), r)
+                for r in range(max(lo, 0), min(hi, n-1)+1))
+        else:
+            vsets = ( vset for vset in vsets if lo <= len(vset) <= hi )
+    elif vsets is None:
+        vsets = isograph.powerset(range(n-1))
+    adj = _adjacency_masks(oldg)  # Shared by all candidates
+    ncands = nrej1 = nrej2 = 0
+    for vset in vsets:
+        # Candidate graph is oldg plus vertex n-1 adjacent to vset.
+        # Yield it if no order-b1 f1-set & no order-b2 f2-set
+        ncands += 1
+        if has_fset_with_last(f1, b1, oldg, vset, adj):
+            nrej1 += 1
+        elif has_fset_with_last(f2, b2, oldg, vset, adj):
+            nrej2 += 1
+        else:
+            yield _add_vertex(oldg, vset)
+    if stats is not None:
+        stats["candidates"] += ncands
+        stats["f1_rejects"] += nrej1
+        stats["f2_rejects"] += nrej2
+
+
+def _extend_gray(f1, f2, b1, b2, n, oldg, stats=None, sizes=None):
+    """Yield counterexample n-graphs having oldg as induced subgraph.
+
+    Yields the same graphs as _extend(f1, f2, b1, b2, n, oldg,
+    sizes=sizes), in the same order. But we try the neighborhoods of the
+    new vertex in Gray-code order, so that each differs from the last in
+    a single vertex, and we check for f-sets using trackers (see the
+    beginning of this file), which update their state as each vertex is
+    toggled. Only the graphs yielded are constructed.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+    oldg -- graph of order n-1
+    stats -- optional collections.Counter: as for _counterexamples_up
+    sizes -- optional pair: as for _counterexamples_up
+      Trackers are still told of every vertex toggled, but are asked for
+      f-sets only when the neighborhood has an allowed size.
+
+    See isograph.py for our graph representation.
+
+    >>> list(_extend_gray(is_independent, is_clique, 3, 3, 3,
+    ...                   [[1], [0]]))
+    [[[1], [0], []], [[1, 2], [0], [0]], [[1], [0, 2], [1]]]
+    >>> stats = collections.Counter()
+    >>> gs = list(_extend_gray(Independent(), Clique(), 3, 3, 3,
+    ...                        [[1], [0]], stats))
+    >>> stats["f1_calls"], stats["f2_calls"], stats["f2_rejects"]
+    (4, 4, 1)
+
+    """
+    t1 = _tracker(f1, oldg, b1)
+    t2 = _tracker(f2, oldg, b2)
+    lo, hi = sizes if sizes is not None else (0, n-1)
+    inset = [False] * (n-1)
+    size = 0  # Number of vertices in neighborhood
+    vsets = []
+    ncands = nrej1 = nrej2 = 0
+    for i in range(1 << (n-1)):
+        if i:
+            # Toggle the vertex given by the lowest set bit of i
+            v = (i & -i).bit_length() - 1
+            inset[v] = not inset[v]
+            size += 1 if inset[v] else -1
+            t1.toggle(v)
+            t2.toggle(v)
+        if size < lo or size > hi:
+            continue
+        ncands += 1
+        if t1.has_fset():
+            nrej1 += 1
+        elif t2.has_fset():
+            nrej2 += 1
+        else:
+            vsets.append(tuple(v for v in range(n-1) if inset[v]))
+    if stats is not None:
+        stats["candidates"] += ncands
+        stats["f1_rejects"] += nrej1
+        stats["f2_rejects"] += nrej2
+        # A _Tracker calls the predicate, which counts its own calls
+        if not isinstance(t1, _Tracker):
+            stats["f1_calls"] += ncands
+        if not isinstance(t2, _Tracker):
+            stats["f2_calls"] += ncands - nrej1
+    # Put vsets in the order of isograph.powerset
+    vsets.sort(key=lambda vset: (len(vset), vset))
+    for vset in vsets:
+        yield _add_vertex(oldg, vset)
+
+
+# Maximum number of entries in an array made by _batch_hits
+_BATCH_CELLS = 1 << 22
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Return module numpy, or None if it is not available.
+
+    NumPy is used only by enumeration "batch" and by verify, so it is
+    imported on first use, and other runs do not pay for the import.
+
+    """
+    try:
+        import numpy  # for arange, flatnonzero, float32, ones, zeros
+    except ImportError:
+        return None
+    return numpy
+
+
+def _batch_hits(f, b, h, cands, witnesses=False):
+    """Return array: which neighborhoods of new vertex give an f-set.
+
+    Item i of the returned array is True if h, along with a new vertex
+    adjacent to the vertices given by row i of cands, has an f-set of
+    order b containing the new vertex. Returns None if f has no
+    batch_parts attribute (see the beginning of this file). The work is
+    done with NumPy array operations, a block of rows at a time.
+
+    If witnesses is True, then a list is returned instead, whose item i
+    is such an f-set, as a sorted tuple, or None if there is none.
+
+    Arguments:
+    f -- predicate
+    b -- nonnegative int
+    h -- graph
+    cands -- 2-D NumPy float32 array, with a column for each vertex of
+      h: 1 if the vertex is in the neighborhood, 0 if not
+    witnesses -- optional bool: whether to return f-sets found
+        Default is False.
+
+    >>> numpy = _numpy()
+    >>> cands = numpy.array([[0, 0], [1, 0], [1, 1]], numpy.float32)
+    >>> _batch_hits(is_clique, 3, [[1], [0]], cands).tolist()
+    [False, False, True]
+    >>> _batch_hits(is_clique, 3, [[1], [0]], cands, True)
+    [None, None, (0, 1, 2)]
+    >>> print(_batch_hits(lambda g, s: True, 3, [[1], [0]], cands))
+    None
+
+    """
+    make = getattr(f, "batch_parts", None)
+    if make is None:
+        return None
+    numpy = _numpy()
+    hits = numpy.zeros(len(cands), bool)
+    which = None  # Index in sets of an f-set, for each row
+    if witnesses:
+        which = numpy.zeros(len(cands), int)
+    sets = []
+    if 1 <= b <= len(h)+1:
+        compl, limit, sets = make(h, b)
+    if sets:
+        _batch_scan(compl, limit, sets, len(h), cands, hits, which)
+    if not witnesses:
+        return hits
+    found = [ tuple(sorted(v for part, weight in item for v in part))
+              + (len(h),) for item in sets ]
+    return [ found[j] if hit else None
+             for hit, j in zip(hits.tolist(), which.tolist()) ]
+
+
+def _batch_scan(compl, limit, sets, m, cands, hits, which):
+    """Fill in hits and which for _batch_hits.
+
+    compl, limit, sets are as returned by batch_parts for a graph of
+    order m, and cands is as for _batch_hits. Sets item i of NumPy
+    array hits to whether row i of cands gives an f-set, and, if so and
+    which is not None, item i of which to the index in sets of the first
+    one it gives.
+
+    """
+    numpy = _numpy()
+
+    # Column j of parts marks the vertices of part j; row j of weights
+    # holds its weight, in the column of the set it belongs to.
+    nparts = sum(len(item) for item in sets)
+    parts = numpy.zeros((m, nparts), numpy.float32)
+    weights = numpy.zeros((nparts, len(sets)), numpy.float32)
+    partsizes = numpy.zeros(nparts, numpy.float32)
+    j = 0
+    for i, item in enumerate(sets):
+        for part, weight in item:
+            parts[list(part), j] = 1
+            partsizes[j] = len(part)
+            weights[j, i] = weight
+            j += 1
+
+    step = max(1, _BATCH_CELLS // max(nparts, len(sets)))
+    for start in range(0, len(cands), step):
+        met = cands[start:start+step] @ parts  # Part vertices in nbhd
+        if compl:
+            touched = met < partsizes
+        else:
+            touched = met > 0
+        scores = touched.astype(numpy.float32) @ weights
+        fsets = scores <= limit
+        hits[start:start+step] = fsets.any(axis=1)
+        if which is not None:
+            which[start:start+step] = fsets.argmax(axis=1)
+
+
+def _extend_batch(f1, f2, b1, b2, n, oldg, stats=None, sizes=None):
+    """Yield counterexample n-graphs having oldg as induced subgraph.
+
+    Yields the same graphs as _extend(f1, f2, b1, b2, n, oldg,
+    sizes=sizes), in the same order. But, for a predicate with a
+    batch_parts attribute (see the beginning of this file), all
+    neighborhoods of the new vertex are checked at once; see
+    _batch_hits. For a predicate without one, the neighborhoods left are
+    checked one at a time, by has_fset_with_last. Only the graphs
+    yielded are constructed. If NumPy is not available, this is the same
+    as _extend.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+    oldg -- graph of order n-1
+    stats -- optional collections.Counter: as for _counterexamples_up
+    sizes -- optional pair: as for _counterexamples_up
+
+    See isograph.py for our graph representation.
+
+    >>> list(_extend_batch(is_independent, is_clique, 3, 3, 3,
+    ...                    [[1], [0]]))
+    [[[1], [0], []], [[1, 2], [0], [0]], [[1], [0, 2], [1]]]
+    >>> stats = collections.Counter()
+    >>> gs = list(_extend_batch(Independent(), Clique(), 3, 3, 3,
+    ...                         [[1], [0]], stats))
+    >>> stats["f1_calls"], stats["f2_calls"], stats["f2_rejects"]
+    (4, 4, 1)
+
+    """
+    numpy = _numpy()
+    if numpy is None:
+        for g in _extend(f1, f2, b1, b2, n, oldg, stats=stats,
+                         sizes=sizes):
+            yield g
+        return
+
+    # Neighborhood with code c holds vertex v iff bit v of c is 1
+    codes = numpy.arange(1 << (n-1))
+    cands = ((codes[:, None] >> numpy.arange(n-1)) & 1).astype(
+        numpy.float32)
+    if sizes is not None:
+        counts = cands.sum(axis=1)
+        keep = (counts >= sizes[0]) & (counts <= sizes[1])
+        codes, cands = codes[keep], cands[keep]
+
+    adj = _adjacency_masks(oldg)
+    alive = numpy.ones(len(codes), bool)
+    nrejs = []
+    for key, f, b in [("f1_calls", f1, b1), ("f2_calls", f2, b2)]:
+        left = numpy.flatnonzero(alive)
+        hits = _batch_hits(f, b, oldg, cands[left])
+        if hits is None:
+            hits = numpy.array([ has_fset_with_last(
+                f, b, oldg, _code_vset(int(codes[i]), n-1), adj)
+                                 for i in left ], bool)
+        elif stats is not None:
+            stats[key] += len(left)  # One call for each row checked
+        alive[left[hits]] = False
+        nrejs.append(int(hits.sum()))
+    if stats is not None:
+        stats["candidates"] += len(codes)
+        stats["f1_rejects"] += nrejs[0]
+        stats["f2_rejects"] += nrejs[1]
+
+    # Put vsets in the order of isograph.powerset
+    vsets = [ _code_vset(int(c), n-1) for c in codes[alive] ]
+    vsets.sort(key=lambda vset: (len(vset), vset))
+    for vset in vsets:
+        yield _add_vertex(oldg, vset)
+
+
+def _code_vset(code, m):
+    """Return tuple of v in range(m) for which bit v of code is 1."""
+    return tuple(v for v in range(m) if code >> v & 1)
+
+
+# _extenders - functions like _extend, by enumeration order name
+_extenders = {
+    "powerset": _extend,
+    "gray": _extend_gray,
+    "batch": _extend_batch,
+}
+
+
+def _add_vertex(oldg, vset):
+    """Return oldg plus a new vertex adjacent to each vertex in vset.
+
+    oldg is not modified.
+
+    >>> _add_vertex([[1], [0]], (0,))
+    [[1, 2], [0], [0]]
+
+    """
+    n = len(oldg)+1
+    g = oldg + [list(vset)]
+    for v in vset:
+        g[v] = g[v]+[n-1]
+        # NOT g[v] += ... or g[v].append(...),
+        #  to avoid changing items in oldg
+    return g
+
+
+def _threads_available():
+    """Return True if Python threads can run Python code in parallel.
+
+    This is the case for a free-threaded build of Python 3.13 or later,
+    running with the global interpreter lock disabled.
+
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _threaded_up(f1, f2, b1, b2, n, oldgs, nthreads,
+                 enumeration=None, stats=None, progress=None,
+                 sizes=None, pairs=False):
+    """Return PackedLevel of counterexample n-graphs, using threads.
+
+    Each thread scans its own slice of oldgs: items t, t+nthreads,
+    t+2*nthreads, etc. Graphs found are merged into buckets keyed by an
+    isomorphism invariant; buckets are divided among stripes, each with
+    its own lock. Along with each graph we keep its position in the
+    order in which _counterexamples_up would find it, and a bucket keeps
+    the earliest graph of each isomorphism class. So the returned list
+    holds exactly the graphs yielded by _counterexamples_up.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+      f1, f2 must be safe to call from several threads at once.
+    oldgs -- list or PackedLevel: all counterexample graphs of order
+      n-1
+    nthreads -- positive int: number of threads to use
+    enumeration -- optional string: as for _counterexamples_up
+    stats -- optional collections.Counter: as for _counterexamples_up
+    progress -- optional _Progress: as for _counterexamples_up
+    sizes -- optional pair: as for _counterexamples_up
+    pairs -- optional bool: as for _counterexamples_up
+
+    See isograph.py for our graph representation.
+
+    >>> oldgs = [[[2], [3], [0], [1]], [[1,2], [0,3], [0], [1]],
+    ...          [[1,2], [0,3], [0,3], [1,2]]]
+    >>> gs = _threaded_up(is_independent, is_clique, 3, 3, 5, oldgs, 2)
+    >>> list(gs) == list(_counterexamples_up(is_independent, is_clique,
+    ...                                      3, 3, 5, oldgs))
+    True
+
+    """
+    extend = _extenders[enumeration or "powerset"]
+    nstripes = 4 * nthreads
+    stripes = [ dict() for i in range(nstripes) ]
+    locks = [ threading.Lock() for i in range(nstripes) ]
+
+    # Each bucket is a list of lists [seq, code, gccode]; seq is a pair
+    # (parent index, index of graph among those found from that
+    # parent), code is the edge code of the graph, and gccode that of
+    # its semi-canonical form. As in isograph.unique_iso, graphs in a
+    # bucket share the same _degree_verts of their forms.
+    # Each thread counts in its own Counter; these are summed at the end
+    tstats = [ None if stats is None else collections.Counter()
+               for t in range(nthreads) ]
+
+    def scan(t):
+        st = tstats[t]
+        tf1, tf2 = f1, f2
+        if st is not None:
+            tf1 = _Counted(f1, st, "f1_calls")
+            tf2 = _Counted(f2, st, "f2_calls")
+        for i in range(t, len(oldgs), nthreads):
+            if st is not None:
+                st["parents"] += 1
+            for j, g in enumerate(extend(tf1, tf2, b1, b2, n, oldgs[i],
+                                         stats=st, sizes=sizes)):
+                if pairs:
+                    g = _pair_rep(g)
+                seq = (i, j)
+                code = isograph.edge_code(g)
+                gc, gcdv = isograph._semicanon(g)
+                gccode = isograph.edge_code(gc)
+                key = isograph._iso_key(gcdv)
+                stripe = hash(key) % nstripes
+                with locks[stripe]:
+                    bucket = stripes[stripe].setdefault(key, [])
+                    for item in bucket:
+                        hc = isograph.from_edge_code(n, item[2])
+                        if isograph._ck_iso(gc, gcdv, hc, gcdv, st):
+                            if seq < item[0]:
+                                item[:] = [seq, code, gccode]
+                            break
+                    else:
+                        bucket.append([seq, code, gccode])
+                        if progress is not None:
+                            progress.found()
+            if progress is not None:
+                progress.step()
+
+    threads = [ threading.Thread(target=scan, args=(t,))
+                for t in range(nthreads) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if stats is not None:
+        for st in tstats:
+            stats.update(st)
+
+    items = [ item for stripe in stripes for bucket in stripe.values()
+              for item in bucket ]
+    items.sort(key=lambda item: item[0])
+    gs = PackedLevel(n)
+    for item in items:
+        gs.append_code(item[1])
+    return gs
+
+
+class Level:
+    """Counterexample graphs of one order, as yielded by iter_levels.
+
+    Attributes:
+    order -- int: order of the graphs
+    count -- int: number of counterexample graphs of this order, one
+      from each isomorphism class
+    graphs -- PackedLevel holding these graphs, or None if they are not
+      available, for a level restored from a checkpoint or seed, other
+      than the last nonempty one. Graphs are decoded as they are read.
+      With option memory of extremals, a large level is instead a
+      LevelFile in a temporary file; it may be read only until
+      iteration continues past the next nonempty level, or ends.
+      With option duality of extremals, only one graph from each
+      complementary pair is held.
+    seconds -- float: time taken to compute the level, or None if it was
+      restored
+    metrics -- dict: performance metrics for the level (see
+      iter_levels), or None if they were not collected
+
+    """
+
+    __slots__ = ("order", "count", "graphs", "seconds", "metrics")
+
+    def __init__(self, order, count, graphs, seconds, metrics=None):
+        self.order = order
+        self.count = count
+        self.graphs = graphs
+        self.seconds = seconds
+        self.metrics = metrics
+
+    def __repr__(self):
+        return "Level(order=%d, count=%d)" % (self.order, self.count)
+
+
+def iter_levels(f1, f2, b1, b2, workdir=None, shardsize=None,
+                lease=None, poll=None, backend=None, nthreads=None,
+                checkpoint=None, resume=None, memory=None, seed=None,
+                enumeration=None, metrics=None, progress=None,
+                profile=None, prune=None, duality=None, source=None):
+    """Yield Level object for each order, as soon as it is computed.
+
+    Levels are yielded for orders 0, 1, 2, etc., ending with the first
+    order having no counterexample graphs; so the last level yielded has
+    count zero, and its order is the n returned by extremals. Levels
+    restored from a checkpoint or seed are yielded first. The caller may
+    stop early; the computation then stops too.
+
+    If metrics is given, then performance metrics are collected for
+    each level computed, and given as the metrics attribute of the
+    Level; see extremals.
+
+    Arguments are as for extremals, which see.
+
+    See isograph.py for our graph representation.
+
+    >>> for level in iter_levels(is_independent, is_clique, 3, 3):
+    ...     print(level.order, level.count, len(list(level.graphs)))
+    0 1 1
+    1 1 1
+    2 2 2
+    3 2 2
+    4 3 3
+    5 1 1
+    6 0 0
+
+    """
+    assert checkpoint is not None or not resume
+    assert source is None or not duality
+    if shardsize is None:
+        shardsize = 100
+    if lease is None:
+        lease = 600
+    if poll is None:
+        poll = 1
+    if backend is None:
+        backend = "threads" if _threads_available() else "serial"
+    assert backend in ["serial", "threads"]
+    assert enumeration in [None] + list(_extenders)
+    if nthreads is None:
+        nthreads = os.cpu_count() or 1
+    pairs = bool(duality) and b1 == b2 and _dual(f1, f2)
+    header = _job_header(f1, f2, b1, b2, pairs)
+    dual = None   # Header of dual computation, if different
+    if b1 != b2 and _dual(f1, f2):
+        dual = _job_header(f1, f2, b2, b1)
+    if workdir is not None:
+        _start_job(workdir, f1, f2, b1, b2, pairs)
+
+    # counts holds the number of counterexample graphs of each order
+    # so far; gs holds those of the highest order with a nonzero count.
+    # Levels are held as PackedLevel objects; if memory is given, a
+    # level larger than that is instead written to a level file in
+    # spilldir, and held as a LevelFile (see _spilled_level).
+    counts = []
+    if resume:
+        counts, gs = _load_checkpoint(checkpoint, header)
+    if seed is not None and not counts:
+        counts, gs = _load_level(seed, header, "seed", dual)
+        if not counts[-1]:
+            raise ValueError("seed level is empty")
+    for u, howmany in enumerate(counts):
+        if u == gs.order:
+            graphs = gs
+        elif howmany == 0:
+            graphs = PackedLevel(u)
+        else:
+            graphs = None
+        yield Level(u, howmany, graphs, None)
+
+    def finish(n, gs, start, stats):
+        # Return Level for newly computed level; emit metrics
+        count = _pair_count(gs) if pairs else len(gs)
+        counts.append(count)
+        if checkpoint is not None:
+            _save_checkpoint(checkpoint, header, counts, gs)
+        seconds = time.time() - start
+        record = None
+        if stats is not None:
+            record = _level_metrics(n, count, seconds, stats)
+            _emit_metrics(metrics, record)
+        return Level(n, count, gs, seconds, record)
+
+    if not counts:
+        start = time.time()
+        stats = None if metrics is None else collections.Counter()
+        gs = PackedLevel(0, _counterexamples_zero(f1, f2, b1, b2))
+        yield finish(0, gs, start, stats)
+
+    profilerows = []  # Rows of profile summary table
+    reporter = None
+    if progress is not None:
+        reporter = _Progress(progress)
+        reporter.install_handler()
+
+    spilldir = None
+    if memory is not None:
+        spilldir = tempfile.mkdtemp(prefix="genramsey-")
+
+    # The done file tells workers to stop, even if our caller stopped
+    # early.
+    try:
+        while counts[-1] != 0:
+            n = len(counts)
+            # Bounds for smaller problems are computed before timing
+            sizes = None
+            if prune:
+                sizes = _vset_sizes(f1, f2, b1, b2, n)
+            start = time.time()
+            stats = None if metrics is None else collections.Counter()
+            oldgs = gs
+            if reporter is not None and source is None:
+                reporter.start_level(n, len(oldgs), "parents",
+                                     1 << (n-1))
+            if profile is not None:
+                profiler = cProfile.Profile()
+                profiler.enable()
+            if source is not None:
+                gs = _counterexamples_from(f1, f2, b1, b2, n, source,
+                                           stats, reporter)
+                gs = (PackedLevel(n, gs) if memory is None else
+                      _spilled_level(n, gs, memory, spilldir))
+            elif workdir is not None:
+                gs = _sharded_up(f1, f2, b1, b2, n, oldgs, workdir,
+                                 shardsize, lease, poll, memory,
+                                 enumeration, stats, reporter, sizes,
+                                 pairs, spilldir)
+            elif backend == "threads":
+                gs = _threaded_up(f1, f2, b1, b2, n, oldgs, nthreads,
+                                  enumeration, stats, reporter, sizes,
+                                  pairs)
+            else:
+                gs = _counterexamples_up(f1, f2, b1, b2, n, oldgs,
+                                         memory, enumeration, stats,
+                                         reporter, sizes, pairs)
+                gs = (PackedLevel(n, gs) if memory is None else
+                      _spilled_level(n, gs, memory, spilldir))
+            if profile is not None:
+                profiler.disable()
+                _save_profile(profile, n, time.time() - start, profiler,
+                              f1, f2, profilerows)
+            yield finish(n, gs, start, stats)
+            if not gs:
+                gs = oldgs
+            elif isinstance(oldgs, LevelFile):
+                # Spilled level of order n-1 is no longer needed
+                oldgs.close()
+                os.remove(os.path.join(spilldir, "level%03d" % (n-1)))
+    finally:
+        if reporter is not None:
+            reporter.remove_handler()
+        if spilldir is not None:
+            if isinstance(gs, LevelFile):
+                gs.close()
+            shutil.rmtree(spilldir, ignore_errors=True)
+        if workdir is not None:
+            n = len(counts)-1
+            done = ["n " + str(n)] if counts[-1] == 0 else []
+            _write_graph_file(os.path.join(workdir, "done"), [], done)
+
+
+def extremals(f1, f2, b1, b2, printflag=None, workdir=None,
+              shardsize=None, lease=None, poll=None, backend=None,
+              nthreads=None, checkpoint=None, resume=None,
+              memory=None, seed=None, enumeration=None,
+              metrics=None, progress=None, profile=None,
+              prune=None, duality=None, source=None):
+    """Return 1 + order of extremal graphs, list of extremal graphs.
+
+    Return (n, gs), where n is 1 + order of an extremal graph, or 0 if
+    no counterexample graph exists, and gs is a list of all extremal
+    graphs.
+
+    If printflag is True, prints, one on each line, pairs of the form
+    u v, where u is an integer from 0 to n, and v is the number of
+    counterexample graphs of order u.
+
+    If workdir is given, then we act as the coordinator of a sharded
+    computation, as described at the beginning of this file. Workers
+    call function work with the same workdir, f1, f2, b1, b2.
+
+    Otherwise, each order is computed by the given backend: "serial",
+    or "threads", meaning a pool of threads sharing the graphs of the
+    previous order. By default, we use "threads" if Python threads can
+    run in parallel (free-threaded Python with the GIL disabled), and
+    "serial" if not. Both give the same result.
+
+    If checkpoint is given, then each level (all counterexample graphs
+    of one order) is saved in directory checkpoint as it is completed,
+    in file levelNNN, where NNN is the order. If resume is also True,
+    then the computation is resumed from the last level saved, if any.
+    Each file is written atomically, so an interrupted run leaves the
+    previous levels intact. Checkpoint files are level files (see
+    LevelFile), with header lines giving the predicates, b1, b2, the
+    order, and the counts of all levels so far.
+
+    If seed is given, it is the name of such a level file, saved by an
+    earlier call with the same f1, f2, b1, b2; the computation starts
+    from the level it holds. When resuming, seed is used only if the
+    checkpoint directory holds no levels. If f1 & f2 are dual (see the
+    beginning of this file), then a level file saved with b1 & b2
+    swapped may also be given; the complements of its graphs are used.
+    So the last nonempty level of a computation gives the result with b1
+    & b2 swapped, computing just one more order.
+
+    If memory is given, then whenever the graphs kept while removing
+    isomorphic duplicates would take more than about memory bytes, we
+    switch to an external merge sort of the remaining graphs, keyed by
+    canonical form (see isograph.canonical_code), using temporary files.
+    Then, a computed level that would take more than memory bytes is
+    written to a temporary level file as it is found, and read from
+    there, so a level need not fit in memory. This does not apply to
+    backend "threads", or to a level restored from a checkpoint or
+    seed, which is read into memory. The result is the same.
+
+    If enumeration is "gray", then, when adding a vertex to a graph, we
+    try its possible neighborhoods in Gray-code order, so that each
+    differs from the last in one vertex, and predicates with a
+    gray_tracker attribute (see the beginning of this file) update
+    their state incrementally. If enumeration is "batch", then, for
+    predicates with a batch_parts attribute, all neighborhoods are
+    checked at once, using NumPy arrays; without NumPy, this is the
+    same as "powerset". The result is the same as with the default,
+    "powerset".
+
+    If metrics is given, then performance metrics are collected for each
+    level computed. metrics is either a function, which is called with a
+    dict for each level, or the name of a file, to which each such dict
+    is appended as a line of JSON. The dict gives the order, the number
+    of counterexample graphs, the time in seconds, the numbers of parent
+    graphs processed, of candidate graphs checked, of calls to each
+    predicate (with enumeration "gray" or "batch", of tracker queries or
+    candidates checked at once, for predicates that allow these), of
+    candidates rejected by each predicate, of pairs of graphs checked
+    for isomorphism, and of vertex permutations tried in these checks,
+    and the peak memory used by the process (resident set size in KiB;
+    None if unknown), under keys order, count, seconds, parents,
+    candidates, f1_calls, f2_calls, f1_rejects, f2_rejects, iso_checks,
+    iso_perms, peak_rss_kb. In a sharded computation, only work done by
+    the coordinator is counted.
+
+    If progress is given, then, while each level is computed, a line is
+    printed to stderr every progress seconds, giving the number of
+    parent graphs (counterexample graphs of the previous order) done so
+    far, out of the total, the number of counterexample graphs found so
+    far, the number of candidate graphs checked per second, and an
+    estimate of the time remaining for the level. In a sharded
+    computation, shards are counted instead of parent graphs. Also, if
+    possible, signal SIGUSR1 causes such a line to be printed at once.
+    If progress is 0, lines are printed only on the signal.
+
+    If profile is given, then the computation of each order n >= 1 is
+    profiled with module cProfile, and the results are written to
+    directory profile, in file levelNNN.pstats, where NNN is n, in the
+    format of module pstats. A summary table is also written there, in
+    file summary.txt, giving for each order the total time, and the time
+    spent generating & checking candidate graphs (extend), looking for
+    f-sets (fsets), in the predicates (pred), removing isomorphic
+    duplicates (dedup), and, within that, finding semi-canonical forms
+    (semicanon), computing neighbor degree sequences (degverts),
+    checking pairs for isomorphism (ck_iso), and finding canonical forms
+    (canon). With enumeration "gray", the predicates are mostly replaced
+    by trackers, whose time is counted only under extend. Profiling
+    slows the computation. With backend "threads", only the calling
+    thread is profiled, so use backend "serial".
+
+    If prune is True, then predicates with a link_rule attribute (see
+    the beginning of this file) are used to bound the degree of the new
+    vertex when adding a vertex to a graph, and neighborhoods of other
+    sizes are not tried. The bounds come from the values of n for the
+    same problem with b1 or b2 reduced by one, which are computed first,
+    also with pruning, and cached. The result is the same as without
+    pruning; only the number of candidate graphs checked differs.
+
+    If duality is True, f1 & f2 are dual, and b1 == b2, then the
+    complement of each counterexample graph is also one. So we keep just
+    one graph from each pair of complementary isomorphism classes (see
+    _pair_rep), and add vertices only to these, which roughly halves the
+    work. Counts are still of all counterexample graphs, and the graphs
+    returned include complements. But the graphs of a Level yielded by
+    iter_levels, and those saved in a checkpoint, are one from each
+    pair; a checkpoint saved with duality may be used only with
+    duality. Workers must be given the same duality. Otherwise, duality
+    is ignored.
+
+    If source is given, it is the checkpoint directory of a finished
+    computation whose counterexample graphs include ours: one with
+    predicates for which fewer sets are f-sets, or with larger b1 or b2.
+    Then each order is found by checking the graphs saved there of that
+    order, instead of by adding vertices to graphs; workdir, backend,
+    enumeration, and prune are not used. The graphs are found in a
+    different order, but the counts, and the extremal graphs up to
+    isomorphism, are the same. source may not be used with duality, and
+    must not have been saved with it.
+
+    Arguments:
+    f1 -- induced-hereditary predicate
+    f2 -- induced-hereditary predicate
+    b1 -- nonnegative int
+    b2 -- nonnegative int
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+    workdir -- optional string: directory for sharded computation
+        Created if it does not exist. Default is None: no sharding.
+    shardsize -- optional positive int: number of parents per shard
+        Default is 100.
+    lease -- optional number: seconds before a claimed shard may be
+        reclaimed. Default is 600.
+    poll -- optional number: seconds to wait between checks for
+        finished shards. Default is 1.
+    backend -- optional string: "serial" or "threads"
+        Default is chosen as described above.
+    nthreads -- optional positive int: number of threads for backend
+        "threads". Default is number of CPUs.
+    checkpoint -- optional string: directory for saving levels
+        Default is None: levels are not saved.
+    resume -- optional bool: whether to resume from checkpoint
+        Default is False.
+    memory -- optional int: memory budget in bytes for removing
+        isomorphic duplicates and holding levels. Default is None: no
+        limit.
+    seed -- optional string: name of level file to start from
+        Default is None: start from order zero.
+    enumeration -- optional string: "powerset", "gray", or "batch"
+        Default is "powerset".
+    metrics -- optional function or string: where to send metrics
+        Default is None: no metrics are collected.
+    progress -- optional number: seconds between progress reports
+        Default is None: no progress reports.
+    profile -- optional string: directory for profiles
+        Default is None: no profiling.
+    prune -- optional bool: whether to bound degrees of new vertices
+        Default is False.
+    duality -- optional bool: whether to keep one graph from each
+        complementary pair. Default is False.
+    source -- optional string: checkpoint directory of a computation
+        to filter. Default is None: levels are computed.
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = is_independent
+    >>> f2 = is_clique
+    >>> extremals(f1, f2, 3, 3)
+    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
+    >>> extremals(f1, f2, 3, 3, True)
+    Order & number of counterexample graphs:
+    0 1
+    1 1
+    2 2
+    3 2
+    4 3
+    5 1
+    6 0
+    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
+
+    A sharded computation, with one worker in a separate thread:
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> t = threading.Thread(target=work, args=(d, f1, f2, 3, 3),
+    ...                      kwargs={"poll": 0.01})
+    >>> t.start()
+    >>> extremals(f1, f2, 3, 3, workdir=d, shardsize=1, poll=0.01)
+    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
+    >>> t.join()
+    >>> shutil.rmtree(d)
+
+    Collecting metrics:
+
+    >>> records = []
+    >>> n, gs = extremals(f1, f2, 3, 3, metrics=records.append)
+    >>> [ (r["order"], r["parents"], r["candidates"], r["count"])
+    ...   for r in records ] #doctest: +NORMALIZE_WHITESPACE
+    [(0, 0, 0, 1), (1, 1, 1, 1), (2, 1, 2, 2), (3, 2, 8, 2),
+    (4, 2, 16, 3), (5, 3, 48, 1), (6, 1, 32, 0)]
+
+    Profiling:
+
+    >>> d = tempfile.mkdtemp()
+    >>> extremals(f1, f2, 3, 3, profile=d) == (n, gs)
+    True
+    >>> sorted(os.listdir(d)) #doctest: +NORMALIZE_WHITESPACE
+    ['level001.pstats', 'level002.pstats', 'level003.pstats',
+    'level004.pstats', 'level005.pstats', 'level006.pstats',
+    'summary.txt']
+    >>> with open(os.path.join(d, "summary.txt")) as f:
+    ...     f.readline().split() #doctest: +NORMALIZE_WHITESPACE
+    ['order', 'total', 'extend', 'fsets', 'pred', 'dedup', 'semicanon',
+    'degverts', 'ck_iso', 'canon']
+    >>> shutil.rmtree(d)
+
+    Pruning by link rules:
+
+    >>> records = []
+    >>> extremals(f1, f2, 3, 3, metrics=records.append,
+    ...           prune=True) == (n, gs)
+    True
+    >>> [ r["candidates"] for r in records ]
+    [0, 1, 2, 8, 12, 18, 0]
+
+    Holding levels in temporary files, which are then removed:
+
+    >>> d, w = tempfile.mkdtemp(), tempfile.mkdtemp()
+    >>> tempfile.tempdir = d
+    >>> extremals(f1, f2, 3, 4, memory=1) == extremals(f1, f2, 3, 4)
+    True
+    >>> extremals(f1, f2, 3, 3, memory=1, duality=True) == (n, gs)
+    True
+    >>> extremals(f1, f2, 3, 3, memory=1, workdir=w) == (n, gs)
+    True
+    >>> tempfile.tempdir = None
+    >>> os.listdir(d)
+    []
+    >>> shutil.rmtree(d)
+    >>> shutil.rmtree(w)
+
+    Keeping one of each complementary pair:
+
+    >>> records = []
+    >>> n2, gs2 = extremals(f1, f2, 3, 3, metrics=records.append,
+    ...                     duality=True)
+    >>> n2, [ isograph.isomorphic(g, gs[0]) for g in gs2 ]
+    (6, [True])
+    >>> [ (r["count"], r["candidates"]) for r in records ]
+    [(1, 0), (1, 1), (2, 2), (2, 4), (3, 8), (1, 32), (0, 32)]
+
+    Checkpointing, and resuming a finished computation:
+
+    >>> d = tempfile.mkdtemp()
+    >>> n, gs = extremals(f1, f2, 3, 3, checkpoint=d)
+    >>> sorted(os.listdir(d)) #doctest: +NORMALIZE_WHITESPACE
+    ['level000', 'level001', 'level002', 'level003', 'level004',
+    'level005', 'level006']
+    >>> extremals(f1, f2, 3, 3, checkpoint=d, resume=True) == (n, gs)
+    True
+    >>> seed = os.path.join(d, "level004")
+    >>> extremals(f1, f2, 3, 3, True, seed=seed) == (n, gs)
+    Order & number of counterexample graphs:
+    0 1
+    1 1
+    2 2
+    3 2
+    4 3
+    5 1
+    6 0
+    True
+    >>> shutil.rmtree(d)
+
+    Obtaining a result from one with b1 & b2 swapped:
+
+    >>> d = tempfile.mkdtemp()
+    >>> n, gs = extremals(f1, f2, 2, 4, checkpoint=d)
+    >>> seed = os.path.join(d, "level%03d" % (n-1))
+    >>> n2, gs2 = extremals(f1, f2, 4, 2, seed=seed)
+    >>> n2 == n, [ isograph.complement(g) for g in gs ] == gs2
+    (True, True)
+    >>> shutil.rmtree(d)
+
+    Filtering a computation with larger b2:
+
+    >>> d = tempfile.mkdtemp()
+    >>> n, gs = extremals(f1, f2, 3, 4, checkpoint=d)
+    >>> extremals(f1, f2, 3, 3, True, source=d)
+    Order & number of counterexample graphs:
+    0 1
+    1 1
+    2 2
+    3 2
+    4 3
+    5 1
+    6 0
+    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
+    >>> shutil.rmtree(d)
+
+    """
+    if printflag:
+        print("Order & number of counterexample graphs:")
+
+    # last is the level of highest order with a nonzero count
+    last = None
+    for level in iter_levels(f1, f2, b1, b2, workdir=workdir,
+                             shardsize=shardsize, lease=lease,
+                             poll=poll, backend=backend,
+                             nthreads=nthreads, checkpoint=checkpoint,
+                             resume=resume, memory=memory, seed=seed,
+                             enumeration=enumeration, metrics=metrics,
+                             progress=progress, profile=profile,
+                             prune=prune, duality=duality,
+                             source=source):
+        if printflag:
+            print(level.order, level.count)
+        if level.count:
+            last = level
+        elif level.order > 0:
+            # Read the graphs now: a level held in a temporary file
+            # (see iter_levels) is removed when iteration ends.
+            gs = last.graphs
+            if duality and b1 == b2 and _dual(f1, f2):
+                gs = _pair_expand(gs)
+            gs = list(gs)
+
+    n = level.order
+    if n == 0:
+        gs = []
+    return (n, gs)
+
+
+# ----------------------------------------------------------------------
+# Depth-First Search
+# ----------------------------------------------------------------------
+
+
+# The depth-first engine below explores a tree of counterexample graphs,
+# each node having one more vertex than its parent, holding only the
+# path from the root. Each counterexample graph is isomorphic to exactly
+# one node, by canonical augmentation (McKay's orderly method). In a
+# graph g, let c(g) be the vertex of minimum degree that is last in
+# isograph.canonical_labeling(g). A child g of a node is kept only if
+# its new vertex is in the same automorphism orbit as c(g); so, up to
+# isomorphism, g has a single parent: g with c(g) removed. Two kept
+# children of the same node h are isomorphic only if an automorphism of
+# h maps the neighborhood of one new vertex to that of the other; so
+# only neighborhoods that are least, as bitmasks, in their orbits under
+# the automorphism group of h are tried.
+#
+# Nothing is held but the path, with the automorphism group generators
+# of each node on it, so memory is bounded by a polynomial in n. Each
+# isomorphism class is visited once, as in breadth-first search
+# (extremals). Each child kept costs a canonical labeling, but only
+# neighborhoods giving the new vertex minimum degree are tried, and no
+# graphs are compared with each other; so finding n is typically much
+# faster than extremals, as well as using far less memory. When a
+# counterexample of a given order exists, it may be found sooner still.
+
+
+def _dfs_children(f1, f2, b1, b2, g):
+    """Yield children of counterexample graph g in depth-first tree.
+
+    These are the counterexample graphs consisting of g and a new vertex
+    in the orbit of the canonical minimum-degree vertex of the new
+    graph, one from each isomorphism class; see the comment above.
+
+    Arguments:
+    f1, f2, b1, b2 -- as for _counterexamples_up
+    g -- counterexample graph
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = is_independent
+    >>> f2 = is_clique
+    >>> list(_dfs_children(f1, f2, 3, 3, [[1], [0, 2], [1]]))
+    [[[1, 3], [0, 2], [1], [0]], [[1, 3], [0, 2], [1, 3], [0, 2]]]
+
+    """
+    n = len(g) + 1
+    degs = [ len(adjl) for adjl in g ]
+    label, autos = isograph.canonical_labeling(g)
+
+    # Neighborhoods for which the new vertex has minimum degree
+    def vsets():
+        for vset in isograph.powerset(range(n-1)):
+            d = len(vset)
+            for v in range(n-1):
+                if degs[v] < d and (degs[v] < d-1 or v not in vset):
+                    break
+            else:
+                yield vset
+
+    for child in _extend(f1, f2, b1, b2, n, g, vsets()):
+        if _least_in_orbit(child[-1], autos) and _canonical_last(child):
+            yield child
+
+
+def _least_in_orbit(vset, autos):
+    """Return True if vset is least of its images under group autos.
+
+    Sets are compared as bitmasks. autos is a list of permutations,
+    each a list mapping each vertex to its image; the images of vset
+    under the group they generate are searched, stopping at the first
+    smaller one.
+
+    >>> autos = [[2, 1, 0]]  # Automorphism of path 0-1-2
+    >>> _least_in_orbit([0], autos), _least_in_orbit([2], autos)
+    (True, False)
+
+    """
+    if not autos:
+        return True
+    mask = sum([ 1 << v for v in vset ])
+    seen = {mask}
+    todo = [mask]
+    while todo:
+        x = todo.pop()
+        vs = [ v for v in range(len(autos[0])) if x >> v & 1 ]
+        for a in autos:
+            y = sum([ 1 << a[v] for v in vs ])
+            if y < mask:
+                return False
+            if y not in seen:
+                seen.add(y)
+                todo.append(y)
+    return True
+
+
+def _canonical_last(g):
+    """Return True if last vertex of g is in orbit of canonical one.
+
+    The canonical vertex is the vertex of minimum degree whose label in
+    isograph.canonical_labeling(g) is greatest.
+
+    >>> _canonical_last([[1], [0, 2], [1]])
+    True
+    >>> _canonical_last([[1, 2], [0], [0]])
+    True
+    >>> _canonical_last([[2], [2], [0, 1]])
+    False
+
+    """
+    n = len(g)
+    mindeg = min(len(adjl) for adjl in g)
+    if len(g[-1]) != mindeg:
+        return False
+    label, autos = isograph.canonical_labeling(g)
+    c = max((v for v in range(n) if len(g[v]) == mindeg),
+            key=lambda v: label[v])
+    # Orbit of c under the automorphism group
+    orbit = {c}
+    todo = [c]
+    while todo:
+        v = todo.pop()
+        for a in autos:
+            if a[v] not in orbit:
+                orbit.add(a[v])
+                todo.append(a[v])
+    return n-1 in orbit
+
+
+def find_counterexample(f1, f2, b1, b2, n):
+    """Return a counterexample graph of order n, or None if none exists.
+
+    Uses depth-first search, which holds only a path of the search
+    tree, rather than the counterexample graphs of an order, and stops
+    at the first graph of order n found. See the comment above
+    _dfs_children.
+
+    Arguments:
+    f1 -- induced-hereditary predicate
+    f2 -- induced-hereditary predicate
+    b1 -- nonnegative int
+    b2 -- nonnegative int
+    n -- nonnegative int: order of graph to find
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = is_independent
+    >>> f2 = is_clique
+    >>> g = find_counterexample(f1, f2, 3, 3, 5)
+    >>> isograph.isomorphic(g, [[1,4], [0,2], [1,3], [2,4], [0,3]])
+    True
+    >>> print(find_counterexample(f1, f2, 3, 3, 6))
+    None
+
+    """
+    for g in _counterexamples_zero(f1, f2, b1, b2):
+        if n == 0:
+            return g
+        stack = [_dfs_children(f1, f2, b1, b2, g)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+            elif len(child) == n:
+                return child
+            else:
+                stack.append(_dfs_children(f1, f2, b1, b2, child))
+    return None
+
+
+def ramsey_value(f1, f2, b1, b2, printflag=None):
+    """Return 1 + order of extremal graphs, and one extremal graph.
+
+    Return (n, g), where n is as for extremals, and g is one extremal
+    graph, or None if n is 0. Uses depth-first search, which holds only
+    a path of the search tree, rather than the counterexample graphs of
+    an order, and visits each isomorphism class of counterexample graphs
+    once; see the comment above _dfs_children. This is typically much
+    faster than extremals.
+
+    If printflag is True, prints the order of each counterexample graph
+    found that is larger than all found before it.
+
+    Arguments:
+    f1 -- induced-hereditary predicate
+    f2 -- induced-hereditary predicate
+    b1 -- nonnegative int
+    b2 -- nonnegative int
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = is_independent
+    >>> f2 = is_clique
+    >>> n, g = ramsey_value(f1, f2, 3, 3, True)
+    Orders of counterexample graphs found:
+    0
+    1
+    2
+    3
+    4
+    5
+    >>> n
+    6
+    >>> isograph.isomorphic(g, [[1,4], [0,2], [1,3], [2,4], [0,3]])
+    True
+
+    """
+    if printflag:
+        print("Orders of counterexample graphs found:")
+
+    best = None
+    for g in _counterexamples_zero(f1, f2, b1, b2):
+        best = g
+        if printflag:
+            print(0)
+        stack = [_dfs_children(f1, f2, b1, b2, g)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            if len(child) > len(best):
+                best = child
+                if printflag:
+                    print(len(best))
+            stack.append(_dfs_children(f1, f2, b1, b2, child))
+
+    if best is None:
+        return (0, None)
+    return (len(best)+1, best)
+
+
+# ----------------------------------------------------------------------
+# Verifying Computations
+# ----------------------------------------------------------------------
+
+
+# A computation saved by extremals with option checkpoint is its own
+# certificate. Given that the graphs of order n-1 are the counterexample
+# graphs of that order, one from each isomorphism class, those of order
+# n are too iff (1) each is a counterexample graph, (2) no two are
+# isomorphic, (3) each, with its last vertex removed, is isomorphic to
+# one of order n-1, and (4) each counterexample graph made by adding a
+# vertex to one of order n-1 is isomorphic to one of order n. As the
+# predicates are induced-hereditary, (1) need only check sets containing
+# the last vertex, given (3). These checks use canonical codes only,
+# with no deduplication, and are independent of the code that computed
+# the levels: each graph checked is constructed, and the predicates are
+# called directly, through _Plain, never through with_last, with_masks,
+# or trackers. The only exception is that, in (4), batch_parts is used,
+# through _batch_hits, as a filter. A graph it passes is taken to be a
+# counterexample graph unchecked; but it must then be isomorphic to a
+# graph of order n, which (1) and (3) show to be one. For a graph it
+# rejects, it names an f-set, and a single call of the predicate on
+# that set confirms it; only if that fails are all sets tried. So a bug
+# in the optional attributes of a predicate cannot make a check pass.
+# The checks are split among processes, which read the levels from
+# _verify_state.
+
+# _verify_state - data for the checks at one order, in each process
+_verify_state = dict()
+
+
+class _Plain:
+    """Predicate wrapper having no attribute but the predicate itself.
+
+    has_fset and has_fset_with_last, given a _Plain object, call f on
+    each set, as they would a predicate with no optional attributes.
+
+    >>> f = _Plain(Clique())
+    >>> f([[1], [0]], (0, 1)), hasattr(f, "with_masks")
+    (True, False)
+
+    """
+
+    __slots__ = ("f",)
+
+    def __init__(self, f):
+        self.f = f
+
+    def __call__(self, g, s):
+        return self.f(g, s)
+
+
+def _verify_init(state):
+    """Set _verify_state to dict state, in a process doing checks."""
+    _verify_state.clear()
+    _verify_state.update(state)
+
+
+def _verify_graphs(span):
+    """Check graphs start .. stop-1 of a level; return (codes, error).
+
+    span is a pair (start, stop). Checks (1) and (3) above are made,
+    using _verify_state: predicates f1, f2 and ints b1, b2, PackedLevel
+    level, and set parents of canonical codes of the level below. codes
+    is the list of canonical codes of the graphs; error is None, or a
+    string describing the first graph failing a check.
+
+    """
+    st = _verify_state
+    level = st["level"]
+    n = level.order
+    codes = []
+    for i in range(*span):
+        g = level[i]
+        if (has_fset_with_last(st["f1"], st["b1"], g) or
+            has_fset_with_last(st["f2"], st["b2"], g)):
+            return codes, ("order %d: graph %d is not a counterexample"
+                           % (n, i))
+        h = [ [ w for w in nbrs if w != n-1 ] for nbrs in g[:-1] ]
+        if isograph.canonical_code(h) not in st["parents"]:
+            return codes, ("order %d: graph %d has no parent in "
+                           "order %d" % (n, i, n-1))
+        codes.append(isograph.canonical_code(g))
+    return codes, None
+
+
+def _verify_extensions(span):
+    """Check extensions of graphs start .. stop-1; return error.
+
+    span is a pair (start, stop). Check (4) above is made, using
+    _verify_state: predicates f1, f2 and ints b1, b2, PackedLevel
+    parents, and set codes of canonical codes of the level above.
+    Returns None, or a string describing the first extension failing
+    the check. Every neighborhood of the new vertex is tried.
+
+    """
+    st = _verify_state
+    parents = st["parents"]
+    m = parents.order
+    for i in range(*span):
+        h = parents[i]
+        for vset in _counterexample_vsets(st["f1"], st["f2"], st["b1"],
+                                          st["b2"], h):
+            g = _add_vertex(h, vset)
+            if isograph.canonical_code(g) not in st["codes"]:
+                return ("order %d: graph %d of order %d, with a vertex "
+                        "adjacent to %s, is a missing counterexample"
+                        % (m+1, i, m, list(vset)))
+    return None
+
+
+def _counterexample_vsets(f1, f2, b1, b2, h):
+    """Return list of vsets that may give counterexample graphs from h.
+
+    These include the sets vset of vertices of h such that h, along with
+    a new vertex adjacent to the vertices in vset, contains no f1-set of
+    order b1 and no f2-set of order b2 containing the new vertex. A vset
+    is left out only if this graph is constructed, and an f-set is found
+    in it by calling the predicate itself, through _Plain. If NumPy is
+    available, then f1 and f2 should be given unwrapped: for a
+    predicate with a batch_parts attribute, the graphs that _batch_hits
+    says have no f-set are included unchecked, and, for each of the
+    others, the predicate is first called on the f-set that _batch_hits
+    names; all sets are tried only if that call returns False.
+
+    >>> _counterexample_vsets(is_independent, is_clique, 3, 3,
+    ...                       [[1], [0]])
+    [(), (0,), (1,)]
+    >>> _counterexample_vsets(Independent(), Clique(), 3, 3,
+    ...                       [[1], [0]])
+    [(), (0,), (1,)]
+
+    A batch_parts attribute that finds no f-sets lets all through:
+
+    >>> class BadClique(Clique):
+    ...     def batch_parts(self, h, b):
+    ...         return False, 0, []
+    >>> _counterexample_vsets(Independent(), BadClique(), 3, 2,
+    ...                       [[1], [0]])
+    [(), (0,), (1,), (0, 1)]
+    >>> _counterexample_vsets(Independent(), _Plain(BadClique()), 3, 2,
+    ...                       [[1], [0]])
+    [()]
+
+    """
+    m = len(h)
+    alive = list(range(1 << m))  # Codes of vsets, as in _extend_batch
+    numpy = _numpy()
+    for f, b in [(f1, b1), (f2, b2)]:
+        found = None
+        if numpy is not None and alive:
+            cands = ((numpy.array(alive)[:, None] >> numpy.arange(m))
+                     & 1).astype(numpy.float32)
+            found = _batch_hits(f, b, h, cands, True)
+        if found is None:
+            found = [()] * len(alive)  # Check all
+        plain = _Plain(f)
+        left = []
+        for c, s in zip(alive, found):
+            if s is None:
+                left.append(c)  # Passed by batch_parts
+                continue
+            g = _add_vertex(h, _code_vset(c, m))
+            if s and len(s) == b and plain(g, s):
+                continue
+            if not has_fset_with_last(plain, b, g):
+                left.append(c)
+        alive = left
+    return [ _code_vset(c, m) for c in alive ]
+
+
+def _verify_map(func, count, state, processes):
+    """Return list of func(span) for spans covering range(count).
+
+    Calls are made in processes processes, each first calling
+    _verify_init(state); or, if processes is 1, in this process.
+
+    """
+    step = max(1, -(-count // (16*processes)))
+    spans = [ (start, min(count, start+step))
+              for start in range(0, count, step) ]
+    if processes == 1:
+        _verify_init(state)
+        try:
+            return [ func(span) for span in spans ]
+        finally:
+            _verify_state.clear()
+    with multiprocessing.Pool(processes, _verify_init,
+                              [state]) as pool:
+        return pool.map(func, spans)
+
+
+def _verified_level(f1, f2, b1, b2, level, parents, parentcodes,
+                    processes):
+    """Check a level against the one below; return its codes.
+
+    level and parents are PackedLevel objects, holding the graphs of
+    orders n and n-1, and parentcodes is the set of canonical codes of
+    parents. Returns the set of canonical codes of level. Raises
+    ValueError if level is not exactly the counterexample graphs of
+    order n, one from each isomorphism class, given that parents are
+    those of order n-1. See the comment above _verify_state.
+
+    """
+    n = level.order
+    state = {"f1": _Plain(f1), "f2": _Plain(f2), "b1": b1, "b2": b2,
+             "level": level, "parents": parentcodes}
+    codes = []
+    for spancodes, error in _verify_map(_verify_graphs, len(level),
+                                        state, processes):
+        codes += spancodes
+        if error is not None:
+            raise ValueError(error)
+    codeset = set(codes)
+    if len(codeset) != len(codes):
+        first = dict()
+        for i, code in enumerate(codes):
+            if code in first:
+                raise ValueError("order %d: graphs %d and %d are "
+                                 "isomorphic" % (n, first[code], i))
+            first[code] = i
+
+    # Unwrapped, so _counterexample_vsets can use batch_parts
+    state = {"f1": f1, "f2": f2, "b1": b1, "b2": b2,
+             "parents": parents, "codes": codeset}
+    for error in _verify_map(_verify_extensions, len(parents), state,
+                             processes):
+        if error is not None:
+            raise ValueError(error)
+    return codeset
+
+
+def verify(f1, f2, b1, b2, checkpoint, gs=None, counts=None,
+           processes=None, printflag=None):
+    """Check a computation saved by extremals; return (n, gs).
+
+    checkpoint is a directory in which extremals, with option
+    checkpoint, saved every level of a finished computation with the
+    same predicates and b1, b2. We check that the graphs of each order
+    are exactly the counterexample graphs of that order, one from each
+    isomorphism class: those of order zero directly, and each higher
+    order against the one below, as described in the comment above
+    _verify_state. The work of each order is split among processes
+    processes, in which case f1, f2 must be picklable (see Predicate).
+    The predicates are called directly, not through their optional
+    attributes, so a bug in these is caught; batch_parts is used only as
+    a filter, as described there. In one process, this takes about a
+    quarter of the time of the computation itself for R_2(6,6) with
+    sparseramsey.py, and a twelfth for R*_3(5,6) with dividedramsey.py;
+    the work of each order is split evenly among processes.
+
+    Returns (n, gs), as for extremals. If printflag is True, prints the
+    order & number of counterexample graphs of each order as it is
+    checked, as extremals does. Raises ValueError, describing the first
+    problem found, if a check fails, or if the checkpoint directory
+    does not hold such a computation.
+
+    If gs is given, then we also check that its graphs are the extremal
+    graphs, one from each isomorphism class, in some order; and if
+    counts is given, that its items are the numbers of counterexample
+    graphs of orders 0 .. n. Use read_results to get gs & counts from
+    printed output.
+
+    Arguments:
+    f1, f2 -- induced-hereditary predicates
+    b1, b2 -- nonnegative ints
+    checkpoint -- string: checkpoint directory
+    gs -- optional list of graphs: claimed extremal graphs
+    counts -- optional list of ints: claimed numbers of
+      counterexample graphs
+    processes -- optional int: number of processes
+        Default is None: one for each processor.
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> f1, f2 = Independent(), Clique()
+    >>> n, gs = extremals(f1, f2, 3, 4, checkpoint=d)
+    >>> verify(f1, f2, 3, 4, d, gs=gs[::-1], processes=2) == (n, gs)
+    True
+    >>> n, len(gs)
+    (9, 3)
+    >>> verify(f1, f2, 3, 4, d, gs=gs[1:])
+    Traceback (most recent call last):
+      ...
+    ValueError: 1 extremal graph(s) missing
+    >>> header = _job_header(f1, f2, 3, 4)
+    >>> counts, level = _load_level(_checkpoint_path(d, 5), header,
+    ...                             "checkpoint")
+    >>> gs5 = list(level)
+    >>> _save_checkpoint(d, header, counts, gs5[1:])
+    >>> verify(f1, f2, 3, 4, d)
+    Traceback (most recent call last):
+      ...
+    ValueError: checkpoint level005 holds 8 graphs, not 9
+    >>> _save_checkpoint(d, header, counts, gs5[1:] + gs5[1:2])
+    >>> verify(f1, f2, 3, 4, d)
+    Traceback (most recent call last):
+      ...
+    ValueError: order 5: graphs 0 and 8 are isomorphic
+    >>> shutil.rmtree(d)
+
+    A computation made with a faulty with_masks attribute fails:
+
+    >>> class BadClique(Clique):
+    ...     def with_masks(self, adj, s, smask):
+    ...         return True  # Sees a clique everywhere
+    >>> d = tempfile.mkdtemp()
+    >>> extremals(f1, BadClique(), 3, 3, checkpoint=d)[0]
+    3
+    >>> verify(f1, BadClique(), 3, 3, d,
+    ...        processes=1)  #doctest: +ELLIPSIS
+    Traceback (most recent call last):
+      ...
+    ValueError: order 3: graph 0 ... is a missing counterexample
+    >>> shutil.rmtree(d)
+
+    A computation with option duality is checked in full:
+
+    >>> d = tempfile.mkdtemp()
+    >>> n, gs = extremals(f1, f2, 3, 3, checkpoint=d, duality=True)
+    >>> verify(f1, f2, 3, 3, d, printflag=True)
+    Order & number of counterexample graphs:
+    0 1
+    1 1
+    2 2
+    3 2
+    4 3
+    5 1
+    6 0
+    (6, [[[2, 3], [3, 4], [0, 4], [0, 1], [1, 2]]])
+    >>> shutil.rmtree(d)
+
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    assert processes >= 1
+
+    # Find the counts of the last level saved, and whether levels hold
+    # one graph from each complementary pair
+    header = _job_header(f1, f2, b1, b2)
+    names = []
+    if os.path.isdir(checkpoint):
+        names = [ name for name in _shard_files(checkpoint)
+                  if name.startswith("level") ]
+    if not names:
+        raise ValueError("checkpoint holds no levels")
+    with LevelFile(os.path.join(checkpoint, names[-1])) as lf:
+        pairs = lf.header[:len(header)+1] == header + ["duality pairs"]
+        if pairs:
+            header = _job_header(f1, f2, b1, b2, pairs)
+        savedcounts = _level_file_counts(lf, header, "checkpoint")
+    if savedcounts[-1] != 0:
+        raise ValueError("checkpoint holds an unfinished computation")
+    n = len(savedcounts)-1
+
+    if printflag:
+        print("Order & number of counterexample graphs:")
+    parents, parentcodes = None, None
+    for m in range(n+1):
+        path = _checkpoint_path(checkpoint, m)
+        what = "checkpoint level%03d" % m
+        if not os.path.isfile(path):
+            raise ValueError("checkpoint has no level%03d" % m)
+        levelcounts, level = _load_level(path, header, what)
+        if levelcounts != savedcounts[:m+1]:
+            raise ValueError(what + " has counts that differ from " +
+                             "those of the last level")
+        if pairs:
+            level = PackedLevel(m, _pair_expand(level))
+        if len(level) != savedcounts[m]:
+            raise ValueError("%s holds %d graphs, not %d"
+                             % (what, len(level), savedcounts[m]))
+        if m == 0:
+            zero = not (has_fset(f1, b1, []) or has_fset(f2, b2, []))
+            if len(level) != int(zero):
+                raise ValueError("order 0: wrong number of graphs")
+            codes = { 0 } if zero else set()
+        else:
+            codes = _verified_level(f1, f2, b1, b2, level, parents,
+                                    parentcodes, processes)
+        if printflag:
+            print(m, len(level))
+        if m < n:
+            parents, parentcodes = level, codes
+
+    # The extremal graphs are those of order n-1
+    if counts is not None and list(counts) != savedcounts:
+        raise ValueError("counts differ: " +
+                         " ".join(map(str, counts)))
+    extremal = list(parents) if n > 0 else []
+    if gs is not None:
+        seen = dict()
+        for i, g in enumerate(gs):
+            if (len(g) != n-1 or has_fset(f1, b1, g) or
+                has_fset(f2, b2, g)):
+                raise ValueError("extremal graph %d is not a "
+                                 "counterexample graph of order %d"
+                                 % (i, n-1))
+            code = isograph.canonical_code(g)
+            if code in seen:
+                raise ValueError("extremal graphs %d and %d are "
+                                 "isomorphic" % (seen[code], i))
+            seen[code] = i
+        if len(seen) < len(extremal):
+            raise ValueError("%d extremal graph(s) missing"
+                             % (len(extremal) - len(seen)))
+    return (n, extremal)
+
+
+def read_results(path):
+    """Return (counts, gs) from a file of output of extremals.
+
+    The file holds text printed by a program using extremals, as do the
+    files in RESULTS: the lines printed by extremals with printflag
+    True, giving the numbers of counterexample graphs, and extremal
+    graphs in DOT language (see isograph.dot_str), along with other
+    text. counts is the list of numbers of counterexample graphs of
+    orders 0, 1, ..., or None if they are not in the file; gs is the
+    list of graphs in the file. Pass these to verify.
+
+    Arguments:
+    path -- string: name of file to read
+
+    See isograph.py for our graph representation.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> path = os.path.join(d, "out.txt")
+    >>> with open(path, "w") as f:
+    ...     print("Order & number of counterexample graphs:", file=f)
+    ...     print("0 1\\n1 1\\n2 0\\n", file=f)
+    ...     print(isograph.dot_str([[]], "e1"), file=f)
+    >>> read_results(path)
+    ([1, 1, 0], [[[]]])
+    >>> shutil.rmtree(d)
+
+    """
+    with open(path) as f:
+        text = f.read()
+    counts = None
+    lines = text.split("\n")
+    if "Order & number of counterexample graphs:" in lines:
+        start = lines.index("Order & number of counterexample graphs:")
+        counts = []
+        for line in lines[start+1:]:
+            fields = line.split()
+            if len(fields) != 2 or int(fields[0]) != len(counts):
+                break
+            counts.append(int(fields[1]))
+    gs = [ g for name, g in isograph.from_dot_str(text) ]
+    return counts, gs
+
+
+# ----------------------------------------------------------------------
+# Graph Files & Checkpoints
+# ----------------------------------------------------------------------
+
+
+def _predicate_id(f):
+    """Return string identifying predicate f, for file headers.
+
+    The string holds the qualified name of f, followed by the values of
+    any variables f is closed over, in parentheses. A predicate object
+    is identified by its repr. A wrapper (with a __wrapped__ attribute)
+    is identified by the predicate it wraps.
+
+    Arguments:
+    f -- predicate
+
+    >>> _predicate_id(is_clique)
+    'is_clique'
+    >>> def make_f(k):
+    ...     def f(g, s):
+    ...         return len(s) <= k
+    ...     return f
+    >>> _predicate_id(make_f(3))
+    'make_f.<locals>.f(3)'
+    >>> _predicate_id(Memoized(make_f(3)))
+    'make_f.<locals>.f(3)'
+    >>> _predicate_id(Clique())
+    'Clique()'
+
+    """
+    while hasattr(f, "__wrapped__"):
+        f = f.__wrapped__
+    if isinstance(f, Predicate):
+        return repr(f)
+    name = getattr(f, "__qualname__", type(f).__qualname__)
+    cells = getattr(f, "__closure__", None)
+    if cells:
+        name += "(" + ",".join([ repr(c.cell_contents)
+                                 for c in cells ]) + ")"
+    return name
+
+
+def _job_header(f1, f2, b1, b2, pairs=False):
+    """Return list of header lines describing the given computation.
+
+    If pairs is True, levels hold one graph from each complementary
+    pair; see option duality of extremals.
+
+    """
+    header = ["f1 " + _predicate_id(f1), "f2 " + _predicate_id(f2),
+              "b1 " + str(b1), "b2 " + str(b2)]
+    if pairs:
+        header.append("duality pairs")
+    return header
+
+
+def _worker_id():
+    """Return string identifying this thread, unique across machines."""
+    return (socket.gethostname() + "-" + str(os.getpid()) + "-" +
+            str(threading.get_ident()))
+
+
+def _tmp_path(path):
+    """Return temporary name for writing a file to be renamed to path.
+
+    The name is in the same directory as path, begins with ".", and is
+    unique to this thread.
+
+    """
+    dirname, basename = os.path.split(path)
+    return os.path.join(dirname,
+                        "." + basename + "." + _worker_id() + ".tmp")
+
+
+def _replace(tmppath, path):
+    """Rename file tmppath to path, atomically & durably.
+
+    The file must already have been flushed & synced.
+
+    """
+    os.replace(tmppath, path)
+
+    # Make the rename itself durable, where the platform allows it
+    try:
+        dirfd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dirfd)
+    except OSError:
+        pass
+    finally:
+        os.close(dirfd)
+
+
+def _write_graph_file(path, gs, header=None):
+    """Atomically write a graph file holding the given graphs.
+
+    The file is written under a temporary name in the same directory,
+    synced, and then renamed to path, replacing any existing file. So
+    readers see either the old file or the complete new one.
+
+    Arguments:
+    path -- string: name of file to write
+    gs -- iterable yielding graphs
+    header -- optional list of strings: header lines, without "#"
+
+    See isograph.py for our graph representation.
+
+    """
+    tmppath = _tmp_path(path)
+    with open(tmppath, "w") as f:
+        for line in (header or []):
+            f.write("#" + line + "\n")
+        for g in gs:
+            f.write(isograph.graph6_str(g) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    _replace(tmppath, path)
+
+
+def _read_graph_file(path):
+    """Return (header, gs) read from the given graph file.
+
+    header is the list of header lines, without "#"; gs is the list of
+    graphs in the file.
+
+    Arguments:
+    path -- string: name of file to read
+
+    See isograph.py for our graph representation.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> path = os.path.join(d, "f")
+    >>> _write_graph_file(path, [[], [[1], [0]]], ["b1 3"])
+    >>> _read_graph_file(path)
+    (['b1 3'], [[], [[1], [0]]])
+    >>> shutil.rmtree(d)
+
+    """
+    header = []
+    gs = []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("#"):
+                header.append(line[1:])
+            elif line:
+                gs.append(isograph.from_graph6(line))
+    return header, gs
+
+
+def _checkpoint_path(checkpoint, n):
+    """Return name of checkpoint file for order n in dir checkpoint."""
+    return os.path.join(checkpoint, "level%03d" % n)
+
+
+def _save_checkpoint(checkpoint, header, counts, gs):
+    """Atomically save a completed level in a checkpoint directory.
+
+    The level saved is the last one in counts: order len(counts)-1. It
+    is saved as a level file, whose header lines are the given header,
+    the order, and the counts of all levels so far. Checkpoint files for
+    earlier orders are left in place.
+
+    Arguments:
+    checkpoint -- string: checkpoint directory; created if necessary
+    header -- list of strings: header lines describing computation
+    counts -- list of ints: numbers of counterexample graphs of orders
+      0, 1, ..., n
+    gs -- list or PackedLevel: counterexample graphs of order n
+
+    See isograph.py for our graph representation.
+
+    """
+    os.makedirs(checkpoint, exist_ok=True)
+    n = len(counts)-1
+    write_level_file(_checkpoint_path(checkpoint, n), n, gs,
+                     header + ["order " + str(n),
+                               "counts " + " ".join(map(str, counts))])
+
+
+def _level_file_counts(level, header, what):
+    """Return counts from header of LevelFile saved by extremals.
+
+    Raises ValueError if the level file does not match the given header.
+    what is a string naming the file, for use in the error message.
+
+    """
+    fileheader = level.header
+    if (fileheader[:len(header)] != header or
+        len(fileheader) != len(header) + 2):
+        raise ValueError(what + " does not match computation: " +
+                         "; ".join(fileheader[:-2]))
+    return [ int(c) for c in fileheader[-1].split()[1:] ]
+
+
+def _load_level(path, header, what, dual=None):
+    """Return (counts, level) from level file saved by extremals.
+
+    level is a PackedLevel holding a copy of the graphs in the file.
+    Raises ValueError if the file does not match the given header.
+
+    If dual is given, it is the header of the dual computation: with b1
+    and b2 swapped, for dual predicates. A file matching it is also
+    accepted, and level then holds the complements of its graphs.
+
+    """
+    with LevelFile(path) as lf:
+        if dual is not None and lf.header[:len(dual)] == dual:
+            counts = _level_file_counts(lf, dual, what)
+            level = PackedLevel(lf.order, ( isograph.complement(g)
+                                            for g in lf ))
+        else:
+            counts = _level_file_counts(lf, header, what)
+            level = PackedLevel(lf.order)
+            level.data = bytearray(lf.records(0, len(lf)))
+    return counts, level
+
+
+def _load_checkpoint(checkpoint, header):
+    """Return (counts, gs) from last level saved in a checkpoint dir.
+
+    counts is the list of numbers of counterexample graphs of each order
+    up to the last order saved, and gs is a PackedLevel holding the
+    graphs of the last order with nonzero count. Returns ([], None) if
+    there are no checkpoint files. Raises ValueError if the saved
+    computation does not match the given header.
+
+    Arguments:
+    checkpoint -- string: checkpoint directory
+    header -- list of strings: header lines describing computation
+
+    See isograph.py for our graph representation.
+
+    >>> import tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> _save_checkpoint(d, ["b1 3"], [1, 1], [[[]]])
+    >>> _save_checkpoint(d, ["b1 3"], [1, 1, 0], [])
+    >>> counts, gs = _load_checkpoint(d, ["b1 3"])
+    >>> counts, list(gs)
+    ([1, 1, 0], [[[]]])
+    >>> _load_checkpoint(d, ["b1 4"])
+    Traceback (most recent call last):
+      ...
+    ValueError: checkpoint does not match computation: b1 3
+    >>> shutil.rmtree(d)
+
+    """
+    if not os.path.isdir(checkpoint):
+        return [], None
+    names = [ name for name in _shard_files(checkpoint)
+              if name.startswith("level") ]
+    if not names:
+        return [], None
+
+    counts, gs = _load_level(os.path.join(checkpoint, names[-1]),
+                             header, "checkpoint")
+    n = len(counts)-1
+    if counts[-1] == 0 and n > 0:
+        oldcounts, gs = _load_level(_checkpoint_path(checkpoint, n-1),
+                                    header, "checkpoint")
+    return counts, gs
+
+
+# ----------------------------------------------------------------------
+# Distributed Computation
+# ----------------------------------------------------------------------
+
+
+# Subdirectories of a level directory in a sharded computation
+_SHARD_SUBDIRS = ["todo", "claimed", "out"]
+
+
+def _shard_files(dirname):
+    """Return sorted list of names of finished files in a directory."""
+    return sorted([ name for name in os.listdir(dirname)
+                    if not name.startswith(".") ])
+
+
+def _start_job(workdir, f1, f2, b1, b2, pairs=False):
+    """Prepare workdir for a new sharded computation."""
+    os.makedirs(workdir, exist_ok=True)
+    donepath = os.path.join(workdir, "done")
+    if os.path.exists(donepath):
+        os.remove(donepath)
+    for name in os.listdir(workdir):
+        if name[:3].isdigit():  # Level directory left from earlier run
+            shutil.rmtree(os.path.join(workdir, name))
+    _write_graph_file(os.path.join(workdir, "job"), [],
+                      _job_header(f1, f2, b1, b2, pairs))
+
+
+def _sharded_up(f1, f2, b1, b2, n, oldgs, workdir, shardsize, lease,
+                poll, memory=None, enumeration=None, stats=None,
+                progress=None, sizes=None, pairs=False, spilldir=None):
+    """Return PackedLevel of counterexample n-graphs, using shards.
+
+    The counterexample graphs of order n-1 are written to shards, which
+    are processed by workers and by this function. The outputs are then
+    merged. The returned level holds exactly the graphs yielded by
+    _counterexamples_up.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+    oldgs -- list, PackedLevel or LevelFile: all counterexample graphs
+      of order n-1
+    workdir, shardsize, lease, poll, memory, enumeration -- as for
+      extremals
+    stats -- optional collections.Counter: as for _counterexamples_up
+      Only work done in this process is counted.
+    progress -- optional _Progress: counts shards with output
+    sizes -- optional pair: as for _counterexamples_up
+    pairs -- optional bool: as for _counterexamples_up
+    spilldir -- optional string: if given, with memory, then the level
+      is returned as a LevelFile in this directory if it is larger than
+      memory bytes; see _spilled_level
+
+    See isograph.py for our graph representation.
+
+    """
+    # Write shards under a temporary name, so workers never see a
+    # partially written level.
+    leveldir = os.path.join(workdir, "%03d" % n)
+    tmpdir = os.path.join(workdir, ".%03d.tmp" % n)
+    if os.path.exists(tmpdir):
+        shutil.rmtree(tmpdir)
+    for sub in _SHARD_SUBDIRS:
+        os.makedirs(os.path.join(tmpdir, sub))
+    nshards = 0
+    for i in range(0, len(oldgs), shardsize):
+        shardpath = os.path.join(tmpdir, "todo", "%06d" % nshards)
+        _write_graph_file(shardpath, oldgs[i:i+shardsize])
+        nshards += 1
+    os.rename(tmpdir, leveldir)
+    if progress is not None:
+        progress.start_level(n, nshards, "shards",
+                             shardsize << (n-1))
+
+    # Help with the work until every shard has output
+    outdir = os.path.join(leveldir, "out")
+    while True:
+        finished = len(_shard_files(outdir))
+        if progress is not None:
+            progress.set_done(finished)
+        if finished >= nshards:
+            break
+        if not _work_one_shard(f1, f2, b1, b2, n, leveldir, lease,
+                               enumeration, stats, sizes, pairs):
+            _reclaim_shards(leveldir, lease)
+            time.sleep(poll)
+
+    # Merge outputs. Shard outputs are duplicate-free, and are read in
+    # shard order, so the result is the same as without sharding.
+    def all_outputs():
+        for name in _shard_files(outdir):
+            header, gs = _read_graph_file(os.path.join(outdir, name))
+            for g in gs:
+                yield g
+
+    gs = _unique_iso(all_outputs(), memory, stats)
+    if progress is not None:
+        gs = progress.counted(gs)
+    if memory is None or spilldir is None:
+        gs = PackedLevel(n, gs)
+    else:
+        gs = _spilled_level(n, gs, memory, spilldir)
+    shutil.rmtree(leveldir)
+    return gs
+
+
+def _leased(items, path, lease):
+    """Yield items from iterable, renewing the lease on the given file.
+
+    The modification time of the file is updated whenever a quarter of
+    the lease time has passed since the last update. Failure to update
+    (because the file was reclaimed) is ignored.
+
+    """
+    last = time.time()
+    for item in items:
+        now = time.time()
+        if now - last > lease / 4:
+            last = now
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        yield item
+
+
+def _work_one_shard(f1, f2, b1, b2, n, leveldir, lease,
+                    enumeration=None, stats=None, sizes=None,
+                    pairs=False):
+    """Claim & process one shard in leveldir. Return False if none.
+
+    Arguments:
+    f1, f2, b1, b2, n -- as for _counterexamples_up
+    leveldir -- string: level directory in a sharded computation
+    lease -- number: lease time in seconds, as for extremals
+    enumeration -- optional string: as for extremals
+    stats -- optional collections.Counter: as for _counterexamples_up
+    sizes -- optional pair: as for _counterexamples_up
+    pairs -- optional bool: as for _counterexamples_up
+
+    """
+    tododir = os.path.join(leveldir, "todo")
+    for name in _shard_files(tododir):
+        claimpath = os.path.join(leveldir, "claimed",
+                                 name + "." + _worker_id())
+        try:
+            os.rename(os.path.join(tododir, name), claimpath)
+        except FileNotFoundError:
+            continue  # Another worker claimed it first
+        os.utime(claimpath)  # Lease starts now
+
+        header, oldgs = _read_graph_file(claimpath)
+        gs = _counterexamples_up(f1, f2, b1, b2, n,
+                                 _leased(oldgs, claimpath, lease),
+                                 enumeration=enumeration, stats=stats,
+                                 sizes=sizes, pairs=pairs)
+        _write_graph_file(os.path.join(leveldir, "out", name), gs)
+        try:
+            os.remove(claimpath)
+        except FileNotFoundError:
+            pass  # Lease expired & shard was reclaimed; no harm done
+        return True
+    return False
+
+
+def _reclaim_shards(leveldir, lease):
+    """Return shards with expired leases in leveldir to todo/."""
+    claimdir = os.path.join(leveldir, "claimed")
+    now = time.time()
+    for name in _shard_files(claimdir):
+        claimpath = os.path.join(claimdir, name)
+        try:
+            if now - os.stat(claimpath).st_mtime <= lease:
+                continue
+            shard = name.split(".")[0]
+            os.rename(claimpath, os.path.join(leveldir, "todo", shard))
+        except FileNotFoundError:
+            pass  # Worker finished, or another process reclaimed it
+
+
+def work(workdir, f1, f2, b1, b2, lease=None, poll=None,
+         enumeration=None, prune=None, duality=None):
+    """Act as worker in a sharded computation. Return # shards done.
+
+    The coordinator is a call to extremals with the same workdir, f1,
+    f2, b1, b2. We wait for the coordinator to start the computation, if
+    it has not already, then repeatedly claim & process shards, until
+    the coordinator marks the computation as finished. See the beginning
+    of this file for details.
+
+    Any number of workers may run at once, on any machines that share
+    workdir.
+
+    Arguments:
+    workdir -- string: directory for sharded computation
+    f1 -- induced-hereditary predicate
+    f2 -- induced-hereditary predicate
+    b1 -- nonnegative int
+    b2 -- nonnegative int
+    lease -- optional number: as for extremals. Default is 600.
+    poll -- optional number: seconds to wait between checks for new
+        work. Default is 1.
+    enumeration -- optional string: as for extremals. It need not
+        match the coordinator's.
+    prune -- optional bool: as for extremals. It need not match the
+        coordinator's.
+    duality -- optional bool: as for extremals. It must match the
+        coordinator's.
+
+    """
+    if lease is None:
+        lease = 600
+    if poll is None:
+        poll = 1
+
+    jobpath = os.path.join(workdir, "job")
+    while not os.path.exists(jobpath):
+        time.sleep(poll)
+    pairs = bool(duality) and b1 == b2 and _dual(f1, f2)
+    header, gs = _read_graph_file(jobpath)
+    if header != _job_header(f1, f2, b1, b2, pairs):
+        raise ValueError("worker parameters do not match job in " +
+                         workdir + ": " + "; ".join(header))
+
+    count = 0
+    while not os.path.exists(os.path.join(workdir, "done")):
+        try:
+            levels = [ name for name in _shard_files(workdir)
+                       if name.isdigit() ]
+            if levels:
+                n = int(levels[-1])
+                leveldir = os.path.join(workdir, levels[-1])
+                sizes = None
+                if prune:
+                    sizes = _vset_sizes(f1, f2, b1, b2, n)
+                if _work_one_shard(f1, f2, b1, b2, n, leveldir, lease,
+                                   enumeration, sizes=sizes,
+                                   pairs=pairs):
+                    count += 1
+                    continue
+                _reclaim_shards(leveldir, lease)
+        except FileNotFoundError:
+            pass  # Coordinator removed a finished level; look again
+        time.sleep(poll)
+    return count
 
 
 # ----------------------------------------------------------------------
@@ -37,17 +37,41 @@ dot_str(g, graphname=None, maxlen=72)
     language. String does not end with newline. graphname is optional
     string holding name of graph. maxlen is maxmimum allowable line
     length in returned string.
+from_dot_str(s)
+    Return list of (graphname, graph) pairs for the graphs in string s
+    in DOT language, as written by dot_str.
 graphs(n)
     Generator. Yield all (vertex-labeled) graphs of order n.
 clique_number(g)
     Return clique number of graph g.
+complement(g)
+    Return complement of graph g.
+
+Graph Encoding Tools:
+edge_code(g)
+    Return int whose bits encode the edges of graph g.
+from_edge_code(n, code)
+    Return graph of order n whose edges are encoded by int code.
+graph6_str(g)
+    Return string holding representation of graph g in graph6 format.
+from_graph6(s)
+    Return graph represented by string s in graph6 format.
 
 Graph Isomorphism Tools:
 isomorphic(g, h)
     Return bool: True if graphs g, h are isomorphic.
-unique_iso(gs)
+unique_iso(gs, counts=None)
     Generator. Given iterable yielding graphs, yield first from each
     isomorphism class.
+canonical_form(g)
+    Return graph isomorphic to g, such that graphs return the same
+    value iff they are isomorphic.
+canonical_code(g)
+    Return int: edge_code of canonical_form(g).
+canonical_labeling(g)
+    Return (label, autos): label maps each vertex of g to its vertex in
+    canonical_form(g); autos are automorphisms generating the
+    automorphism group of g.
 graphs_iso(n)
     Generator. Yield graphs of order n, one in each isomorphism class.
 graphs_conn_iso(n)
@@ -57,6 +81,7 @@ graphs_conn_iso(n)
 """
 
 import itertools  # for chain, combinations, islice, permutations
+import re         # for compile
 import sys        # for argv, exit
 
 
@@ -250,6 +275,52 @@ def dot_str(g, graphname=None, maxlen=None):
     return retval
 
 
+# _DOT_GRAPH, _DOT_ITEM - regular expressions for graphs in DOT
+# language, and for the vertices & edges in their bodies
+_DOT_GRAPH = re.compile(r"graph\s*(\w*)\s*\{([^}]*)\}")
+_DOT_ITEM = re.compile(r"(\d+)(?:\s*--\s*(\d+))?\s*;")
+
+
+def from_dot_str(s):
+    """Return list of (graphname, graph) pairs for graphs in DOT string.
+
+    This reads the output of function dot_str, which may be surrounded
+    by other text, as in the files written by sparseramsey.py. Vertices
+    1 .. n in the DOT language are labeled 0 .. n-1, where n is the
+    largest vertex label found. graphname is "" if the graph has no
+    name.
+
+    Arguments:
+    s -- string holding graphs in DOT language
+
+    See beginning of this file for our graph representation.
+
+    >>> s = dot_str([ [1,2], [0,2,3], [0,1,3], [1,2] ], "mygraph")
+    >>> from_dot_str("Text\\n" + s + "\\n" + dot_str([[]]))
+    [('mygraph', [[1, 2], [0, 2, 3], [0, 1, 3], [1, 2]]), ('', [[]])]
+
+    """
+    result = []
+    for m in _DOT_GRAPH.finditer(s):
+        edges = []
+        n = 0
+        for item in _DOT_ITEM.finditer(m.group(2)):
+            u = int(item.group(1))
+            n = max(n, u)
+            if item.group(2) is not None:
+                v = int(item.group(2))
+                n = max(n, v)
+                edges.append((u-1, v-1))
+        g = [ [] for i in range(n) ]
+        for u, v in edges:
+            g[u].append(v)
+            g[v].append(u)
+        for nbrs in g:
+            nbrs.sort()
+        result.append((m.group(1), g))
+    return result
+
+
 def graphs(n):
     """Yield all (vertex-labeled) n-vertex graphs.
 
@@ -381,6 +452,171 @@ def clique_number(g):
     return clique_number_with(g, n, [], 0)
 
 
+def complement(g):
+    """Return the complement of graph g.
+
+    Arguments:
+    g -- a graph
+
+    >>> complement([[1], [0], []])
+    [[2], [2], [0, 1]]
+    >>> complement([])
+    []
+
+    """
+    n = len(g)
+    return [ [ x for x in range(n) if x != v and x not in g[v] ]
+             for v in range(n) ]
+
+
+# ----------------------------------------------------------------------
+# Graph Encoding Tools
+# ----------------------------------------------------------------------
+
+
+# Both encodings below list the pairs of vertices in the order used by
+# the graph6 format: (0,1), (0,2), (1,2), (0,3), (1,3), (2,3), ... . So
+# pair (i,j), with i < j, is number j*(j-1)//2 + i. The pairs involving
+# vertex n-1 of an n-vertex graph come last; thus adding a vertex to a
+# graph appends to its code, and does not change the existing bits.
+
+
+def edge_code(g):
+    """Return int encoding the edge set of graph g.
+
+    Bit number j*(j-1)//2 + i of the returned value, for i < j, is set
+    if and only if vertices i, j are adjacent. The order of g is not
+    stored in the code.
+
+    Arguments:
+    g -- graph
+
+    See beginning of this file for our graph representation.
+
+    >>> edge_code([])
+    0
+    >>> edge_code([ [1,2], [0], [0] ])
+    3
+    >>> edge_code([ [1,2], [0,2,3], [0,1,3], [1,2] ])
+    55
+
+    """
+    code = 0
+    for j in range(len(g)):
+        base = j*(j-1)//2
+        for i in g[j]:
+            if i >= j:
+                break
+            code |= 1 << (base+i)
+    return code
+
+
+def from_edge_code(n, code):
+    """Return the graph of order n with edges encoded by code.
+
+    This is the inverse of function edge_code.
+
+    Arguments:
+    n -- nonnegative int; order of graph to return
+    code -- nonnegative int, as returned by edge_code
+      Bits past number n*(n-1)//2 - 1 are ignored.
+
+    See beginning of this file for our graph representation.
+
+    >>> from_edge_code(4, 55)
+    [[1, 2], [0, 2, 3], [0, 1, 3], [1, 2]]
+    >>> all(from_edge_code(5, edge_code(g)) == g for g in graphs(5))
+    True
+
+    """
+    g = [ [] for v in range(n) ]
+    t = 0
+    for j in range(n):
+        for i in range(j):
+            if code >> t & 1:
+                g[i].append(j)
+                g[j].append(i)
+            t += 1
+    for adjl in g:
+        adjl.sort()
+    return g
+
+
+def graph6_str(g):
+    """Return string form of graph g in graph6 format. No newline @ end.
+
+    graph6 is the compact printable format used by nauty & many other
+    graph programs. The returned string uses only characters with codes
+    63 through 126. Orders up to 258047 are supported.
+
+    Arguments:
+    g -- graph
+
+    See beginning of this file for our graph representation.
+
+    >>> graph6_str([])
+    '?'
+    >>> graph6_str([ [1,2], [0,2,3], [0,1,3], [1,2] ])
+    'Cz'
+    >>> graph6_str([[1,4], [0,2], [1,3], [2,4], [0,3]])
+    'Dhc'
+
+    """
+    n = len(g)
+    assert n <= 258047
+    if n <= 62:
+        chars = [chr(63+n)]
+    else:
+        chars = ["~"] + [ chr(63+(n >> sh & 63)) for sh in (12, 6, 0) ]
+
+    code = edge_code(g)
+    nbits = n*(n-1)//2
+    for t in range(0, nbits, 6):
+        six = 0
+        for i in range(6):
+            six = (six << 1) | (code >> (t+i) & 1)
+        chars.append(chr(63+six))
+    return "".join(chars)
+
+
+def from_graph6(s):
+    """Return the graph represented by string s in graph6 format.
+
+    This is the inverse of function graph6_str. An optional ">>graph6<<"
+    header and trailing whitespace are allowed.
+
+    Arguments:
+    s -- string holding graph in graph6 format
+
+    See beginning of this file for our graph representation.
+
+    >>> from_graph6("Cz")
+    [[1, 2], [0, 2, 3], [0, 1, 3], [1, 2]]
+    >>> all(from_graph6(graph6_str(g)) == g for g in graphs(5))
+    True
+
+    """
+    s = s.strip()
+    if s.startswith(">>graph6<<"):
+        s = s[10:]
+    vals = [ ord(c)-63 for c in s ]
+    if vals[0] == 63:
+        n = (vals[1] << 12) | (vals[2] << 6) | vals[3]
+        vals = vals[4:]
+    else:
+        n = vals[0]
+        vals = vals[1:]
+
+    code = 0
+    t = 0
+    for six in vals:
+        for i in range(6):
+            if six >> (5-i) & 1:
+                code |= 1 << (t+i)
+        t += 6
+    return from_edge_code(n, code)
+
+
 # ----------------------------------------------------------------------
 # Graph Isomorphism Tools
 # ----------------------------------------------------------------------
@@ -519,7 +755,108 @@ def isomorphic(g, h):
     return False
 
 
-def unique_iso(gs):
+# _semicanon - not part of public interface of module
+def _semicanon(g):
+    """Return (gc, gcdv): semi-canonical form of g & its _degree_verts.
+
+    gc is isomorphic to g, with vertices sorted by the degree sequences
+    of their neighborhoods. Isomorphic graphs need not have equal
+    semi-canonical forms, but their forms can be compared quickly using
+    _ck_iso. If two forms have the same _iso_key, then their
+    _degree_verts are equal, as each lists the vertices with a given
+    key in a block, in the same place.
+
+    Arguments:
+    g -- a graph
+
+    >>> _semicanon([ [1], [0,2], [1] ])
+    ([[2], [2], [0, 1]], {(0, 0, 1): [0, 1], (0, 2, 0): [2]})
+
+    See beginning of this file for our graph representation.
+
+    """
+    gdv = _degree_verts(g)
+    gvp = list(itertools.chain.from_iterable(
+        ( gdv[k] for k in sorted(gdv.keys()) )
+        ))
+    gc = [ sorted([gvp.index(w) for w in g[v]]) for v in gvp ]
+    return gc, _degree_verts(gc)
+
+
+# _iso_key - not part of public interface of module
+def _iso_key(gcdv):
+    """Return hashable isomorphism invariant, from _degree_verts output.
+
+    Two graphs whose _degree_verts outputs have different keys are not
+    isomorphic, and _ck_iso returns False for them at once. Many keys
+    may be held at once (see unique_iso), so, for orders below 256, the
+    key is packed into a bytes object: the order, then, for each key of
+    gcdv, in sorted order, its items, followed by the number of
+    vertices. Otherwise, it is a tuple of pairs holding the same.
+
+    Arguments:
+    gcdv -- dict returned by _degree_verts
+
+    >>> list(_iso_key(_degree_verts([ [1], [0,2], [1] ])))
+    [3, 0, 0, 1, 2, 0, 2, 0, 1]
+
+    """
+    items = sorted([ (k, len(vs)) for k, vs in gcdv.items() ])
+    n = sum([ c for k, c in items ])
+    if n >= 256:
+        return tuple(items)
+    return bytes(itertools.chain([n], *[ k + (c,) for k, c in items ]))
+
+
+# _ck_iso - not part of public interface of module
+def _ck_iso(gc, gcdv, hc, hcdv, counts=None):
+    """Return True if semi-canonical forms gc, hc are isomorphic.
+
+    Arguments:
+    gc, gcdv -- as returned by _semicanon
+    hc, hcdv -- as returned by _semicanon
+    counts -- optional dict; see unique_iso
+
+    >>> gc, gcdv = _semicanon([[1], [0], []])
+    >>> hc, hcdv = _semicanon([[], [2], [1]])
+    >>> _ck_iso(gc, gcdv, hc, hcdv)
+    True
+
+    """
+    if counts is not None:
+        counts["iso_checks"] = counts.get("iso_checks", 0) + 1
+
+    # Compare nbr-degree sequences
+    if len(gcdv) != len(hcdv):
+        return False
+    for k in gcdv:
+        if k not in hcdv:
+            return False
+        if len(gcdv[k]) != len(hcdv[k]):
+            return False
+    # Now we know that gc, hc have the same order
+
+    # Try all permutations of the vertex set of graph g that take each
+    # vertex to a vertex whose neighbors have the same degree sequence.
+    n = len(gc)
+    hcsets = list(map(set, hc))
+    result = False
+    nperms = 0
+    for p in _partition_perms(list(gcdv.values()), n):
+        nperms += 1
+        for v in range(n):
+            if hcsets[p[v]] != set([p[w] for w in gc[v]]):
+                # A set comprehension would be nice above
+                break
+        else:
+            result = True
+            break
+    if counts is not None:
+        counts["iso_perms"] = counts.get("iso_perms", 0) + nperms
+    return result
+
+
+def unique_iso(gs, counts=None):
     """Given iterable yielding graphs, yield 1st from each iso. class.
 
     For example, if gs yields graphs a, b, c, d, e, and a & c are
@@ -530,6 +867,11 @@ def unique_iso(gs):
 
     Arguments:
     gs -- iterable yielding graphs
+    counts -- optional dict
+      If given, counts["iso_checks"] is increased by the number of
+      pairs of graphs checked for isomorphism, and counts["iso_perms"]
+      by the number of vertex permutations tried. Keys are created as
+      needed.
 
     See beginning of this file for our graph representation.
 
@@ -539,59 +881,258 @@ def unique_iso(gs):
     [[1, 2], [0, 2], [0, 1]]]
     >>> len(list(unique_iso(graphs(5))))
     34
+    >>> counts = {}
+    >>> len(list(unique_iso(graphs(3), counts)))
+    4
+    >>> counts
+    {'iso_checks': 4, 'iso_perms': 4}
 
     """
-    # For speed, instead of using a separate isomorphism-checking
-    # function, we use our own helper function ck_iso. This checks
-    # isomorphism of 2 graphs, given the graphs and their _degree_verts
-    # output.
-    def ck_iso(gc, gcdv, hc, hcdv):
-        # Compare nbr-degree sequences
-        if len(gcdv) != len(hcdv):
-            return False
-        for k in gcdv:
-            if k not in hcdv:
-                return False
-            if len(gcdv[k]) != len(hcdv[k]):
-                return False
-        # Now we know that gc, hc have the same order
+    # buckets maps _iso_key values to lists of edge codes of
+    # semi-canonical forms. A graph need only be checked against those
+    # in its own bucket. Semi-canonical forms with the same _iso_key
+    # have the same _degree_verts, so only the edge code of each form is
+    # kept, and it is decoded when checked; a kept graph takes a few
+    # dozen bytes, rather than a few KB.
+    buckets = dict()
 
-        # Try all permutations of the vertex set of graph g that take
-        # each vertex to a vertex whose neighbors have the same degree
-        # sequence.
+    for g in gs:
+        gc, gcdv = _semicanon(g)
         n = len(gc)
-        hcsets = list(map(set, hc))
-        for p in _partition_perms(list(gcdv.values()), n):
-            for v in range(n):
-                if hcsets[p[v]] != set([p[w] for w in gc[v]]):
-                    # A set comprehension would be nice above
-                    break
-            else:
-                return True
-        return False
-
-    # canons is list of pairs: (gc, gcdv)
-    canons = []
 
-    for g in gs:
-        gdv = _degree_verts(g)
-        gvp = list(itertools.chain.from_iterable(
-            ( gdv[k] for k in sorted(gdv.keys()) )
-            ))
-
-        # Make semi-canonical form of g
-        gc = [ sorted([gvp.index(w) for w in g[v]]) for v in gvp ]
-        gcdv = _degree_verts(gc)
-
-        # Check isomorphism w/ each graph in canons
-        for hc, hcdv in canons:
-            if ck_iso(gc, gcdv, hc, hcdv):
+        # Check isomorphism w/ each graph in bucket
+        bucket = buckets.setdefault(_iso_key(gcdv), [])
+        for hcode in bucket:
+            if _ck_iso(gc, gcdv, from_edge_code(n, hcode), gcdv,
+                       counts):
                 break
         else:
-            canons.append((gc, gcdv))
+            bucket.append(edge_code(gc))
             yield g
 
 
+# Canonical forms are found by the usual individualization-refinement
+# method. An ordered partition of the vertex set is refined until it is
+# equitable: any two vertices in the same cell have the same number of
+# neighbors in each cell. If some cell has more than one vertex, then
+# each of its vertices in turn is split off into a cell of its own, and
+# we recurse. Each discrete partition reached (a "leaf") gives a vertex
+# labeling; the canonical form is the relabeled graph with the greatest
+# edge_code. Two leaves giving the same graph reveal an automorphism;
+# automorphisms fixing the vertices split off so far are used to skip
+# children that would only repeat work already done. As in nauty, the
+# automorphisms found generate the automorphism group of the graph.
+
+
+# _refine - not part of public interface of module
+def _refine(nbrs, cells):
+    """Return coarsest equitable ordered partition refining cells.
+
+    Each cell is split according to the numbers of neighbors of its
+    vertices in each cell; the resulting cells are placed, in order of
+    these numbers, where the original cell was. Repeats until no cell
+    splits. The result depends on the labeling of the graph only through
+    the cells given.
+
+    Arguments:
+    nbrs -- list of ints: adjacency bitmasks of a graph
+      Bit w of item v is set if v, w are adjacent.
+    cells -- list of nonempty lists of vertices: ordered partition
+
+    >>> nbrs = [ 0b10, 0b101, 0b1010, 0b100 ]  # path 0-1-2-3
+    >>> _refine(nbrs, [[0, 1, 2, 3]])
+    [[0, 3], [1, 2]]
+
+    """
+    while True:
+        masks = [ sum([ 1 << v for v in cell ]) for cell in cells ]
+        newcells = []
+        for cell in cells:
+            if len(cell) == 1:
+                newcells.append(cell)
+                continue
+            bysig = dict()
+            for v in cell:
+                sig = tuple([ bin(nbrs[v] & m).count("1")
+                              for m in masks ])
+                bysig.setdefault(sig, []).append(v)
+            for sig in sorted(bysig.keys()):
+                newcells.append(bysig[sig])
+        if len(newcells) == len(cells):
+            return cells
+        cells = newcells
+
+
+def canonical_code(g):
+    """Return edge_code of canonical_form(g).
+
+    Graphs g, h of the same order are isomorphic iff canonical_code(g)
+    == canonical_code(h).
+
+    Arguments:
+    g -- a graph
+
+    See beginning of this file for our graph representation.
+
+    >>> canonical_code([[1], [0], []]) == canonical_code([[], [2], [1]])
+    True
+    >>> canonical_code([[1], [0], []]) == canonical_code([[], [], []])
+    False
+
+    """
+    return _canonical_search(g)[0]
+
+
+def canonical_labeling(g):
+    """Return canonical labeling & automorphism group generators of g.
+
+    Returns (label, autos), where label is a list mapping each vertex v
+    of g to the vertex label[v] of canonical_form(g) that it becomes,
+    and autos is a list of automorphisms of g, each a list mapping each
+    vertex to its image, which generate the automorphism group of g. So
+    two vertices are in the same orbit of the group iff some product of
+    items of autos maps one to the other.
+
+    Arguments:
+    g -- a graph
+
+    See beginning of this file for our graph representation.
+
+    >>> label, autos = canonical_labeling([[1], [0, 2], [1]])
+    >>> label, autos
+    ([0, 2, 1], [[2, 1, 0]])
+    >>> canonical_form([[1], [0, 2], [1]])
+    [[2], [2], [0, 1]]
+
+    """
+    code, label, autos = _canonical_search(g)
+    return label, autos
+
+
+# _canonical_search - not part of public interface of module
+def _canonical_search(g):
+    """Return (code, label, autos) for canonical_code, ..._labeling."""
+    n = len(g)
+    nbrs = [ sum([ 1 << w for w in g[v] ]) for v in range(n) ]
+
+    # Leaf data, as lists: [code, labeling], where a labeling maps each
+    # vertex to its new label.
+    first = []
+    best = []
+    # Automorphisms found, as lists mapping each vertex to its image
+    autos = []
+
+    def code_of(label):
+        code = 0
+        for v in range(n):
+            lv = label[v]
+            for w in g[v]:
+                lw = label[w]
+                if lv < lw:
+                    code |= 1 << (lw*(lw-1)//2 + lv)
+        return code
+
+    def note_auto(label, otherlabel):
+        # label, otherlabel give the same graph; record automorphism
+        inverse = [0] * n
+        for v in range(n):
+            inverse[otherlabel[v]] = v
+        autos.append([ inverse[label[v]] for v in range(n) ])
+
+    def orbit_reps(path, target):
+        # Return list: one vertex of target from each orbit of the group
+        # generated by the automorphisms found that fix all of path.
+        parent = list(range(n))
+
+        def find(v):
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        for a in autos:
+            if all([ a[v] == v for v in path ]):
+                for v in range(n):
+                    rv, ra = find(v), find(a[v])
+                    if rv != ra:
+                        parent[max(rv, ra)] = min(rv, ra)
+        reps = []
+        seen = set()
+        for v in target:
+            r = find(v)
+            if r not in seen:
+                seen.add(r)
+                reps.append(v)
+        return reps
+
+    def search(cells, path):
+        cells = _refine(nbrs, cells)
+        for i in range(len(cells)):
+            if len(cells[i]) > 1:
+                break
+        else:
+            # Leaf
+            label = [0] * n
+            for i in range(n):
+                label[cells[i][0]] = i
+            code = code_of(label)
+            if not first:
+                first[:] = [code, label]
+                best[:] = [code, label]
+                return
+            if code == first[0]:
+                note_auto(label, first[1])
+            elif code == best[0]:
+                note_auto(label, best[1])
+            elif code > best[0]:
+                best[:] = [code, label]
+            return
+
+        target = cells[i]
+        done = []
+        for v in target:
+            # Skip v if an automorphism fixing path maps it to a vertex
+            # already tried. Automorphisms found so far are rechecked
+            # before each child, since the last child may have found
+            # more.
+            if done and v not in orbit_reps(path, done + [v]):
+                continue
+            done.append(v)
+            rest = [ w for w in target if w != v ]
+            search(cells[:i] + [[v], rest] + cells[i+1:], path + [v])
+
+    if n == 0:
+        return 0, [], []
+    search([list(range(n))], [])
+    return best[0], best[1], autos
+
+
+def canonical_form(g):
+    """Return canonical form of graph g.
+
+    The returned graph is isomorphic to g, and graphs g, h have equal
+    canonical forms iff g, h are isomorphic.
+
+    Arguments:
+    g -- a graph
+
+    See beginning of this file for our graph representation.
+
+    >>> canonical_form([[1], [0, 2], [1]])
+    [[2], [2], [0, 1]]
+    >>> canonical_form([[1, 2], [0], [0]])
+    [[2], [2], [0, 1]]
+    >>> cfs = set([ graph6_str(canonical_form(g)) for g in graphs(5) ])
+    >>> len(cfs)
+    34
+    >>> g = [ [] for v in range(12) ]
+    >>> canonical_form(g) == g
+    True
+
+    """
+    return from_edge_code(len(g), canonical_code(g))
+
+
 def graphs_iso(n):
     """Yield graphs of order n, one in each isomorphism class.
 
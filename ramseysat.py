@@ -0,0 +1,906 @@
+#!/usr/bin/env python3
+
+# ramseysat.py
+# Requires Python 3.
+
+"""Deciding whether counterexample graphs of a given order exist, using
+a SAT solver.
+
+CONVENTIONS
+
+See isograph.py for our graph representation, and genramsey.py for
+predicates and counterexample graphs.
+
+Breadth-first search (genramsey.extremals) finds every counterexample
+graph of every order, which is more than we need for an upper bound on a
+Ramsey number: R <= n iff there is no counterexample graph of order n.
+Here we write that statement as a boolean formula in conjunctive normal
+form (CNF), and hand it to a conflict-driven clause-learning (CDCL) SAT
+solver, which is included in this file.
+
+A *literal* is a nonzero int: v means variable v is True, and -v means
+it is False. A *clause* is a list of literals; it is satisfied if one of
+them is True. A *model* is a list of bools indexed by variable, with
+item 0 unused.
+
+For a graph of order n, variable edge_var(i, j) is True iff vertices i
+and j are adjacent; these are variables 1 .. n(n-1)/2, numbered as the
+bits of isograph.edge_code, plus one.
+
+A predicate f can be encoded if it has an attribute f.cnf_witness: a
+pair (w, cnf), where w is an int, and cnf is a list of clauses, each a
+list of triples (i, j, e), with 0 <= i < j < w, and e a bool. A w-tuple
+t of distinct vertices of a graph satisfies cnf if each clause holds a
+triple (i, j, e) such that t[i] & t[j] are adjacent iff e. Then a set s
+is an f-set iff no w-tuple of vertices in s satisfies cnf: such a tuple
+is a *witness* that s is not an f-set. For example, a set is not
+independent iff it contains an edge, so is_independent.cnf_witness is
+(2, [[(0, 1, True)]]); a set is not k-sparse iff some vertex in it has
+k+1 neighbors in it, which is a witness of order k+2. Predicates in
+genramsey.py, sparseramsey.py, and dividedramsey.py have this
+attribute.
+
+ENCODING
+
+For each w-tuple of vertices, up to the symmetries of cnf, we make an
+auxiliary variable implying that the tuple is a witness (or use the edge
+literal itself, when cnf is a single literal). Then, for each b-set s,
+one clause says that some witness lies in s. This is the binomial
+encoding: the clause has a literal for each w-subset of s and each of
+its symmetry classes.
+
+A witness that is a star, with vertex 0 adjacent to all the others, or
+to none, as for k-sparse sets (w = k+2), is instead given a cardinality
+encoding. The clause for s has one literal for each vertex v of s,
+implying that v has at least w-1 neighbors (or non-neighbors) in s, by
+a sequential counter over the vertices of s other than v, in order.
+Counters with the same v share the auxiliary variables for the common
+prefixes of their sets; see _DegreeCounter. So the clause has b
+literals, rather than C(b, k+2)*(k+2), and each auxiliary variable has
+two short clauses.
+
+Every graph is isomorphic to one in which, for each pair of consecutive
+vertices i, i+1, the row of the adjacency matrix for i, leaving out
+columns i & i+1, is lexicographically at most that for i+1. If symmetry
+is True, we add clauses saying so, which does not change whether the
+formula is satisfiable, but cuts down the search a great deal.
+
+THE SOLVER
+
+The solver is a standard CDCL solver: two watched literals per clause,
+first-UIP clause learning with clause minimization, VSIDS variable
+activity, phase saving, Luby restarts, and deletion of learned clauses
+with high literal block distance (LBD). It is written for clarity and
+reasonable speed in pure Python; it is much slower than a compiled
+solver. R_2(5,8) at order 12 takes about 1.5 minutes, and a graph
+showing R_2(6,8) > 15 is found in about 2 minutes. Order 16 did not
+finish in 45 minutes, so R_2(6,8) itself is not supported: the formula
+can be written, but the solver will not finish in any useful time.
+
+INTERFACE
+
+Encoding:
+edge_var(i, j)
+    Return variable (int) for the edge between vertices i & j.
+CNF(nvars=0)
+    Class. Formula in CNF: attributes nvars, clauses. Methods new_var(),
+    add_clause(lits), dimacs().
+encode(f1, f2, b1, b2, n, symmetry=True)
+    Return CNF satisfied exactly by the counterexample graphs of order
+    n, with symmetry-breaking clauses if symmetry is True.
+graph_from_model(model, n)
+    Return graph of order n described by the edge variables in model.
+
+Solving:
+Solver(cnf=None)
+    Class. CDCL SAT solver. Methods add_clause(lits), solve(conflicts)
+    (returns True, False, or None if the conflict budget runs out).
+    Attributes model, stats.
+counterexample(f1, f2, b1, b2, n, symmetry=True, printflag=None)
+    Return a counterexample graph of order n, or None if there is none.
+
+"""
+
+import isograph   # for isomorphic
+import genramsey  # for has_fset
+import collections  # for Counter
+import heapq      # for heapify, heappop, heappush
+import itertools  # for combinations, permutations
+import sys        # for argv, exit
+
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+
+def edge_var(i, j):
+    """Return variable (int) for the edge between vertices i & j.
+
+    This is 1 + the number of the bit for this edge in
+    isograph.edge_code.
+
+    >>> [ edge_var(i, j) for i, j in [(0, 1), (0, 2), (2, 1), (0, 3)] ]
+    [1, 2, 3, 4]
+
+    """
+    assert i != j
+    if i > j:
+        i, j = j, i
+    return j*(j-1)//2 + i + 1
+
+
+class CNF:
+    """Formula in conjunctive normal form.
+
+    Attribute nvars is the number of variables, and clauses is a list
+    of clauses; see CONVENTIONS.
+
+    Arguments:
+    nvars -- optional int: number of variables to start with
+        Default is 0.
+
+    >>> cnf = CNF(2)
+    >>> cnf.add_clause([1, -2])
+    >>> x = cnf.new_var()
+    >>> cnf.add_clause([x])
+    >>> print(cnf.dimacs(), end="")
+    p cnf 3 2
+    1 -2 0
+    3 0
+
+    """
+
+    def __init__(self, nvars=0):
+        self.nvars = nvars
+        self.clauses = []
+
+    def new_var(self):
+        """Add a variable, and return it."""
+        self.nvars += 1
+        return self.nvars
+
+    def add_clause(self, lits):
+        """Add a clause: a list of literals."""
+        self.clauses.append(list(lits))
+
+    def dimacs(self):
+        """Return formula as str in DIMACS CNF format."""
+        lines = ["p cnf %d %d\n" % (self.nvars, len(self.clauses))]
+        for clause in self.clauses:
+            lines.append(" ".join(str(lit) for lit in clause) + " 0\n")
+        return "".join(lines)
+
+
+def _cnf_witness(f):
+    """Return f.cnf_witness, looking through wrappers of f.
+
+    Raise ValueError if f has no such attribute.
+
+    """
+    while not hasattr(f, "cnf_witness") and hasattr(f, "__wrapped__"):
+        f = f.__wrapped__
+    try:
+        return f.cnf_witness
+    except AttributeError:
+        raise ValueError("Predicate cannot be encoded as CNF: %r"
+                         % (f,))
+
+
+def _witness_literals(cnf, f, n):
+    """Return list of witness literals for each w-set of vertices.
+
+    See ENCODING. Returns (w, lits), where lits is a dict mapping each
+    sorted w-tuple t of vertices 0 .. n-1 to a list of literals, one
+    for each way (up to symmetry) in which t can be a witness for f.
+    Each literal implies that the corresponding tuple is a witness.
+    Auxiliary variables & clauses are added to cnf as needed.
+
+    >>> cnf = CNF(3)
+    >>> w, lits = _witness_literals(cnf, genramsey.is_independent, 3)
+    >>> w, lits[(0, 2)]
+    (2, [2])
+
+    """
+    w, wclauses = _cnf_witness(f)
+    # Position permutations giving distinct witnesses
+    perms = {}
+    for perm in itertools.permutations(range(w)):
+        key = frozenset(frozenset((min(perm[i], perm[j]),
+                                   max(perm[i], perm[j]), e)
+                                  for i, j, e in clause)
+                        for clause in wclauses)
+        perms.setdefault(key, perm)
+    perms = list(perms.values())
+    lits = {}
+    for t in itertools.combinations(range(n), w):
+        tlits = []
+        for perm in perms:
+            clauses = [ [ edge_var(t[perm[i]], t[perm[j]]) *
+                          (1 if e else -1)
+                          for i, j, e in clause ]
+                        for clause in wclauses ]
+            if len(clauses) == 1 and len(clauses[0]) == 1:
+                tlits.append(clauses[0][0])
+            else:
+                x = cnf.new_var()
+                for clause in clauses:
+                    cnf.add_clause([-x] + clause)
+                tlits.append(x)
+        lits[t] = tlits
+    return w, lits
+
+
+def _star_witness(w, wclauses):
+    """Return e if cnf_witness (w, wclauses) is a star, else None.
+
+    A star says that vertex 0 of the witness is adjacent to each of the
+    other w-1 (if e is True), or to none of them (if e is False), with
+    w >= 3. So a set holds a witness iff some vertex in it has at least
+    w-1 neighbors (or non-neighbors) in it.
+
+    >>> _star_witness(3, [[(0, 1, False)], [(0, 2, False)]])
+    False
+    >>> print(_star_witness(2, [[(0, 1, True)]]))
+    None
+
+    """
+    if w < 3:
+        return None
+    e = wclauses[0][0][2]
+    if sorted(wclauses) != [ [(0, i, e)] for i in range(1, w) ]:
+        return None
+    return e
+
+
+class _DegreeCounter:
+    """Literals saying a vertex has many neighbors in a set.
+
+    at_least(v, ss, j) returns a literal implying that vertex v is
+    adjacent (if e is True), or not adjacent (if e is False), to at
+    least j vertices of the sorted tuple ss; or True or False, if that
+    is always or never so. This is a sequential counter, one direction
+    of it: the literal for (v, ss, j) implies that for (v, ss[:-1], j),
+    or both the edge literal for v & ss[-1] and that for (v, ss[:-1],
+    j-1). Literals are kept, so the counters for all sets ss with the
+    same v share the auxiliary variables for their common prefixes.
+
+    Arguments:
+    cnf -- CNF object: auxiliary variables & clauses are added to it
+    e -- bool: whether to count neighbors (True) or non-neighbors
+
+    >>> cnf = CNF(3)
+    >>> count = _DegreeCounter(cnf, True)
+    >>> count.at_least(0, (1, 2), 2), count.at_least(0, (1, 2), 0)
+    (4, True)
+    >>> cnf.clauses
+    [[-5, 1], [-4, 2], [-4, 5]]
+
+    """
+
+    def __init__(self, cnf, e):
+        self.cnf = cnf
+        self.e = e
+        self._lits = {}
+
+    def at_least(self, v, ss, j):
+        if j <= 0:
+            return True
+        if j > len(ss):
+            return False
+        key = (v, ss, j)
+        if key not in self._lits:
+            y = edge_var(v, ss[-1]) * (1 if self.e else -1)
+            x = self.cnf.new_var()
+            for z in [y, self.at_least(v, ss[:-1], j-1)]:
+                # x implies the count for ss[:-1] reaches j, or z
+                lits = [-x, self.at_least(v, ss[:-1], j), z]
+                if not any(lit is True for lit in lits):
+                    self.cnf.add_clause([ lit for lit in lits
+                                          if lit is not False ])
+            self._lits[key] = x
+        return self._lits[key]
+
+
+def _lex_leq(cnf, xs, ys):
+    """Add clauses to cnf: list of literals xs <= ys lexicographically.
+
+    False is less than True. An auxiliary variable is made for each
+    position but the last, meaning that the items before it are equal.
+
+    >>> cnf = CNF(4)
+    >>> _lex_leq(cnf, [1, 2], [3, 4])
+    >>> cnf.clauses
+    [[-1, 3], [-1, -3, 5], [1, 3, 5], [-5, -2, 4]]
+
+    """
+    eq = []  # Literals whose negations are added to each clause
+    for p, (x, y) in enumerate(zip(xs, ys)):
+        cnf.add_clause(eq + [-x, y])
+        if p == len(xs) - 1:
+            break
+        e = cnf.new_var()
+        cnf.add_clause(eq + [-x, -y, e])
+        cnf.add_clause(eq + [x, y, e])
+        eq = [-e]
+
+
+def encode(f1, f2, b1, b2, n, symmetry=True):
+    """Return CNF satisfied exactly by the counterexample graphs of
+    order n.
+
+    The edge variables of a model give a graph of order n that has no
+    f1-set of order b1 and no f2-set of order b2; see CONVENTIONS &
+    ENCODING. If symmetry is True, then symmetry-breaking clauses are
+    added, so that not every counterexample graph gives a model, but
+    every one is isomorphic to a graph that does.
+
+    Arguments:
+    f1, f2 -- induced-hereditary predicates having attribute
+        cnf_witness; see CONVENTIONS
+    b1, b2 -- nonnegative ints
+    n -- nonnegative int: order of graphs
+    symmetry -- optional bool: whether to break symmetry
+        Default is True.
+
+    >>> f1 = genramsey.is_independent
+    >>> f2 = genramsey.is_clique
+    >>> cnf = encode(f1, f2, 3, 3, 5, symmetry=False)
+    >>> cnf.nvars, len(cnf.clauses)
+    (10, 20)
+    >>> sorted(cnf.clauses[0])
+    [1, 2, 3]
+
+    """
+    assert b1 >= 0
+    assert b2 >= 0
+    assert n >= 0
+    cnf = CNF(n*(n-1)//2)
+    for f, b in [(f1, b1), (f2, b2)]:
+        if b > n:
+            continue  # No b-sets
+        w, wclauses = _cnf_witness(f)
+        e = _star_witness(w, wclauses)
+        if e is not None:
+            count = _DegreeCounter(cnf, e)
+            for s in itertools.combinations(range(n), b):
+                lits = [ count.at_least(v, s[:i] + s[i+1:], w-1)
+                         for i, v in enumerate(s) ]
+                cnf.add_clause([ lit for lit in lits
+                                 if lit is not False ])
+            continue
+        w, lits = _witness_literals(cnf, f, n)
+        for s in itertools.combinations(range(n), b):
+            cnf.add_clause([ lit
+                             for t in itertools.combinations(s, w)
+                             for lit in lits[t] ])
+    if symmetry:
+        for i in range(n-1):
+            others = [ c for c in range(n) if c != i and c != i+1 ]
+            _lex_leq(cnf, [ edge_var(i, c) for c in others ],
+                     [ edge_var(i+1, c) for c in others ])
+    return cnf
+
+
+def graph_from_model(model, n):
+    """Return graph of order n described by the edge variables in model.
+
+    >>> graph_from_model([None, True, False, True], 3)
+    [[1], [0, 2], [1]]
+
+    """
+    g = [ [] for v in range(n) ]
+    for j in range(n):
+        for i in range(j):
+            if model[edge_var(i, j)]:
+                g[i].append(j)
+                g[j].append(i)
+    for nbrs in g:
+        nbrs.sort()
+    return g
+
+
+# ----------------------------------------------------------------------
+# Solving
+# ----------------------------------------------------------------------
+
+
+class _Clause(list):
+    """Clause in Solver: list of internal literals, with flags.
+
+    Internal literal 2v means variable v is True; 2v+1 means it is
+    False. Items 0 & 1 are the watched literals.
+
+    """
+
+    __slots__ = ("learnt", "lbd", "deleted")
+
+    def __init__(self, lits, learnt=False, lbd=0):
+        list.__init__(self, lits)
+        self.learnt = learnt
+        self.lbd = lbd
+        self.deleted = False
+
+
+def _luby(i):
+    """Return item i (i >= 1) of the Luby sequence 1 1 2 1 1 2 4 ...
+
+    >>> [ _luby(i) for i in range(1, 16) ]
+    [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while (1 << k) - 1 != i:
+        i -= (1 << (k-1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k-1)
+
+
+class Solver:
+    """CDCL SAT solver.
+
+    Clauses are added with add_clause, or from a CNF object given to
+    the constructor. Method solve returns True if the clauses are
+    satisfiable, in which case attribute model is a satisfying model,
+    and False if not. More clauses may be added after solve returns,
+    and solve called again.
+
+    Attribute stats is a collections.Counter holding numbers of
+    decisions, propagations, conflicts, restarts, and learned clauses
+    deleted.
+
+    Arguments:
+    cnf -- optional CNF object: clauses to add
+        Default is None: no clauses.
+
+    >>> s = Solver()
+    >>> s.add_clause([1, 2])
+    >>> s.add_clause([-1, 2])
+    >>> s.add_clause([1, -2])
+    >>> s.solve()
+    True
+    >>> s.model[1:]
+    [True, True]
+    >>> s.add_clause([-1, -2])
+    >>> s.solve()
+    False
+
+    The pigeonhole formula for 5 pigeons & 4 holes:
+
+    >>> cnf = CNF(20)
+    >>> x = lambda p, h: 4*p + h + 1
+    >>> for p in range(5):
+    ...     cnf.add_clause([ x(p, h) for h in range(4) ])
+    >>> for h in range(4):
+    ...     for p, q in itertools.combinations(range(5), 2):
+    ...         cnf.add_clause([-x(p, h), -x(q, h)])
+    >>> Solver(cnf).solve()
+    False
+
+    """
+
+    # Parameters: conflicts per unit of Luby sequence, VSIDS decay,
+    # learned clauses kept at first reduction, and its growth factor.
+    _RESTART_BASE = 100
+    _VAR_DECAY = 0.95
+    _LEARNTS_START = 2000
+    _LEARNTS_GROWTH = 1.1
+
+    def __init__(self, cnf=None):
+        self.model = None
+        self.stats = collections.Counter()
+        self._nvars = 0
+        self._value = [0, 0]  # By internal literal: 1, -1, 0 (unset)
+        self._level = [0]     # By variable: decision level
+        self._reason = [None] # By variable: clause implying it
+        self._activity = [0.0]
+        self._phase = [False] # By variable: last value
+        self._seen = [False]
+        self._watches = [[], []]  # By internal literal
+        self._learnts = []
+        self._trail = []      # Internal literals assigned, in order
+        self._trail_lim = []  # Trail length at each decision
+        self._qhead = 0       # Trail items not yet propagated
+        self._heap = []       # (-activity, variable), lazily updated
+        self._var_inc = 1.0
+        self._max_learnts = self._LEARNTS_START
+        self._ok = True       # False if clauses are unsatisfiable
+        if cnf is not None:
+            self._grow(cnf.nvars)
+            for clause in cnf.clauses:
+                self.add_clause(clause)
+
+    def _grow(self, nvars):
+        """Make sure variables 1 .. nvars exist."""
+        while self._nvars < nvars:
+            self._nvars += 1
+            v = self._nvars
+            self._value += [0, 0]
+            self._level.append(0)
+            self._reason.append(None)
+            self._activity.append(0.0)
+            self._phase.append(False)
+            self._seen.append(False)
+            self._watches += [[], []]
+            heapq.heappush(self._heap, (0.0, v))
+
+    def add_clause(self, lits):
+        """Add a clause: a list of literals; see CONVENTIONS."""
+        self._backtrack(0)
+        if not self._ok:
+            return
+        self._grow(max((abs(lit) for lit in lits), default=0))
+        value = self._value
+        clause = []
+        for lit in lits:
+            assert lit != 0
+            x = 2*lit if lit > 0 else -2*lit + 1
+            if value[x] == 1 or x^1 in clause:
+                return  # Satisfied, or tautology
+            if value[x] == 0 and x not in clause:
+                clause.append(x)
+        if not clause:
+            self._ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            if self._propagate() is not None:
+                self._ok = False
+        else:
+            c = _Clause(clause)
+            self._watches[c[0]].append(c)
+            self._watches[c[1]].append(c)
+
+    def _assign(self, x, reason):
+        """Make internal literal x True, implied by clause reason."""
+        self._value[x] = 1
+        self._value[x^1] = -1
+        v = x >> 1
+        self._level[v] = len(self._trail_lim)
+        self._reason[v] = reason
+        self._trail.append(x)
+
+    def _propagate(self):
+        """Do unit propagation; return conflicting clause, or None."""
+        value = self._value
+        watches = self._watches
+        trail = self._trail
+        level = self._level
+        reason = self._reason
+        dl = len(self._trail_lim)
+        count = 0
+        while self._qhead < len(trail):
+            fl = trail[self._qhead] ^ 1  # Literal made False
+            self._qhead += 1
+            count += 1
+            ws = watches[fl]
+            n = len(ws)
+            i = j = 0
+            while i < n:
+                c = ws[i]
+                i += 1
+                if c.deleted:
+                    continue
+                if c[0] == fl:
+                    c[0] = c[1]
+                    c[1] = fl
+                first = c[0]
+                if value[first] == 1:
+                    ws[j] = c
+                    j += 1
+                    continue
+                for k in range(2, len(c)):
+                    x = c[k]
+                    if value[x] != -1:
+                        c[1] = x
+                        c[k] = fl
+                        watches[x].append(c)
+                        break
+                else:
+                    ws[j] = c
+                    j += 1
+                    if value[first] == -1:
+                        while i < n:
+                            ws[j] = ws[i]
+                            j += 1
+                            i += 1
+                        del ws[j:]
+                        self._qhead = len(trail)
+                        self.stats["propagations"] += count
+                        return c
+                    value[first] = 1
+                    value[first^1] = -1
+                    v = first >> 1
+                    level[v] = dl
+                    reason[v] = c
+                    trail.append(first)
+            del ws[j:]
+        self.stats["propagations"] += count
+        return None
+
+    def _bump(self, v):
+        """Increase activity of variable v."""
+        activity = self._activity
+        activity[v] += self._var_inc
+        if activity[v] > 1e100:
+            for u in range(1, self._nvars+1):
+                activity[u] *= 1e-100
+            self._var_inc *= 1e-100
+            self._rebuild_heap()
+        elif self._value[2*v] == 0:
+            heapq.heappush(self._heap, (-activity[v], v))
+
+    def _rebuild_heap(self):
+        """Rebuild heap from the unassigned variables."""
+        self._heap = [ (-self._activity[v], v)
+                       for v in range(1, self._nvars+1)
+                       if self._value[2*v] == 0 ]
+        heapq.heapify(self._heap)
+
+    def _analyze(self, confl):
+        """Return (learned clause, backtrack level, LBD) for conflict.
+
+        The learned clause is a list of internal literals, with the
+        first-UIP literal first, and a literal of the backtrack level
+        second.
+
+        """
+        seen = self._seen
+        level = self._level
+        reason = self._reason
+        trail = self._trail
+        dl = len(self._trail_lim)
+        learnt = [None]
+        pathc = 0
+        x = None
+        idx = len(trail) - 1
+        c = confl
+        while True:
+            for y in (c if x is None else c[1:]):
+                v = y >> 1
+                if not seen[v] and level[v] > 0:
+                    seen[v] = True
+                    self._bump(v)
+                    if level[v] >= dl:
+                        pathc += 1
+                    else:
+                        learnt.append(y)
+            while not seen[trail[idx] >> 1]:
+                idx -= 1
+            x = trail[idx]
+            idx -= 1
+            v = x >> 1
+            c = reason[v]
+            seen[v] = False
+            pathc -= 1
+            if pathc == 0:
+                break
+        learnt[0] = x ^ 1
+        # Minimize: drop literals implied by others in the clause
+        kept = [learnt[0]]
+        for y in learnt[1:]:
+            r = reason[y >> 1]
+            if r is None or any(not seen[z >> 1] and level[z >> 1] > 0
+                                for z in r[1:]):
+                kept.append(y)
+        for y in learnt[1:]:
+            seen[y >> 1] = False
+        if len(kept) == 1:
+            return kept, 0, 1
+        best = max(range(1, len(kept)),
+                   key=lambda i: level[kept[i] >> 1])
+        kept[1], kept[best] = kept[best], kept[1]
+        lbd = len(set(level[y >> 1] for y in kept))
+        return kept, level[kept[1] >> 1], lbd
+
+    def _backtrack(self, lvl):
+        """Undo assignments above decision level lvl."""
+        if len(self._trail_lim) <= lvl:
+            return
+        value = self._value
+        phase = self._phase
+        reason = self._reason
+        activity = self._activity
+        heap = self._heap
+        trail = self._trail
+        start = self._trail_lim[lvl]
+        for i in range(len(trail)-1, start-1, -1):
+            x = trail[i]
+            v = x >> 1
+            value[x] = 0
+            value[x^1] = 0
+            phase[v] = not (x & 1)
+            reason[v] = None
+            heapq.heappush(heap, (-activity[v], v))
+        del trail[start:]
+        del self._trail_lim[lvl:]
+        self._qhead = len(trail)
+
+    def _pick(self):
+        """Return internal literal to decide on, or None if all set."""
+        value = self._value
+        heap = self._heap
+        if len(heap) > 4*self._nvars + 1000:
+            self._rebuild_heap()
+            heap = self._heap
+        while heap:
+            v = heapq.heappop(heap)[1]
+            if value[2*v] == 0:
+                return 2*v if self._phase[v] else 2*v + 1
+        return None
+
+    def _locked(self, c):
+        """Return True if clause c is the reason for an assignment."""
+        return self._reason[c[0] >> 1] is c and self._value[c[0]] == 1
+
+    def _reduce(self):
+        """Delete about half of the learned clauses, those of high LBD.
+
+        Clauses with LBD at most 2, and reasons, are kept.
+
+        """
+        self._learnts.sort(key=lambda c: (c.lbd, len(c)))
+        half = len(self._learnts) // 2
+        kept = []
+        for i, c in enumerate(self._learnts):
+            if i < half or c.lbd <= 2 or self._locked(c):
+                kept.append(c)
+            else:
+                c.deleted = True
+                self.stats["deleted"] += 1
+        self._learnts = kept
+        self._max_learnts = int(self._max_learnts *
+                                self._LEARNTS_GROWTH)
+
+    def solve(self, conflicts=None):
+        """Return True if clauses are satisfiable, False if not.
+
+        If True, attribute model is set to a satisfying model. If
+        conflicts is given, then give up after that many conflicts, and
+        return None.
+
+        Arguments:
+        conflicts -- optional int: conflict budget
+            Default is None: no limit.
+
+        """
+        self.model = None
+        self._backtrack(0)
+        if not self._ok:
+            return False
+        if self._propagate() is not None:
+            self._ok = False
+            return False
+        stats = self.stats
+        count = 0         # Conflicts in this call
+        restart = 1       # Number of restart in this call
+        limit = self._RESTART_BASE * _luby(restart)
+        since = 0         # Conflicts since restart
+        while True:
+            confl = self._propagate()
+            if confl is not None:
+                stats["conflicts"] += 1
+                count += 1
+                since += 1
+                if not self._trail_lim:
+                    self._ok = False
+                    return False
+                learnt, lvl, lbd = self._analyze(confl)
+                self._backtrack(lvl)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    c = _Clause(learnt, True, lbd)
+                    self._watches[c[0]].append(c)
+                    self._watches[c[1]].append(c)
+                    self._learnts.append(c)
+                    self._assign(c[0], c)
+                self._var_inc /= self._VAR_DECAY
+                if conflicts is not None and count >= conflicts:
+                    self._backtrack(0)
+                    return None
+                if since >= limit:
+                    stats["restarts"] += 1
+                    restart += 1
+                    limit = self._RESTART_BASE * _luby(restart)
+                    since = 0
+                    self._backtrack(0)
+            else:
+                if len(self._learnts) - len(self._trail) \
+                        >= self._max_learnts:
+                    self._reduce()
+                x = self._pick()
+                if x is None:
+                    self.model = [None] + [ self._value[2*v] == 1
+                                   for v in range(1, self._nvars+1) ]
+                    self._backtrack(0)
+                    return True
+                stats["decisions"] += 1
+                self._trail_lim.append(len(self._trail))
+                self._assign(x, None)
+
+
+# ----------------------------------------------------------------------
+# Finding Counterexample Graphs
+# ----------------------------------------------------------------------
+
+
+def counterexample(f1, f2, b1, b2, n, symmetry=True, printflag=None):
+    """Return a counterexample graph of order n, or None if none exist.
+
+    The graph has no f1-set of order b1, and no f2-set of order b2. If
+    None is returned, then, for the Ramsey number R these give, R <= n;
+    otherwise R > n. See encode for the encoding. If printflag is True,
+    prints the size of the formula, and then statistics on the search.
+
+    Arguments:
+    f1, f2 -- induced-hereditary predicates having attribute
+        cnf_witness; see CONVENTIONS
+    b1, b2 -- nonnegative ints
+    n -- nonnegative int: order of graph
+    symmetry -- optional bool: whether to break symmetry
+        Default is True.
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = genramsey.is_independent
+    >>> f2 = genramsey.is_clique
+    >>> g = counterexample(f1, f2, 3, 3, 5)
+    >>> c5 = [[1,4], [0,2], [1,3], [2,4], [0,3]]
+    >>> isograph.isomorphic(g, c5)
+    True
+    >>> counterexample(f1, f2, 3, 3, 6) is None
+    True
+    >>> counterexample(f1, f2, 4, 3, 8) is None
+    False
+    >>> counterexample(f1, f2, 4, 3, 9) is None
+    True
+
+    """
+    cnf = encode(f1, f2, b1, b2, n, symmetry)
+    if printflag:
+        print("Variables & clauses:", cnf.nvars, len(cnf.clauses))
+    solver = Solver(cnf)
+    result = solver.solve()
+    if printflag:
+        print("Decisions & conflicts:", solver.stats["decisions"],
+              solver.stats["conflicts"])
+    if not result:
+        return None
+    g = graph_from_model(solver.model, n)
+    assert not genramsey.has_fset(f1, b1, g)
+    assert not genramsey.has_fset(f2, b2, g)
+    return g
+
+
+# ----------------------------------------------------------------------
+# Main program
+# ----------------------------------------------------------------------
+
+
+def main(argv=None):
+    """Run doctests; verbose mode if argv[1] is "--Test".
+    If argv is not given, then sys.argv is used.
+
+    """
+    if argv is None:
+        argv = sys.argv
+
+    import doctest
+    verbose = (len(argv) >= 2 and argv[1] == "--Test")
+    if verbose:
+        print("Running doctests (verbose mode)")
+    else:
+        print("Running doctests")
+    doctest.testmod(verbose=verbose)
+    return 0
+
+
+# Execute main() if running as program, not if imported as module
+if __name__ == "__main__":
+    sys.exit(main())
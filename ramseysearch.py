@@ -0,0 +1,670 @@
+#!/usr/bin/env python3
+
+# ramseysearch.py
+# Requires Python 3.
+
+"""Search heuristically for large counterexample graphs.
+
+Command-line usage: ramseysearch.py [OPTIONS] k a b n
+
+Look for a counterexample graph of order n for the sparse Ramsey number
+R_k(a, b) (or, with --divided, the divided Ramsey number R*_k(a, b)),
+using local search over edge flips. If one is found, print it, in DOT
+language or graph6 format, along with its order; this shows that the
+Ramsey number is greater than n. The search may fail even if such a
+graph exists, so this gives lower bounds only.
+
+OPTIONS:
+-q, --quiet  Quiet mode; do not print progress messages.
+--divided    Search for R*_k(a, b) instead of R_k(a, b).
+--anneal     Use simulated annealing instead of tabu search.
+--seconds SECS
+             Give up after SECS seconds (default: no limit).
+--restarts R Give up after R restarts (default: no limit).
+--steps S    Edge flips in each restart (default: 100 n).
+--processes P
+             Run P restarts at once, in separate processes (default 1).
+--start FILE Start from the graphs in FILE, in DOT language, as in the
+             files in RESULTS, taking each in turn, one per restart. If
+             a graph has fewer than n vertices, random vertices are
+             added; if more, random vertices are removed. May be given
+             more than once.
+--random SEED
+             Seed the random-number generator, for repeatable runs.
+--graph6     Print the graph found in graph6 format instead of DOT.
+
+The following options perform special operations; if they are given,
+then arguments k, a, b, n are ignored and may be omitted.
+
+-h, --help   Print this usage message.
+--test       Run module tests (uses Python doctests), non-verbose mode.
+--Test       Run module tests, verbose mode.
+
+To call from a Python 3 program, first do
+
+    import ramseysearch
+
+To look for a counterexample graph, do
+
+    g = ramseysearch.search(f1, f2, b1, b2, n, seconds=60)
+
+where f1, f2 are predicates (see genramsey.py). The return value is a
+counterexample graph of order n, or None if none was found. See search
+for other options.
+
+METHOD
+
+We keep a graph of order n, and the set of *violations*: sets of order
+b1 that are f1-sets, and sets of order b2 that are f2-sets. The graph is
+a counterexample graph iff there are none. Each step picks a violation
+at random, and flips an edge (adds it if absent, removes it if present)
+between two of its vertices, chosen so as to break it. When f is
+monotone (see genramsey.Predicate), only flips that can break the
+violation are tried.
+
+Flipping the edge between u & v changes only sets containing both, and
+f is induced-hereditary, so the violations after the flip that contain u
+& v are found by growing sets from {u, v}, one vertex at a time,
+stopping at any set that is not an f-set. We keep, for each pair of
+vertices, the violations containing it, so that the change in the number
+of violations, for any flip, is found without looking at the rest of
+the graph.
+
+Tabu search tries each possible flip for the chosen violation, and makes
+the one giving the fewest violations, except that an edge flipped in the
+last few steps may not be flipped again, unless that gives fewer
+violations than ever before. Simulated annealing tries one possible
+flip, and makes it if it does not increase the number of violations, or
+else with a probability that falls as the number rises and as the search
+goes on.
+
+Each restart starts from a random graph, or from a given starting
+graph, and runs for a fixed number of steps, or until it finds a
+counterexample graph.
+
+INTERFACE
+
+search(f1, f2, b1, b2, n, seconds=None, restarts=None, ...)
+    Return a counterexample graph of order n, or None if none was
+    found.
+local_search(f1, f2, b1, b2, n, start=None, ...)
+    Do one restart. Return (g, v), where g is the graph with fewest
+    violations found, and v is the number of violations.
+violations(f1, f2, b1, b2, g)
+    Return the number of violations in graph g.
+start_graphs(path)
+    Return list of the graphs in a file in DOT language.
+
+"""
+
+import isograph   # for dot_str, from_dot_str, graph6_str
+import genramsey  # for Independent, is_clique, is_independent
+import sparseramsey  # for KSparse, KSparseCompl
+import dividedramsey  # for KDivided, KDividedCompl
+import itertools  # for combinations, count
+import math       # for exp
+import multiprocessing  # for Pool
+import random     # for Random
+import time       # for sleep, time
+import sys        # for argv, exit, stderr
+import getopt     # for error, getopt
+
+
+# ----------------------------------------------------------------------
+# Violations
+# ----------------------------------------------------------------------
+
+
+def _fsets_with(f, b, g, base):
+    """Return list of f-sets of order b in g that include set base.
+
+    Sets are grown from base, one vertex at a time, stopping at sets
+    that are not f-sets; so f must be induced-hereditary. Item v of g
+    may be any collection of the neighbors of v.
+
+    >>> g = [[1], [0, 2], [1, 3], [2]]
+    >>> _fsets_with(genramsey.is_independent, 2, g, (0,))
+    [(0, 2), (0, 3)]
+    >>> _fsets_with(genramsey.is_independent, 3, g, ())
+    []
+
+    """
+    if len(base) > b or not f(g, base):
+        return []
+    others = [ v for v in range(len(g)) if v not in base ]
+    found = []
+
+    def grow(s, i):
+        if len(s) == b:
+            found.append(s)
+            return
+        for j in range(i, len(others) - (b - len(s)) + 1):
+            t = tuple(sorted(s + (others[j],)))
+            if f(g, t):
+                grow(t, j+1)
+
+    grow(tuple(base), 0)
+    return found
+
+
+def violations(f1, f2, b1, b2, g):
+    """Return the number of violations in graph g.
+
+    A violation is an f1-set of order b1, or an f2-set of order b2; so
+    g is a counterexample graph iff this is zero.
+
+    >>> c5 = [[1,4], [0,2], [1,3], [2,4], [0,3]]
+    >>> f1 = genramsey.is_independent
+    >>> f2 = genramsey.is_clique
+    >>> violations(f1, f2, 3, 3, c5)
+    0
+    >>> violations(f1, f2, 2, 3, c5)
+    5
+
+    """
+    return (len(_fsets_with(f1, b1, g, ())) +
+            len(_fsets_with(f2, b2, g, ())))
+
+
+class _State:
+    """Graph being searched, with its violations.
+
+    Attribute g is the graph, with item v the set of neighbors of v.
+    Attribute count is the number of violations. Violations are pairs
+    (side, s), where side is 0 for f1, 1 for f2, and s is a sorted tuple
+    of vertices.
+
+    >>> f1 = genramsey.is_independent
+    >>> f2 = genramsey.is_clique
+    >>> st = _State(f1, f2, 3, 3, [[], [], []])
+    >>> st.count
+    1
+    >>> st.delta(0, 2)[0]
+    -1
+    >>> st.flip(0, 2); st.count
+    0
+
+    """
+
+    def __init__(self, f1, f2, b1, b2, g):
+        self._fs = [(f1, b1), (f2, b2)]
+        self.g = [ set(nbrs) for nbrs in g ]
+        self.count = 0
+        self._list = []   # Violations, in no particular order
+        self._where = {}  # Index in _list of each violation
+        self._pairs = {}  # Set of violations containing each pair
+        for side, (f, b) in enumerate(self._fs):
+            for s in _fsets_with(f, b, self.g, ()):
+                self._add((side, s))
+
+    def _add(self, viol):
+        self._where[viol] = len(self._list)
+        self._list.append(viol)
+        for pair in itertools.combinations(viol[1], 2):
+            self._pairs.setdefault(pair, set()).add(viol)
+        self.count += 1
+
+    def _remove(self, viol):
+        i = self._where.pop(viol)
+        last = self._list.pop()
+        if last != viol:
+            self._list[i] = last
+            self._where[last] = i
+        for pair in itertools.combinations(viol[1], 2):
+            self._pairs[pair].discard(viol)
+        self.count -= 1
+
+    def random_violation(self, rng):
+        """Return a violation chosen at random; there must be one."""
+        return self._list[rng.randrange(len(self._list))]
+
+    def _toggle(self, u, v):
+        if v in self.g[u]:
+            self.g[u].discard(v)
+            self.g[v].discard(u)
+        else:
+            self.g[u].add(v)
+            self.g[v].add(u)
+
+    def delta(self, u, v):
+        """Return (change in count, new violations) for flipping u, v.
+
+        The new violations are those containing u & v after the flip.
+
+        """
+        pair = (u, v) if u < v else (v, u)
+        self._toggle(u, v)
+        new = [ (side, s) for side, (f, b) in enumerate(self._fs)
+                for s in _fsets_with(f, b, self.g, pair) ]
+        self._toggle(u, v)
+        return len(new) - len(self._pairs.get(pair, ())), new
+
+    def flip(self, u, v, new=None):
+        """Flip the edge between u & v; new is as returned by delta."""
+        if new is None:
+            new = self.delta(u, v)[1]
+        pair = (u, v) if u < v else (v, u)
+        for viol in list(self._pairs.get(pair, ())):
+            self._remove(viol)
+        for viol in new:
+            self._add(viol)
+        self._toggle(u, v)
+
+    def graph(self):
+        """Return the graph, in our usual representation."""
+        return [ sorted(nbrs) for nbrs in self.g ]
+
+
+def _flips(f, g, s):
+    """Return list of pairs in s whose flip may make s not an f-set.
+
+    If f is monotone (see genramsey.Predicate), these are the non-edges
+    (monotone -1) or edges (monotone 1) in s; otherwise, all pairs.
+
+    >>> _flips(genramsey.Independent(), [[1], [0], []], (0, 1, 2))
+    [(0, 2), (1, 2)]
+
+    """
+    monotone = getattr(f, "monotone", 0)
+    return [ (u, v) for u, v in itertools.combinations(s, 2)
+             if not monotone or (v in g[u]) == (monotone > 0) ]
+
+
+# ----------------------------------------------------------------------
+# Local Search
+# ----------------------------------------------------------------------
+
+
+# _TABU_TENURE - number of steps for which a flipped edge is tabu
+_TABU_TENURE = 10
+
+# _ANNEAL_START, _ANNEAL_COOLING - starting temperature, and factor by
+# which it is multiplied at each step, in simulated annealing
+_ANNEAL_START = 2.0
+_ANNEAL_COOLING = 0.999
+
+
+def _random_start(n, start, rng):
+    """Return starting graph of order n, made from start & rng.
+
+    If start is None, the graph is random, with edge probability 1/2.
+    Otherwise, random vertices of start are removed, or vertices are
+    added, each adjacent to each other vertex with probability equal to
+    the density of start, so that the order is n.
+
+    >>> rng = random.Random(1)
+    >>> len(_random_start(5, None, rng))
+    5
+    >>> g = _random_start(2, [[1, 2], [0, 2], [0, 1]], rng)
+    >>> g
+    [[1], [0]]
+
+    """
+    if start is None:
+        start = []
+        p = 0.5
+    else:
+        m = len(start)
+        edges = sum(len(nbrs) for nbrs in start) // 2
+        p = edges / (m*(m-1)//2) if m >= 2 else 0.5
+    keep = list(range(len(start)))
+    if len(keep) > n:
+        keep = sorted(rng.sample(keep, n))
+    index = { v: i for i, v in enumerate(keep) }
+    g = [ [ index[x] for x in start[v] if x in index ] for v in keep ]
+    while len(g) < n:
+        v = len(g)
+        nbrs = [ u for u in range(v) if rng.random() < p ]
+        for u in nbrs:
+            g[u].append(v)
+        g.append(nbrs)
+    return g
+
+
+def local_search(f1, f2, b1, b2, n, start=None, method="tabu",
+                 steps=None, deadline=None, rng=None):
+    """Do one restart. Return (g, v): the best graph found, and its
+    number of violations.
+
+    The search stops when a counterexample graph is found (v is 0),
+    after the given number of steps, or at the deadline. See METHOD.
+
+    Arguments:
+    f1, f2 -- induced-hereditary predicates
+    b1, b2 -- nonnegative ints
+    n -- nonnegative int: order of graph
+    start -- optional graph: starting graph; see _random_start
+        Default is None: random.
+    method -- optional string: "tabu" or "anneal"
+        Default is "tabu".
+    steps -- optional int: maximum number of flips
+        Default is None: 100 n.
+    deadline -- optional number: time.time() at which to stop
+        Default is None: no deadline.
+    rng -- optional random.Random object
+        Default is None: a new one.
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = genramsey.is_independent
+    >>> f2 = genramsey.is_clique
+    >>> g, v = local_search(f1, f2, 3, 3, 5, rng=random.Random(1))
+    >>> v, isograph.isomorphic(g, [[1,4], [0,2], [1,3], [2,4], [0,3]])
+    (0, True)
+
+    """
+    assert method in ["tabu", "anneal"]
+    if steps is None:
+        steps = 100 * n
+    if rng is None:
+        rng = random.Random()
+    st = _State(f1, f2, b1, b2, _random_start(n, start, rng))
+    fs = [f1, f2]
+    best, bestg = st.count, st.graph()
+    tabu = {}  # Step until which each pair is tabu
+    temp = _ANNEAL_START
+    for step in range(steps):
+        if st.count == 0:
+            break
+        if deadline is not None and time.time() >= deadline:
+            break
+        side, s = st.random_violation(rng)
+        flips = _flips(fs[side], st.g, s)
+        if not flips:
+            continue
+        if method == "tabu":
+            choice = None
+            for pair in flips:
+                d, new = st.delta(*pair)
+                if tabu.get(pair, -1) >= step and st.count + d >= best:
+                    continue
+                if choice is None or d < choice[0] or \
+                        (d == choice[0] and rng.random() < 0.5):
+                    choice = (d, pair, new)
+            if choice is None:
+                continue
+            d, pair, new = choice
+            tabu[pair] = step + _TABU_TENURE
+        else:
+            pair = rng.choice(flips)
+            d, new = st.delta(*pair)
+            temp *= _ANNEAL_COOLING
+            if d > 0 and rng.random() >= math.exp(-d / temp):
+                continue
+        st.flip(pair[0], pair[1], new)
+        if st.count < best:
+            best, bestg = st.count, st.graph()
+    return bestg, best
+
+
+def _restart(args):
+    """Call local_search with args; the last is a seed for the rng."""
+    f1, f2, b1, b2, n, start, method, steps, deadline, seed = args
+    return local_search(f1, f2, b1, b2, n, start, method, steps,
+                        deadline, random.Random(seed))
+
+
+def search(f1, f2, b1, b2, n, seconds=None, restarts=None,
+           processes=1, method="tabu", starts=None, steps=None,
+           seed=None, printflag=None):
+    """Return a counterexample graph of order n, or None if none was
+    found.
+
+    Calls local_search repeatedly, each time with a new random-number
+    generator, until a counterexample graph is found, or the time or
+    number of restarts runs out. If both seconds and restarts are None,
+    keeps going until a counterexample graph is found. If processes is
+    more than 1, then that many restarts run at once, in separate
+    processes, and f1, f2 must be picklable (see genramsey.Predicate).
+    If printflag is True, prints the number of violations left at the
+    end of each restart.
+
+    Arguments:
+    f1, f2 -- induced-hereditary predicates
+    b1, b2 -- nonnegative ints
+    n -- nonnegative int: order of graph
+    seconds -- optional number: time budget
+        Default is None: no limit.
+    restarts -- optional int: maximum number of restarts
+        Default is None: no limit.
+    processes -- optional int: number of processes
+        Default is 1: run in this process.
+    method -- optional string: "tabu" or "anneal"; see local_search
+        Default is "tabu".
+    starts -- optional list of graphs: starting graphs, used in turn,
+        one per restart; see _random_start
+        Default is None: random starting graphs.
+    steps -- optional int: flips per restart; see local_search
+    seed -- optional: seed for random-number generator
+        Default is None: random.
+    printflag -- optional bool: whether to print ongoing messages
+        Default is False.
+
+    See isograph.py for our graph representation.
+
+    >>> f1 = sparseramsey.KSparse(2)
+    >>> f2 = sparseramsey.KSparseCompl(2)
+    >>> g = search(f1, f2, 5, 6, 7, seed=1)
+    >>> violations(f1, f2, 5, 6, g)
+    0
+    >>> search(f1, f2, 5, 6, 8, restarts=2, steps=20, seed=1) is None
+    True
+
+    """
+    assert method in ["tabu", "anneal"]
+    assert processes >= 1
+    deadline = None if seconds is None else time.time() + seconds
+    rng = random.Random(seed)
+
+    def tasks():
+        for i in itertools.count():
+            if restarts is not None and i >= restarts:
+                return
+            if deadline is not None and time.time() >= deadline:
+                return
+            start = starts[i % len(starts)] if starts else None
+            yield (f1, f2, b1, b2, n, start, method, steps, deadline,
+                   rng.getrandbits(64))
+
+    def report(v):
+        if printflag:
+            print("Restart ended with", v, "violation(s)", flush=True)
+
+    if processes == 1:
+        for args in tasks():
+            g, v = _restart(args)
+            report(v)
+            if v == 0:
+                return g
+        return None
+
+    # Keep processes restarts running, until one succeeds
+    with multiprocessing.Pool(processes) as pool:
+        todo = tasks()
+        running = []
+        while True:
+            for args in todo:
+                running.append(pool.apply_async(_restart, [args]))
+                if len(running) >= processes:
+                    break
+            if not running:
+                return None
+            time.sleep(0.01)
+            for r in [ r for r in running if r.ready() ]:
+                running.remove(r)
+                g, v = r.get()
+                report(v)
+                if v == 0:
+                    return g  # Leaving "with" stops other processes
+
+
+def start_graphs(path):
+    """Return list of the graphs in a file in DOT language.
+
+    The file may hold other text, as do the files in RESULTS.
+
+    >>> import os
+    >>> path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    ...                     "RESULTS", "r02_05_06.txt")
+    >>> gs = start_graphs(path)
+    >>> len(gs), len(gs[0])
+    (13, 7)
+
+    """
+    with open(path) as f:
+        return [ g for name, g in isograph.from_dot_str(f.read()) ]
+
+
+# ----------------------------------------------------------------------
+# Main program
+# ----------------------------------------------------------------------
+
+
+class UsageError(Exception):
+
+    """Exception class for command-line usage errors.
+
+    >>> isinstance(UsageError(""), Exception)
+    True
+    >>> UsageError("abc").msg
+    'abc'
+
+    """
+
+    def __init__(self, msg):
+        """Create UsageError object with the given message."""
+        self.msg = msg
+
+
+def main(argv=None):
+    """Search for a counterexample graph, based on command-line options.
+
+    Argument argv is an optional list or tuple of strings, in the format
+    of sys.argv (which is its default value).
+
+    Return zero if a counterexample graph is found, 1 if not, 2 on a
+    usage error.
+
+    """
+    if argv is None:
+        argv = sys.argv
+
+    printflag = True
+    divided = False
+    method = "tabu"
+    seconds = None
+    restarts = None
+    steps = None
+    processes = 1
+    startfiles = []
+    seed = None
+    graph6 = False
+    try:
+        try:
+            optlist, args = getopt.getopt(argv[1:], "hq",
+                ["help", "quiet", "test", "Test", "divided", "anneal",
+                 "seconds=", "restarts=", "steps=", "processes=",
+                 "start=", "random=", "graph6"])
+        except getopt.error as msg:
+            raise UsageError(msg)
+        for o, a in optlist:
+            if o in ["-h", "--help"]:
+                print(__doc__, end="")  # Usage message
+                return 0
+            elif o in ["-q", "--quiet"]:
+                printflag = False
+            elif o == "--divided":
+                divided = True
+            elif o == "--anneal":
+                method = "anneal"
+            elif o == "--seconds":
+                try:
+                    seconds = float(a)
+                except ValueError:
+                    raise UsageError("Seconds must be a number")
+            elif o in ["--restarts", "--steps", "--processes"]:
+                try:
+                    value = int(a)
+                except ValueError:
+                    raise UsageError(o[2:].capitalize() +
+                                     " must be an integer")
+                if value < 1:
+                    raise UsageError(o[2:].capitalize() +
+                                     " must be positive")
+                if o == "--restarts":
+                    restarts = value
+                elif o == "--steps":
+                    steps = value
+                else:
+                    processes = value
+            elif o == "--start":
+                startfiles.append(a)
+            elif o == "--random":
+                seed = a
+            elif o == "--graph6":
+                graph6 = True
+            elif o == "--test" or o == "--Test":
+                import doctest  # for testmod
+                verbose = (o == "--Test")
+                if verbose:
+                    print("Running doctests (verbose mode)")
+                else:
+                    print("Running doctests")
+                doctest.testmod(verbose=verbose)
+                return 0
+            else:
+                assert False, "unhandled option"
+        if len(args) != 4:
+            raise UsageError("Must have exactly 4 arguments")
+        try:
+            k, a, b, n = [ int(arg) for arg in args ]
+        except ValueError:
+            raise UsageError("Arguments must be integers")
+        if min(k, a, b, n) < 0 or (divided and k < 1):
+            raise UsageError("Arguments out of range")
+    except UsageError as err:
+        print(argv[0]+":", err.msg, file=sys.stderr)
+        print("For help use --help", file=sys.stderr)
+        return 2
+
+    if divided:
+        f1 = dividedramsey.KDivided(k)
+        f2 = dividedramsey.KDividedCompl(k)
+        rname = "R*_"+str(k)+"("+str(a)+","+str(b)+")"
+        graphname = "rs"+str(k)+"_"+str(a)+"_"+str(b)+"c1"
+    else:
+        f1 = sparseramsey.KSparse(k)
+        f2 = sparseramsey.KSparseCompl(k)
+        rname = "R_"+str(k)+"("+str(a)+","+str(b)+")"
+        graphname = "r"+str(k)+"_"+str(a)+"_"+str(b)+"c1"
+    try:
+        starts = [ g for path in startfiles
+                   for g in start_graphs(path) ]
+    except OSError as err:
+        print(argv[0]+":", err, file=sys.stderr)
+        return 1
+    if printflag:
+        print("Looking for counterexample graph for", rname, "of order",
+              n)
+        print()
+    g = search(f1, f2, a, b, n, seconds, restarts, processes, method,
+               starts, steps, seed, printflag)
+    if printflag:
+        print()
+    if g is None:
+        print("No counterexample graph found for", rname, "of order", n)
+        return 1
+    print("Counterexample graph of order", n, "found:")
+    print()
+    if graph6:
+        print(isograph.graph6_str(g))
+    else:
+        print(isograph.dot_str(g, graphname))
+    print()
+    print(rname, ">", n)
+    return 0
+
+
+# Execute main() if running as program, not if imported as module
+if __name__ == "__main__":
+    sys.exit(main())